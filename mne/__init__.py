@@ -34,7 +34,8 @@ from .io.kit import read_epochs_kit
 from .bem import (make_sphere_model, make_bem_model, make_bem_solution,
                   read_bem_surfaces, write_bem_surfaces,
                   read_bem_solution, write_bem_solution)
-from .cov import (read_cov, write_cov, Covariance, compute_raw_covariance,
+from .cov import (read_cov, write_cov, Covariance, CovarianceAccumulator,
+                  compute_raw_covariance,
                   compute_covariance, whiten_evoked, make_ad_hoc_cov)
 from .event import (read_events, write_events, find_events, merge_events,
                     pick_events, make_fixed_length_events, concatenate_events,
@@ -46,6 +47,7 @@ from .forward import (read_forward_solution, apply_forward, apply_forward_raw,
 from .source_estimate import (read_source_estimate, MixedSourceEstimate,
                               SourceEstimate, VolSourceEstimate, morph_data,
                               morph_data_precomputed, compute_morph_matrix,
+                              SourceMorph, read_source_morph,
                               grade_to_tris, grade_to_vertices,
                               spatial_src_connectivity,
                               spatial_tris_connectivity,
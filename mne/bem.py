@@ -13,10 +13,12 @@ import glob
 import warnings
 
 import numpy as np
-from scipy import linalg
+from scipy import linalg, sparse
 
 from .fixes import partial
-from .utils import verbose, logger, run_subprocess, get_subjects_dir
+from .parallel import parallel_func
+from .utils import (verbose, logger, run_subprocess, get_subjects_dir,
+                    _get_cached)
 from .transforms import _ensure_trans, apply_trans
 from .io.constants import FIFF
 from .io.write import (start_file, start_block, write_float, write_int,
@@ -41,6 +43,9 @@ from .externals.six import string_types
 # IEEE Trans Biomed Eng. 1992 39(9) : 986 - 990
 #
 
+# number of point-triangle pairs to compute at once
+_BEM_BUFFER_SIZE = 2 ** 18
+
 
 class ConductorModel(dict):
     """BEM or sphere model"""
@@ -66,34 +71,53 @@ class ConductorModel(dict):
         return None if len(self['layers']) == 0 else self['layers'][-1]['rad']
 
 
+def _dot(a, b):
+    """Helper for the dot products of vectors along the first axis"""
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _cross_sum(a, b, c):
+    """Helper for the triple products of vectors along the first axis"""
+    return ((a[1] * b[2] - a[2] * b[1]) * c[0] +
+            (a[2] * b[0] - a[0] * b[2]) * c[1] +
+            (a[0] * b[1] - a[1] * b[0]) * c[2])
+
+
 def _calc_beta(rk, rk_norm, rk1, rk1_norm):
     """These coefficients are used to calculate the magic vector omega"""
-    rkk1 = rk1[0] - rk[0]
-    size = np.sqrt(np.dot(rkk1, rkk1))
+    rkk1 = rk1[:, :1] - rk[:, :1]  # the triangle edge, same for all points
+    size = np.sqrt(_dot(rkk1, rkk1))
     rkk1 /= size
-    num = rk_norm + np.dot(rk, rkk1)
-    den = rk1_norm + np.dot(rk1, rkk1)
+    num = rk_norm + _dot(rk, rkk1)
+    den = rk1_norm + _dot(rk1, rkk1)
     res = np.log(num / den) / size
     return res
 
 
 def _lin_pot_coeff(fros, tri_rr, tri_nn, tri_area):
-    """The linear potential matrix element computations"""
-    from .source_space import _fast_cross_nd_sum
-    omega = np.zeros((len(fros), 3))
+    """The linear potential matrix element computations
 
+    The elements are computed for all points ``fros`` and all triangles
+    (with vertices ``tri_rr``, shape (n_tri, 3, 3)) at once, and returned
+    in an array of shape (3, n_fros, n_tri), one for each triangle vertex.
+    The coordinates of the vectors are kept along the first axis, which
+    makes the dot and cross products fast.
+    """
     # we replicate a little bit of the _get_solids code here for speed
-    v1 = tri_rr[np.newaxis, 0, :] - fros
-    v2 = tri_rr[np.newaxis, 1, :] - fros
-    v3 = tri_rr[np.newaxis, 2, :] - fros
-    triples = _fast_cross_nd_sum(v1, v2, v3)
-    l1 = np.sqrt(np.sum(v1 * v1, axis=1))
-    l2 = np.sqrt(np.sum(v2 * v2, axis=1))
-    l3 = np.sqrt(np.sum(v3 * v3, axis=1))
+    fros = fros.T[:, :, np.newaxis]
+    tri_rr = tri_rr.transpose(1, 2, 0)[:, :, np.newaxis, :]
+    tri_nn = tri_nn.T[:, np.newaxis, :]
+    v1 = tri_rr[0] - fros
+    v2 = tri_rr[1] - fros
+    v3 = tri_rr[2] - fros
+    triples = _cross_sum(v1, v2, v3)
+    l1 = np.sqrt(_dot(v1, v1))
+    l2 = np.sqrt(_dot(v2, v2))
+    l3 = np.sqrt(_dot(v3, v3))
     ss = (l1 * l2 * l3 +
-          np.sum(v1 * v2, axis=1) * l3 +
-          np.sum(v1 * v3, axis=1) * l2 +
-          np.sum(v2 * v3, axis=1) * l1)
+          _dot(v1, v2) * l3 +
+          _dot(v1, v3) * l2 +
+          _dot(v2, v3) * l1)
     solids = np.arctan2(triples, ss)
 
     # We *could* subselect the good points from v1, v2, v3, triples, solids,
@@ -107,9 +131,9 @@ def _lin_pot_coeff(fros, tri_rr, tri_nn, tri_area):
     l3[bad_mask] = 1.
 
     # Calculate the magic vector vec_omega
-    beta = [_calc_beta(v1, l1, v2, l2)[:, np.newaxis],
-            _calc_beta(v2, l2, v3, l3)[:, np.newaxis],
-            _calc_beta(v3, l3, v1, l1)[:, np.newaxis]]
+    beta = [_calc_beta(v1, l1, v2, l2),
+            _calc_beta(v2, l2, v3, l3),
+            _calc_beta(v3, l3, v1, l1)]
     vec_omega = (beta[2] - beta[0]) * v1
     vec_omega += (beta[0] - beta[1]) * v2
     vec_omega += (beta[1] - beta[2]) * v3
@@ -118,18 +142,47 @@ def _lin_pot_coeff(fros, tri_rr, tri_nn, tri_area):
     n2 = 1.0 / (area2 * area2)
     # leave omega = 0 otherwise
     # Put it all together...
+    omega = np.empty((3,) + solids.shape)
     yys = [v1, v2, v3]
     idx = [0, 1, 2, 0, 2]
     for k in range(3):
         diff = yys[idx[k - 1]] - yys[idx[k + 1]]
-        zdots = _fast_cross_nd_sum(yys[idx[k + 1]], yys[idx[k - 1]], tri_nn)
-        omega[:, k] = -n2 * (area2 * zdots * 2. * solids -
-                             triples * (diff * vec_omega).sum(axis=-1))
+        zdots = _cross_sum(yys[idx[k + 1]], yys[idx[k - 1]], tri_nn)
+        omega[k] = -n2 * (area2 * zdots * 2. * solids -
+                          triples * _dot(diff, vec_omega))
     # omit the bad points from the solution
-    omega[bad_mask] = 0.
+    omega[:, bad_mask] = 0.
     return omega
 
 
+def _lin_pot_coeff_rows(fros, fro_idx, tris, tri_rr, tri_nn, tri_area,
+                        n_cols):
+    """Compute the coefficients of some points in blocks of triangles
+
+    If ``fro_idx`` is not None, the points are the vertices with these
+    indices of the triangulation itself.
+    """
+    coeff = np.zeros((len(fros), n_cols))
+    n_block = max(_BEM_BUFFER_SIZE // max(len(fros), 1), 1)
+    for start in range(0, len(tris), n_block):
+        block = slice(start, start + n_block)
+        omega = _lin_pot_coeff(fros, tri_rr[block], tri_nn[block],
+                               tri_area[block])
+        if fro_idx is not None:
+            # No contribution from a triangle that this vertex belongs to
+            omega[:, (fro_idx[:, np.newaxis, np.newaxis] ==
+                      tris[np.newaxis, block]).any(axis=-1)] = 0.
+        # vertices shared by triangles of the block are accumulated by
+        # multiplying with the (sparse) triangle-vertex incidence matrix
+        n_tri = len(tris[block])
+        for k in range(3):
+            incidence = sparse.csr_matrix((np.ones(n_tri), (np.arange(n_tri),
+                                                            tris[block, k])),
+                                          shape=(n_tri, n_cols))
+            coeff -= (incidence.T * omega[k].T).T
+    return coeff
+
+
 def _correct_auto_elements(surf, mat):
     """Improve auto-element approximation..."""
     pi2 = 2.0 * np.pi
@@ -153,41 +206,29 @@ def _correct_auto_elements(surf, mat):
     return
 
 
-def _fwd_bem_lin_pot_coeff(surfs):
+@verbose
+def _fwd_bem_lin_pot_coeff(surfs, n_jobs=1, verbose=None):
     """Calculate the coefficients for linear collocation approach"""
     # taken from fwd_bem_linear_collocation.c
     nps = [surf['np'] for surf in surfs]
     np_tot = sum(nps)
     coeff = np.zeros((np_tot, np_tot))
     offsets = np.cumsum(np.concatenate(([0], nps)))
+    parallel, p_fun, n_jobs = parallel_func(_lin_pot_coeff_rows, n_jobs)
     for si_1, surf1 in enumerate(surfs):
-        rr_ord = np.arange(nps[si_1])
+        rows = [r for r in np.array_split(np.arange(nps[si_1]), n_jobs)
+                if len(r) > 0]
         for si_2, surf2 in enumerate(surfs):
             logger.info("        %s (%d) -> %s (%d) ..." %
                         (_bem_explain_surface(surf1['id']), nps[si_1],
                          _bem_explain_surface(surf2['id']), nps[si_2]))
             tri_rr = surf2['rr'][surf2['tris']]
-            tri_nn = surf2['tri_nn']
-            tri_area = surf2['tri_area']
             submat = coeff[offsets[si_1]:offsets[si_1 + 1],
                            offsets[si_2]:offsets[si_2 + 1]]  # view
-            for k in range(surf2['ntri']):
-                tri = surf2['tris'][k]
-                if si_1 == si_2:
-                    skip_idx = ((rr_ord == tri[0]) |
-                                (rr_ord == tri[1]) |
-                                (rr_ord == tri[2]))
-                else:
-                    skip_idx = list()
-                # No contribution from a triangle that
-                # this vertex belongs to
-                # if sidx1 == sidx2 and (tri == j).any():
-                #     continue
-                # Otherwise do the hard job
-                coeffs = _lin_pot_coeff(surf1['rr'], tri_rr[k], tri_nn[k],
-                                        tri_area[k])
-                coeffs[skip_idx] = 0.
-                submat[:, tri] -= coeffs
+            submat[:] = np.concatenate(parallel(p_fun(
+                surf1['rr'][r], r if si_1 == si_2 else None, surf2['tris'],
+                tri_rr, surf2['tri_nn'], surf2['tri_area'], nps[si_2])
+                for r in rows))
             if si_1 == si_2:
                 _correct_auto_elements(surf1, submat)
     return coeff
@@ -246,45 +287,61 @@ def _fwd_bem_ip_modify_solution(solution, ip_solution, ip_mult, n_tri):
     return
 
 
-def _fwd_bem_linear_collocation_solution(m):
-    """Compute the linear collocation potential solution"""
-    # first, add surface geometries
-    from .surface import _complete_surface_info
-    for surf in m['surfs']:
-        _complete_surface_info(surf, verbose=False)
-
+def _compute_linear_collocation(m, n_jobs):
+    """Helper to compute the linear collocation solution arrays"""
     logger.info('Computing the linear collocation solution...')
     logger.info('    Matrix coefficients...')
-    coeff = _fwd_bem_lin_pot_coeff(m['surfs'])
-    m['nsol'] = len(coeff)
+    coeff = _fwd_bem_lin_pot_coeff(m['surfs'], n_jobs)
     logger.info("    Inverting the coefficient matrix...")
     nps = [surf['np'] for surf in m['surfs']]
-    m['solution'] = _fwd_bem_multi_solution(coeff, m['gamma'], nps)
+    solution = _fwd_bem_multi_solution(coeff, m['gamma'], nps)
     if len(m['surfs']) == 3:
         ip_mult = m['sigma'][1] / m['sigma'][2]
         if ip_mult <= FIFF.FWD_BEM_IP_APPROACH_LIMIT:
             logger.info('IP approach required...')
             logger.info('    Matrix coefficients (homog)...')
-            coeff = _fwd_bem_lin_pot_coeff([m['surfs'][-1]])
+            coeff = _fwd_bem_lin_pot_coeff([m['surfs'][-1]], n_jobs)
             logger.info('    Inverting the coefficient matrix (homog)...')
             ip_solution = _fwd_bem_homog_solution(coeff,
                                                   [m['surfs'][-1]['np']])
             logger.info('    Modify the original solution to incorporate '
                         'IP approach...')
-            _fwd_bem_ip_modify_solution(m['solution'], ip_solution, ip_mult,
-                                        nps)
+            _fwd_bem_ip_modify_solution(solution, ip_solution, ip_mult, nps)
+    return dict(solution=solution)
+
+
+def _fwd_bem_linear_collocation_solution(m, n_jobs=1):
+    """Compute the linear collocation potential solution"""
+    # first, add surface geometries
+    from .surface import _complete_surface_info
+    for surf in m['surfs']:
+        _complete_surface_info(surf, verbose=False)
+
     m['bem_method'] = FIFF.FWD_BEM_LINEAR_COLL
+    key = ([float(sigma) for sigma in m['sigma']],
+           [(surf['rr'], surf['tris']) for surf in m['surfs']])
+    solution, cached = _get_cached('bem', key, _compute_linear_collocation,
+                                   m, n_jobs)
+    if cached:
+        logger.info('Using cached linear collocation solution')
+    m['solution'] = solution['solution']
+    m['nsol'] = len(m['solution'])
     logger.info("Solution ready.")
 
 
 @verbose
-def make_bem_solution(surfs, verbose=None):
+def make_bem_solution(surfs, n_jobs=1, verbose=None):
     """Create a BEM solution using the linear collocation approach
 
     Parameters
     ----------
     surfs : list of dict
         The BEM surfaces to use (`from make_bem_model`)
+    n_jobs : int
+        Number of jobs to run in parallel to compute the matrix
+        coefficients.
+
+        .. versionadded:: 0.11
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -297,6 +354,9 @@ def make_bem_solution(surfs, verbose=None):
     -----
     .. versionadded:: 0.10.0
 
+    Solutions can be stored in a persistent cache, see
+    :func:`mne.set_cache_dir`.
+
     See Also
     --------
     make_bem_model
@@ -318,7 +378,7 @@ def make_bem_solution(surfs, verbose=None):
         logger.info('Homogeneous model surface loaded.')
     else:
         raise RuntimeError('Only 1- or 3-layer BEM computations supported')
-    _fwd_bem_linear_collocation_solution(bem)
+    _fwd_bem_linear_collocation_solution(bem, n_jobs)
     logger.info('BEM geometry computations complete.')
     return bem
 
@@ -17,6 +17,9 @@ from .utils import verbose, logger, check_version
 from .fixes import partial
 from .externals.six import string_types
 
+# number of data points used at once to fit the cHPI amplitudes
+_CHPI_BUFFER_SIZE = 2 ** 22
+
 
 # ############################################################################
 # Reading from text or FIF file
@@ -246,6 +249,49 @@ def _fit_chpi_pos(est_pos_dev, hpi_head_rrs, x0):
     return x, 1. - objective(x) / denom
 
 
+def _iter_chpi_amplitudes(raw, picks_chpi, fit_starts, n_window, model,
+                          inv_model):
+    """Fit the cHPI sinusoid amplitudes for many windows at once
+
+    The windows are read from raw in blocks and the fits of all windows of
+    a block are done using a single matrix product. A block is limited both
+    by the samples read (which include the gaps between windows) and by the
+    samples of its windows (which can overlap). For each window, this
+    yields the cHPI channel data, the fitted model parameters and the
+    goodness of fit (overall and per channel).
+    """
+    n_chan = len(picks_chpi) - 1
+    n_block = max(int(_CHPI_BUFFER_SIZE // (len(picks_chpi) * n_window)), 1)
+    n_span = max(int(_CHPI_BUFFER_SIZE // len(picks_chpi)), n_window)
+    offsets = np.arange(n_window)
+    bi = 0
+    while bi < len(fit_starts):
+        stop = np.searchsorted(fit_starts, fit_starts[bi] + n_span - n_window,
+                               'right')
+        stop = min(max(stop, bi + 1), bi + n_block)
+        starts = fit_starts[bi:stop]
+        bi = stop
+        first = starts[0]
+        block = raw[picks_chpi, first:starts[-1] + n_window][0]
+        idx = starts[:, np.newaxis] - first + offsets
+        chpi_data = block[-1][idx]  # n_windows x n_window
+        # n_chan * n_windows x n_window
+        data = block[:-1][:, idx].reshape(-1, n_window)
+        del block
+        X = np.dot(data, inv_model.T)
+        data_diff = np.dot(X, model.T) - data
+        data_diff *= data_diff
+        data *= data
+        diff_ss = data_diff.sum(axis=1).reshape(n_chan, len(starts))
+        data_ss = data.sum(axis=1).reshape(n_chan, len(starts))
+        del data_diff, data
+        g_chan = 1 - np.sqrt(diff_ss / data_ss)
+        g_sin = 1 - np.sqrt(diff_ss.sum(axis=0) / data_ss.sum(axis=0))
+        X = X.reshape(n_chan, len(starts), -1)
+        for wi in range(len(starts)):
+            yield chpi_data[wi], X[:, wi].T, g_sin[wi], g_chan[:, wi]
+
+
 def _angle_between_quats(x, y):
     """Compute the angle between two quaternions w/3-element representations"""
     # convert to complete quaternion representation
@@ -354,23 +400,15 @@ def _calculate_chpi_positions(raw, t_step_min=0.1, t_step_max=10.,
     corr_limit = 0.98
     quats = []
     est_pos_dev = apply_trans(head_dev_t, orig_head_rrs)
-    for start, t in zip(fit_starts, fit_times):
-        #
-        # 1. Fit amplitudes for each channel from each of the N cHPI sinusoids
-        #
-        meg_chpi_data = raw[picks_chpi, start:start + n_window][0]
-        this_data = meg_chpi_data[:-1]
-        chpi_data = meg_chpi_data[-1]
+    #
+    # 1. Fit amplitudes for each channel from each of the N cHPI sinusoids
+    #
+    amplitudes = _iter_chpi_amplitudes(raw, picks_chpi, fit_starts, n_window,
+                                       model, inv_model)
+    for t, (chpi_data, X, g_sin, g_chan) in zip(fit_times, amplitudes):
         if not (chpi_data == hpi_on).all():
             logger.info('HPI not turned on (t=%7.3f)' % t)
             continue
-        X = np.dot(inv_model, this_data.T)
-        data_diff = np.dot(model, X).T - this_data
-        data_diff *= data_diff
-        this_data *= this_data
-        g_chan = (1 - np.sqrt(data_diff.sum(axis=1) / this_data.sum(axis=1)))
-        g_sin = (1 - np.sqrt(data_diff.sum() / this_data.sum()))
-        del data_diff, this_data
         X_sin, X_cos = X[:n_freqs], X[n_freqs:2 * n_freqs]
         s_fit = np.sqrt(X_cos * X_cos + X_sin * X_sin)
         if last_data_fit is None:  # first iteration
@@ -2,5 +2,6 @@
 """
 
 from .utils import seed_target_indices
-from .spectral import spectral_connectivity
+from .spectral import (spectral_connectivity, read_connectivity_state,
+                       write_connectivity_state)
 from .effective import phase_slope_index
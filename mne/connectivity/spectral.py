@@ -18,7 +18,8 @@ from ..time_frequency.multitaper import (dpss_windows, _mt_spectra,
                                          _psd_from_mt, _csd_from_mt,
                                          _psd_from_mt_adaptive)
 from ..time_frequency.tfr import morlet, cwt
-from ..utils import logger, verbose, _time_mask
+from ..utils import logger, verbose, _time_mask, check_fname
+from ..externals.h5io import write_hdf5, read_hdf5
 
 ########################################################################
 # Various connectivity estimators
@@ -418,7 +419,11 @@ def _epoch_spectral_connectivity(data, sig_idx, tmin_idx, tmax_idx, sfreq,
         method.start_epoch()
 
     # accumulate connectivity scores
-    if mode in ['multitaper', 'fourier']:
+    if mode in ['multitaper', 'fourier'] and 4 * n_cons >= len(x_mt) ** 2:
+        # many connections: compute the CSD between all signals at once
+        _accumulate_dense_csd(x_mt, weights, idx_map, block_size,
+                              con_methods)
+    elif mode in ['multitaper', 'fourier']:
         for i in range(0, n_cons, block_size):
             con_idx = slice(i, i + block_size)
             if mt_adaptive:
@@ -446,6 +451,40 @@ def _epoch_spectral_connectivity(data, sig_idx, tmin_idx, tmax_idx, sfreq,
     return con_methods, psd
 
 
+def _accumulate_dense_csd(x_mt, weights, idx_map, block_size, con_methods):
+    """Accumulate the CSD of many connections using dense cross-spectra
+
+    The CSD between a tile of signals and all signals is computed at once
+    for all frequencies, and the connections of the tile are then picked
+    from it. Tiles are chosen so that at most about block_size cross-spectra
+    are computed at once.
+    """
+    n_signals = len(x_mt)
+    # normalize the weighted tapered spectra so the CSD is a sum of products
+    norm = np.sqrt((weights * weights.conj()).real.sum(axis=-2))
+    z_mt = (weights * x_mt) / norm[:, np.newaxis]
+    z_mt = np.ascontiguousarray(z_mt.transpose(2, 0, 1))  # freq, sig, taper
+    z_mt_conj = z_mt.conj()
+
+    rows, cols = idx_map
+    in_order = np.all(np.diff(rows) >= 0)
+    if not in_order:
+        order = np.argsort(rows, kind='mergesort')
+        rows, cols = rows[order], cols[order]
+    n_tile = max(block_size // n_signals, 1)
+    for start in range(0, n_signals, n_tile):
+        lo, hi = np.searchsorted(rows, [start, start + n_tile])
+        if lo == hi:
+            continue
+        csd = np.einsum('fit,fjt->fij', z_mt[:, start:start + n_tile],
+                        z_mt_conj)
+        csd = csd.reshape(len(csd), -1)
+        csd = 2 * csd[:, (rows[lo:hi] - start) * n_signals + cols[lo:hi]].T
+        con_idx = slice(lo, hi) if in_order else order[lo:hi]
+        for method in con_methods:
+            method.accumulate(con_idx, csd)
+
+
 def _get_n_epochs(epochs, n):
     """Generator that returns lists with at most n epochs"""
     epochs_out = []
@@ -511,6 +550,114 @@ _CON_METHOD_MAP = {'coh': _CohEst, 'cohy': _CohyEst, 'imcoh': _ImCohEst,
                    'wpli2_debiased': _WPLIDebiasedEst}
 
 
+def _get_state_method_names(con_method_types):
+    """Helper to get the names of the methods stored in a state"""
+    names = list()
+    for mtype in con_method_types:
+        name = [k for k, v in _CON_METHOD_MAP.items() if v is mtype]
+        if len(name) == 0:
+            raise ValueError('Estimator states can only be used with the '
+                             'built-in connectivity methods')
+        names.append(name[0])
+    return names
+
+
+def _check_state(state, method, mode, sfreq, n_signals, times, freqs, indices,
+                 n_tapers, half_nbw, mt_adaptive):
+    """Helper to make sure an estimator state matches the computation"""
+    for key in ('method', 'mode', 'sfreq', 'times', 'freqs', 'fmin', 'fmax',
+                'indices', 'n_signals', 'n_epochs', 'n_tapers', 'half_nbw',
+                'mt_adaptive', 'psd', 'acc'):
+        if key not in state:
+            raise ValueError('Invalid estimator state, %s is missing' % key)
+    if list(state['method']) != list(method):
+        raise ValueError('The estimator state was computed for the methods '
+                         '%s, not %s' % (state['method'], method))
+    if state['mode'] != mode:
+        raise ValueError('The estimator state was computed using mode "%s", '
+                         'not "%s"' % (state['mode'], mode))
+    if not np.allclose(state['sfreq'], sfreq):
+        raise ValueError('The estimator state was computed for sfreq=%s, '
+                         'not %s' % (state['sfreq'], sfreq))
+    if state['n_tapers'] != n_tapers or state['half_nbw'] != half_nbw or \
+            bool(state['mt_adaptive']) != bool(mt_adaptive):
+        raise ValueError('The estimator state was computed with different '
+                         'multitaper settings (%s tapers, half bandwidth %s, '
+                         'adaptive=%s)' % (state['n_tapers'],
+                                           state['half_nbw'],
+                                           state['mt_adaptive']))
+    if state['n_signals'] != n_signals or \
+            not np.array_equal(state['indices'][0], indices[0]) or \
+            not np.array_equal(state['indices'][1], indices[1]):
+        raise ValueError('The estimator state was computed for different '
+                         'connections')
+    if len(state['times']) != len(times) or \
+            not np.allclose(state['times'], times):
+        raise ValueError('The estimator state was computed for different '
+                         'time points')
+    if len(state['freqs']) != len(freqs) or \
+            not np.allclose(state['freqs'], freqs):
+        raise ValueError('The estimator state was computed for different '
+                         'frequencies')
+
+
+def write_connectivity_state(fname, state, overwrite=False):
+    """Write a spectral connectivity estimator state to disk
+
+    Parameters
+    ----------
+    fname : str
+        The file name, which should end with -con.h5 .
+    state : dict
+        The estimator state, as returned by
+        ``spectral_connectivity(..., return_state=True)``.
+    overwrite : bool
+        If True, overwrite file (if it exists). Defaults to False.
+
+    See Also
+    --------
+    read_connectivity_state, spectral_connectivity
+
+    Notes
+    -----
+    .. versionadded:: 0.11
+    """
+    check_fname(fname, 'connectivity state', ('-con.h5',))
+    state = dict((key, val) for key, val in state.items()
+                 if val is not None)
+    write_hdf5(fname, state, overwrite=overwrite, title='mnepython')
+
+
+def read_connectivity_state(fname):
+    """Read a spectral connectivity estimator state from disk
+
+    Parameters
+    ----------
+    fname : str
+        The file name, which should end with -con.h5 .
+
+    Returns
+    -------
+    state : dict
+        The estimator state, which can be passed to
+        ``spectral_connectivity(..., state=state)``.
+
+    See Also
+    --------
+    write_connectivity_state, spectral_connectivity
+
+    Notes
+    -----
+    .. versionadded:: 0.11
+    """
+    check_fname(fname, 'connectivity state', ('-con.h5',))
+    logger.info('Reading %s ...' % fname)
+    state = read_hdf5(fname, title='mnepython')
+    for key in ('psd', 'n_tapers', 'half_nbw'):
+        state[key] = state.get(key, None)
+    return state
+
+
 @verbose
 def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
                           mode='multitaper', fmin=None, fmax=np.inf,
@@ -518,7 +665,7 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
                           mt_bandwidth=None, mt_adaptive=False,
                           mt_low_bias=True, cwt_frequencies=None,
                           cwt_n_cycles=7, block_size=1000, n_jobs=1,
-                          verbose=None):
+                          state=None, return_state=False, verbose=None):
     """Compute frequency-domain and time-frequency domain connectivity measures
 
     The connectivity method(s) are specified using the "method" parameter.
@@ -547,6 +694,18 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
     In this case con_flat.shape = (3, n_freqs). The connectivity scores are
     in the same order as defined indices.
 
+    The accumulated spectral estimates can be returned as an estimator state
+    using ``return_state=True`` and passed back in using "state". This makes
+    it possible to process the epochs in several chunks, e.g., on different
+    machines or to resume a computation, and to merge the results::
+
+        _, _, _, _, _, state_1 = spectral_connectivity(epochs_1, ...,
+                                                       return_state=True)
+        write_connectivity_state('chunk_1-con.h5', state_1)
+        ...
+        con, freqs, times, n_epochs, n_tapers = spectral_connectivity(
+            epochs_2, ..., state=['chunk_1-con.h5'])
+
     **Supported Connectivity Measures**
 
     The connectivity method(s) is specified using the "method" parameter. The
@@ -679,9 +838,25 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
         'cwt_morlet' mode.
     block_size : int
         How many connections to compute at once (higher numbers are faster
-        but require more memory).
+        but require more memory). In 'multitaper' and 'fourier' modes, when
+        connectivity is computed for many pairs of signals, the
+        cross-spectra between tiles of signals and all signals are computed
+        at once, with tiles small enough for about block_size connections.
     n_jobs : int
         How many epochs to process in parallel.
+    state : dict | str | list of dict or str | None
+        Estimator state(s), or file names of states saved using
+        :func:`write_connectivity_state`, accumulated from other epochs with
+        the same parameters. The states are combined with the estimates
+        from "data", which can be empty if only states are to be merged.
+        Only the built-in connectivity methods are supported.
+
+        .. versionadded:: 0.11
+    return_state : bool
+        If True, also return the estimator state that includes "data" and
+        all the merged states.
+
+        .. versionadded:: 0.11
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -704,6 +879,8 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
     n_tapers : int
         The number of DPSS tapers used. Only defined in 'multitaper' mode.
         Otherwise None is returned.
+    state : dict
+        The estimator state. Only returned if ``return_state=True``.
     """
     if n_jobs > 1:
         parallel, my_epoch_spectral_connectivity, _ = \
@@ -755,6 +932,16 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
     # if none of the comp_con functions needs the PSD, we don't estimate it
     accumulate_psd = any(n == 5 for n in n_comp_args)
 
+    # estimator states accumulated elsewhere, to be merged with ours
+    if state is None:
+        state = list()
+    elif not isinstance(state, (list, tuple)):
+        state = [state]
+    state = [read_connectivity_state(s) if isinstance(s, string_types) else s
+             for s in state]
+    if len(state) > 0 or return_state:
+        method_names = _get_state_method_names(con_method_types)
+
     if isinstance(data, Epochs):
         times_in = data.times  # input times for Epochs input type
         sfreq = data.info['sfreq']
@@ -764,6 +951,8 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
     epoch_idx = 0
     logger.info('Connectivity computation...')
     for epoch_block in _get_n_epochs(data, n_jobs):
+        if len(epoch_block) == 0:
+            continue
 
         if epoch_idx == 0:
             # initialize everything
@@ -907,7 +1096,7 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
                 window_fun = np.hanning(n_times)
                 mt_adaptive = False
                 eigvals = 1.
-                n_tapers = None
+                n_tapers = half_nbw = None
                 n_times_spectrum = 0  # this method only uses the freq. domain
                 wavelets = None
             elif mode == 'cwt_morlet':
@@ -928,7 +1117,8 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
                 wavelets = morlet(sfreq, freqs,
                                   n_cycles=cwt_n_cycles, zero_mean=True)
                 eigvals = None
-                n_tapers = None
+                n_tapers = half_nbw = None
+                mt_adaptive = False
                 window_fun = None
                 n_times_spectrum = n_times
             else:
@@ -999,8 +1189,62 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
 
             epoch_idx += len(epoch_block)
 
-    # normalize
+    if epoch_idx == 0:
+        # no data, take the setup from the first state
+        if len(state) == 0:
+            raise ValueError('No epochs were provided to compute '
+                             'connectivity')
+        first = state[0]
+        n_signals = int(first['n_signals'])
+        times = np.asarray(first['times'])
+        freqs = np.asarray(first['freqs'])
+        fmin, fmax = first['fmin'], first['fmax']
+        n_freqs, n_tapers = len(freqs), first['n_tapers']
+        sfreq, half_nbw = float(first['sfreq']), first['half_nbw']
+        mt_adaptive = bool(first['mt_adaptive'])
+        indices_use = tuple(np.asarray(ind) for ind in first['indices'])
+        if indices is not None:
+            indices = check_indices(indices)
+            if not (np.array_equal(indices[0], indices_use[0]) and
+                    np.array_equal(indices[1], indices_use[1])):
+                raise ValueError('The estimator state was computed for '
+                                 'different connections')
+        n_cons = len(indices_use[0])
+        freq_idx_bands = [np.where((freqs >= fl) & (freqs <= fu))[0]
+                          for fl, fu in zip(fmin, fmax)]
+        freqs_bands = [freqs[freq_idx] for freq_idx in freq_idx_bands]
+        sig_idx = np.unique(np.r_[indices_use[0], indices_use[1]])
+        idx_map = [np.searchsorted(sig_idx, ind) for ind in indices_use]
+        n_times_spectrum = len(times) if mode == 'cwt_morlet' else 0
+        psd = np.zeros_like(first['psd']) if accumulate_psd else None
+        con_methods = [mtype(n_cons, n_freqs, n_times_spectrum)
+                       for mtype in con_method_types]
+
+    # merge the estimator states
+    for this_state in state:
+        _check_state(this_state, method_names, mode, sfreq, n_signals, times,
+                     freqs, indices_use, n_tapers, half_nbw, mt_adaptive)
+        logger.info('    merging estimator state of %d epochs'
+                    % this_state['n_epochs'])
+        for method, acc in zip(con_methods, this_state['acc']):
+            method._acc += acc
+        if accumulate_psd:
+            psd += this_state['psd']
+        epoch_idx += int(this_state['n_epochs'])
+
     n_epochs = epoch_idx
+    if return_state:
+        state = dict(method=method_names, mode=mode, sfreq=float(sfreq),
+                     times=times.copy(), freqs=freqs.copy(),
+                     fmin=np.array(fmin, float), fmax=np.array(fmax, float),
+                     indices=[np.array(ind) for ind in indices_use],
+                     n_signals=n_signals, n_epochs=n_epochs,
+                     n_tapers=n_tapers, half_nbw=half_nbw,
+                     mt_adaptive=bool(mt_adaptive),
+                     psd=psd.copy() if accumulate_psd else None,
+                     acc=[method._acc.copy() for method in con_methods])
+
+    # normalize
     if accumulate_psd:
         psd /= n_epochs
 
@@ -1059,4 +1303,6 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
         # for each band we return the frequencies that were averaged
         freqs = freqs_bands
 
+    if return_state:
+        return con, freqs, times, n_epochs, n_tapers, state
     return con, freqs, times, n_epochs, n_tapers
@@ -6,11 +6,15 @@ from nose.plugins.skip import SkipTest
 import warnings
 
 from mne.fixes import tril_indices
-from mne.connectivity import spectral_connectivity
-from mne.connectivity.spectral import _CohEst
+from mne.connectivity import (spectral_connectivity, read_connectivity_state,
+                              write_connectivity_state)
+from mne.connectivity.spectral import (_CohEst, _WPLIEst,
+                                       _accumulate_dense_csd)
+from mne.time_frequency.multitaper import _csd_from_mt
 
 from mne import SourceEstimate
-from mne.utils import run_tests_if_main, slow_test
+from mne.utils import (run_tests_if_main, slow_test, requires_h5py,
+                       _TempDir)
 from mne.filter import band_pass_filter
 
 warnings.simplefilter('always')
@@ -224,4 +228,108 @@ def test_spectral_connectivity():
                             assert_array_almost_equal(con2_avg, con3[j][:, i])
 
 
+def test_dense_csd():
+    """Test CSD accumulation of many connections with dense cross-spectra"""
+    rng = np.random.RandomState(0)
+    n_signals, n_tapers, n_freqs = 6, 3, 10
+    x_mt = (rng.randn(n_signals, n_tapers, n_freqs) +
+            1j * rng.randn(n_signals, n_tapers, n_freqs))
+    # connections in any order, including repeated ones
+    rows, cols = tril_indices(n_signals, -1)
+    order = rng.permutation(len(rows))
+    for idx_map in ((rows, cols), (np.r_[rows[order], 2], np.r_[cols, 0]),
+                    (cols, rows)):
+        n_cons = len(idx_map[0])
+        for weights in (np.ones((1, n_tapers, 1)),
+                        rng.rand(n_signals, n_tapers, n_freqs)):
+            csd = _csd_from_mt(x_mt[idx_map[0]], x_mt[idx_map[1]],
+                               weights[idx_map[0] % len(weights)],
+                               weights[idx_map[1] % len(weights)])
+            for block_size in (1, 10, 1000):
+                methods = [_CohEst(n_cons, n_freqs, 0),
+                           _WPLIEst(n_cons, n_freqs, 0)]
+                _accumulate_dense_csd(x_mt, weights, idx_map, block_size,
+                                      methods)
+                assert_array_almost_equal(methods[0]._acc, csd)
+                assert_array_almost_equal(methods[1]._acc[0], csd.imag)
+
+
+def test_connectivity_state():
+    """Test merging of spectral connectivity estimator states"""
+    rng = np.random.RandomState(0)
+    sfreq = 50.
+    data = rng.randn(6, 4, 100)
+    indices = (np.array([0, 0, 2]), np.array([1, 3, 3]))
+    method = ['coh', 'pli', 'wpli2_debiased']
+    for mode, kwargs in (('multitaper', dict()),
+                         ('cwt_morlet', dict(cwt_frequencies=np.array(
+                             [10., 15.]), cwt_n_cycles=3))):
+        for this_indices in (None, indices):
+            kwargs.update(method=method, mode=mode, sfreq=sfreq,
+                          indices=this_indices)
+            out = spectral_connectivity(data, **kwargs)
+            out_1 = spectral_connectivity(data[:2], return_state=True,
+                                          **kwargs)
+            assert_true(out_1[-1]['n_epochs'] == 2)
+            # resume from the first chunk
+            out_2 = spectral_connectivity(data[2:], state=out_1[-1],
+                                          return_state=True, **kwargs)
+            assert_true(out_2[-1]['n_epochs'] == 6)
+            out_3 = spectral_connectivity(data[2:5], return_state=True,
+                                          n_jobs=2, **kwargs)
+            # merge states without any data
+            out_4 = spectral_connectivity(
+                [], state=[out_1[-1], out_3[-1]], **kwargs)
+            out_5 = spectral_connectivity(data[5:], state=[out_1[-1],
+                                                           out_3[-1]],
+                                          **kwargs)
+            for this_out in (out_2, out_5):
+                for con, this_con in zip(out[0], this_out[0]):
+                    assert_array_almost_equal(con, this_con)
+                assert_array_almost_equal(out[1], this_out[1])
+                assert_array_almost_equal(out[2], this_out[2])
+                assert_true(out[3] == this_out[3])
+                assert_true(out[4] == this_out[4])
+            assert_true(out_4[3] == 5)
+            assert_array_almost_equal(out_4[1], out[1])
+    assert_raises(ValueError, spectral_connectivity, [], **kwargs)
+    assert_raises(ValueError, spectral_connectivity, data,
+                  state=out_1[-1], **dict(kwargs, method='coh'))
+    assert_raises(ValueError, spectral_connectivity, data,
+                  state=out_1[-1], **dict(kwargs, mode='multitaper'))
+    assert_raises(ValueError, spectral_connectivity, data[:, :, :50],
+                  state=out_1[-1], **kwargs)
+    # states must have been computed with the same tapers
+    kwargs = dict(method='coh', mode='multitaper', sfreq=sfreq)
+    state = spectral_connectivity(data[:2], return_state=True, **kwargs)[-1]
+    for extra in (dict(mt_bandwidth=4.2), dict(mt_adaptive=True),
+                  dict(sfreq=2 * sfreq)):
+        assert_raises(ValueError, spectral_connectivity, data[2:],
+                      state=state, **dict(kwargs, **extra))
+
+
+@requires_h5py
+def test_connectivity_state_io():
+    """Test reading and writing of connectivity estimator states"""
+    tempdir = _TempDir()
+    rng = np.random.RandomState(0)
+    data = rng.randn(4, 3, 100)
+    kwargs = dict(method=['coh', 'plv'], sfreq=50., mode='fourier')
+    out = spectral_connectivity(data, **kwargs)
+    fnames = list()
+    for ii in range(2):
+        state = spectral_connectivity(data[2 * ii:2 * ii + 2],
+                                      return_state=True, **kwargs)[-1]
+        fnames.append(os.path.join(tempdir, 'chunk%d-con.h5' % ii))
+        write_connectivity_state(fnames[-1], state)
+        assert_raises(IOError, write_connectivity_state, fnames[-1], state)
+    state = read_connectivity_state(fnames[0])
+    assert_true(state['n_tapers'] is None)
+    assert_array_almost_equal(state['acc'][0], spectral_connectivity(
+        data[:2], return_state=True, **kwargs)[-1]['acc'][0])
+    out_2 = spectral_connectivity([], state=fnames, **kwargs)
+    for con, this_con in zip(out[0], out_2[0]):
+        assert_array_almost_equal(con, this_con)
+
+
 run_tests_if_main()
@@ -31,8 +31,10 @@ from .io.write import (start_block, end_block, write_int, write_name_list,
                        write_double, write_float_matrix, write_string)
 from .defaults import _handle_default
 from .epochs import _is_good
+from .parallel import parallel_func
 from .utils import (check_fname, logger, verbose, estimate_rank,
-                    _compute_row_norms, check_version, _time_mask)
+                    _compute_row_norms, check_version, _time_mask,
+                    _update_moments)
 
 from .externals.six.moves import zip
 from .externals.six import string_types
@@ -348,9 +350,142 @@ def _check_n_samples(n_samples, n_chan):
         logger.warning(text)
 
 
+class CovarianceAccumulator(object):
+    """Accumulate a covariance matrix over chunks of data.
+
+    The mean and the sum of squared deviations from the mean are updated
+    one chunk at a time using the numerically stable pairwise update of
+    Chan et al. [1]_, so the data never need to be in memory at once.
+    Accumulators computed on different parts of the data (e.g., different
+    runs, or in different processes) can be combined using :meth:`merge`.
+
+    Parameters
+    ----------
+    ch_names : list of str
+        The names of the channels (rows of the data chunks).
+    bads : list of str
+        The bad channels.
+    projs : list of Projection
+        The projectors to store with the covariance.
+
+    Attributes
+    ----------
+    n_samples : int
+        The number of samples (columns of the data chunks) accumulated.
+    mean : array, shape (n_channels,)
+        The mean of the data.
+
+    See Also
+    --------
+    compute_covariance
+    compute_raw_covariance
+
+    Notes
+    -----
+    .. versionadded:: 0.11
+
+    References
+    ----------
+    .. [1] Chan, T. F., Golub, G. H., LeVeque, R. J. (1979). Updating
+           formulae and a pairwise algorithm for computing sample variances.
+           Technical Report STAN-CS-79-773, Stanford University.
+    """
+
+    def __init__(self, ch_names, bads=(), projs=()):
+        self.ch_names = list(ch_names)
+        self.bads = list(bads)
+        self.projs = cp.deepcopy(list(projs))
+        self.n_samples = 0
+        n_channels = len(self.ch_names)
+        self.mean = np.zeros(n_channels)
+        self._m2 = np.zeros((n_channels, n_channels))
+
+    def __repr__(self):
+        return '<CovarianceAccumulator  |  n_channels : %d, n_samples : %d>' \
+            % (len(self.ch_names), self.n_samples)
+
+    def _update(self, n_samples, mean, m2):
+        """Helper to combine the statistics with those of other data"""
+        self.n_samples = _update_moments(self.n_samples, self.mean, self._m2,
+                                         n_samples, mean, m2, outer=True)
+
+    def partial_fit(self, data):
+        """Add a chunk of data to the covariance.
+
+        Parameters
+        ----------
+        data : array, shape (n_channels, n_times)
+            The data.
+
+        Returns
+        -------
+        self : instance of CovarianceAccumulator
+            The accumulator.
+        """
+        data = np.asarray(data)
+        if data.ndim != 2 or len(data) != len(self.ch_names):
+            raise ValueError('data must have shape (%d, n_times), got %s'
+                             % (len(self.ch_names), data.shape))
+        if data.shape[1] > 0:
+            mean = data.mean(axis=1)
+            data = data - mean[:, np.newaxis]
+            self._update(data.shape[1], mean, np.dot(data, data.T))
+        return self
+
+    def merge(self, other):
+        """Add the data accumulated by another accumulator.
+
+        Parameters
+        ----------
+        other : instance of CovarianceAccumulator
+            The accumulator to merge. It must use the same channels.
+
+        Returns
+        -------
+        self : instance of CovarianceAccumulator
+            The accumulator.
+        """
+        if not isinstance(other, CovarianceAccumulator):
+            raise TypeError('other must be an instance of '
+                            'CovarianceAccumulator, got %s' % type(other))
+        if other.ch_names != self.ch_names:
+            raise ValueError('Both accumulators must have the same list of '
+                             'channels.')
+        self._update(other.n_samples, other.mean, other._m2)
+        return self
+
+    def _get_data(self, assume_centered, ddof):
+        """Helper to get the covariance matrix"""
+        _check_n_samples(self.n_samples, len(self.ch_names))
+        data = self._m2.copy()
+        if assume_centered:
+            data += self.n_samples * np.outer(self.mean, self.mean)
+        return data / (self.n_samples - ddof)
+
+    def get_covariance(self, assume_centered=False):
+        """Get the covariance of the accumulated data.
+
+        Parameters
+        ----------
+        assume_centered : bool
+            If True, the data are assumed to have zero mean, and the second
+            moments are divided by the number of samples. Otherwise the
+            mean is removed and the unbiased estimate is returned.
+
+        Returns
+        -------
+        cov : instance of Covariance
+            The covariance.
+        """
+        ddof = 0 if assume_centered else 1
+        return Covariance(self._get_data(assume_centered, ddof),
+                          self.ch_names, self.bads, cp.deepcopy(self.projs),
+                          nfree=self.n_samples)
+
+
 @verbose
 def compute_raw_covariance(raw, tmin=None, tmax=None, tstep=0.2,
-                           reject=None, flat=None, picks=None,
+                           reject=None, flat=None, picks=None, n_jobs=1,
                            verbose=None):
     """Estimate noise covariance matrix from a continuous segment of raw data.
 
@@ -363,8 +498,9 @@ def compute_raw_covariance(raw, tmin=None, tmax=None, tstep=0.2,
 
     Parameters
     ----------
-    raw : instance of Raw
-        Raw data
+    raw : instance of Raw | list of Raw
+        Raw data. If a list, the covariance is computed from all runs,
+        which must have the same channels.
     tmin : float | None (default None)
         Beginning of time interval in seconds
     tmax : float | None (default None)
@@ -390,6 +526,11 @@ def compute_raw_covariance(raw, tmin=None, tmax=None, tstep=0.2,
     picks : array-like of int | None (default None)
         Indices of channels to include (if None, all channels
         except bad channels are used).
+    n_jobs : int (default 1)
+        Number of jobs to run in parallel. The data chunks of each run are
+        split over the jobs.
+
+        .. versionadded:: 0.11
     verbose : bool | str | int | None (default None)
         If not None, override default verbose level (see mne.verbose).
 
@@ -401,55 +542,70 @@ def compute_raw_covariance(raw, tmin=None, tmax=None, tstep=0.2,
     See Also
     --------
     compute_covariance : Estimate noise covariance matrix from epochs
+    CovarianceAccumulator : Accumulate a covariance over chunks of data
     """
-    sfreq = raw.info['sfreq']
-
-    # Convert to samples
-    start = 0 if tmin is None else int(floor(tmin * sfreq))
-    if tmax is None:
-        stop = int(raw.last_samp - raw.first_samp)
-    else:
-        stop = int(ceil(tmax * sfreq))
-    step = int(ceil(tstep * raw.info['sfreq']))
+    raws = raw if isinstance(raw, (list, tuple)) else [raw]
+    raw = raws[0]
 
     # don't exclude any bad channels, inverses expect all channels present
     if picks is None:
         picks = pick_types(raw.info, meg=True, eeg=True, eog=False,
                            ref_meg=False, exclude=[])
-
-    data = 0
-    n_samples = 0
-    mu = 0
+    for this_raw in raws[1:]:
+        if this_raw.ch_names != raw.ch_names:
+            raise ValueError('All raw instances must have the same channels')
 
     info = pick_info(raw.info, picks)
     idx_by_type = channel_indices_by_type(info)
+    ch_names = [raw.info['ch_names'][k] for k in picks]
+    bads = [b for b in raw.info['bads'] if b in ch_names]
+    # XXX : do not compute eig and eigvec now (think it's better...)
+    acc = CovarianceAccumulator(ch_names, bads, raw.info['projs'])
+
+    # Read data in chuncks, spread over the jobs
+    parallel, p_fun, n_jobs = parallel_func(_accumulate_raw_covariance,
+                                            n_jobs)
+    jobs = list()
+    for this_raw in raws:
+        sfreq = this_raw.info['sfreq']
+
+        # Convert to samples
+        start = 0 if tmin is None else int(floor(tmin * sfreq))
+        if tmax is None:
+            stop = int(this_raw.last_samp - this_raw.first_samp)
+        else:
+            stop = int(ceil(tmax * sfreq))
+        step = int(ceil(tstep * sfreq))
+        firsts = np.arange(start, stop, step)
+        jobs.extend((this_raw, these_firsts, step, stop)
+                    for these_firsts in np.array_split(firsts, n_jobs)
+                    if len(these_firsts) > 0)
+    for this_acc in parallel(p_fun(this_raw, these_firsts, step, stop, picks,
+                                   info, idx_by_type, reject, flat)
+                             for this_raw, these_firsts, step, stop in jobs):
+        acc.merge(this_acc)
+
+    cov = acc.get_covariance()
+    logger.info("Number of samples used : %d" % acc.n_samples)
+    logger.info('[done]')
+    return cov
+
 
-    # Read data in chuncks
-    for first in range(start, stop, step):
+def _accumulate_raw_covariance(raw, firsts, step, stop, picks, info,
+                               idx_by_type, reject, flat):
+    """Helper to accumulate the covariance of good raw data chunks"""
+    acc = CovarianceAccumulator(info['ch_names'])
+    for first in firsts:
         last = first + step
         if last >= stop:
             last = stop
         raw_segment, times = raw[picks, first:last]
         if _is_good(raw_segment, info['ch_names'], idx_by_type, reject, flat,
                     ignore_chs=info['bads']):
-            mu += raw_segment.sum(axis=1)
-            data += np.dot(raw_segment, raw_segment.T)
-            n_samples += raw_segment.shape[1]
+            acc.partial_fit(raw_segment)
         else:
             logger.info("Artefact detected in [%d, %d]" % (first, last))
-
-    _check_n_samples(n_samples, len(picks))
-    mu /= n_samples
-    data -= n_samples * mu[:, None] * mu[None, :]
-    data /= (n_samples - 1.0)
-    logger.info("Number of samples used : %d" % n_samples)
-    logger.info('[done]')
-
-    ch_names = [raw.info['ch_names'][k] for k in picks]
-    bads = [b for b in raw.info['bads'] if b in ch_names]
-    projs = cp.deepcopy(raw.info['projs'])
-    # XXX : do not compute eig and eigvec now (think it's better...)
-    return Covariance(data, ch_names, bads, projs, nfree=n_samples)
+    return acc
 
 
 @verbose
@@ -682,34 +838,55 @@ def compute_covariance(epochs, keep_sample_mean=True, tmin=None, tmax=None,
             if v.get('assume_centered', None) is False:
                 raise ValueError('`assume_centered` must be True'
                                  ' if `keep_sample_mean` is False')
-        # prepare mean covs
-        n_epoch_types = len(epochs)
-        data_mean = list(np.zeros(n_epoch_types))
-        n_samples = np.zeros(n_epoch_types, dtype=np.int)
-        n_epochs = np.zeros(n_epoch_types, dtype=np.int)
 
-        for ii, epochs_t in enumerate(epochs):
+    if not all(k in accepted_methods for k in method):
+        raise ValueError(msg.format(method=method))
 
+    if not ok_sklearn:
+        # no model selection (or log-likelihood) without scikit-learn, so
+        # accumulate the covariance one epoch at a time instead of loading
+        # all data at once
+        bads = [b for b in info['bads'] if b in ch_names]
+        acc = CovarianceAccumulator(ch_names, bads, projs)
+        data_mean = list()
+        norm_const = 0
+        for epochs_t in epochs:
             tslice = _get_tslice(epochs_t, tmin, tmax)
+            mean, n_epochs = 0., 0
             for e in epochs_t:
                 e = e[picks_meeg, tslice]
+                acc.partial_fit(e)
                 if not keep_sample_mean:
-                    data_mean[ii] += e
-                n_samples[ii] += e.shape[1]
-                n_epochs[ii] += 1
-
-        n_samples_epoch = n_samples // n_epochs
-        norm_const = np.sum(n_samples_epoch * (n_epochs - 1))
-        data_mean = [1.0 / n_epoch * np.dot(mean, mean.T) for n_epoch, mean
-                     in zip(n_epochs, data_mean)]
-
-    if not all(k in accepted_methods for k in method):
-        raise ValueError(msg.format(method=method))
+                    mean += e
+                n_epochs += 1
+            if not keep_sample_mean and n_epochs > 0:
+                data_mean.append(1.0 / n_epochs * np.dot(mean, mean.T))
+                norm_const += mean.shape[1] * (n_epochs - 1)
+        # like the estimators of scikit-learn, divide by the number of samples
+        assume_centered = _method_params['empirical']['assume_centered']
+        cov_data = acc._get_data(assume_centered, ddof=0)
+        if not keep_sample_mean:
+            _apply_mean_normalization(cov_data, acc.n_samples, data_mean,
+                                      norm_const)
+        cov = Covariance(cov_data, ch_names, bads, projs, nfree=acc.n_samples,
+                         method='empirical')
+        logger.info('Number of samples used : %d' % acc.n_samples)
+        logger.info('[done]')
+        return cov
 
     info = pick_info(info, picks_meeg)
     tslice = _get_tslice(epochs[0], tmin, tmax)
     epochs = [ee.get_data()[:, picks_meeg, tslice] for ee in epochs]
     picks_meeg = np.arange(len(picks_meeg))
+    if keep_sample_mean is False:
+        # prepare mean covs
+        data_mean = list()
+        norm_const = 0
+        for epochs_t in epochs:
+            if len(epochs_t) > 0:
+                mean = epochs_t.sum(axis=0)
+                data_mean.append(1.0 / len(epochs_t) * np.dot(mean, mean.T))
+                norm_const += epochs_t.shape[2] * (len(epochs_t) - 1)
     picks_list = _picks_by_type(info)
 
     if len(epochs) > 1:
@@ -722,32 +899,20 @@ def compute_covariance(epochs, keep_sample_mean=True, tmin=None, tmax=None,
     _check_n_samples(n_samples_tot, len(picks_meeg))
 
     epochs = epochs.T  # sklearn | C-order
-    if ok_sklearn:
-        cov_data = _compute_covariance_auto(epochs, method=method,
-                                            method_params=_method_params,
-                                            info=info,
-                                            verbose=verbose,
-                                            cv=cv,
-                                            n_jobs=n_jobs,
-                                            # XXX expose later
-                                            stop_early=True,  # if needed.
-                                            picks_list=picks_list,
-                                            scalings=scalings)
-    else:
-        if _method_params['empirical']['assume_centered'] is True:
-            cov = epochs.T.dot(epochs) / n_samples_tot
-        else:
-            cov = np.cov(epochs.T, bias=1)
-        cov_data = {'empirical': {'data': cov}}
+    cov_data = _compute_covariance_auto(epochs, method=method,
+                                        method_params=_method_params,
+                                        info=info,
+                                        verbose=verbose,
+                                        cv=cv,
+                                        n_jobs=n_jobs,
+                                        # XXX expose later
+                                        stop_early=True,  # if needed.
+                                        picks_list=picks_list,
+                                        scalings=scalings)
 
     if keep_sample_mean is False:
-        cov = cov_data['empirical']['data']
-        # undo scaling
-        cov *= n_samples_tot
-        # ... apply pre-computed class-wise normalization
-        for mean_cov in data_mean:
-            cov -= mean_cov
-        cov /= norm_const
+        _apply_mean_normalization(cov_data['empirical']['data'],
+                                  n_samples_tot, data_mean, norm_const)
 
     covs = list()
     for this_method, data in cov_data.items():
@@ -760,27 +925,37 @@ def compute_covariance(epochs, keep_sample_mean=True, tmin=None, tmax=None,
         cov.update(method=this_method, **data)
         covs.append(cov)
 
-    if ok_sklearn:
-        msg = ['log-likelihood on unseen data (descending order):']
-        logliks = [(c['method'], c['loglik']) for c in covs]
-        logliks.sort(reverse=True, key=lambda c: c[1])
-        for k, v in logliks:
-            msg.append('%s: %0.3f' % (k, v))
-        logger.info('\n   '.join(msg))
+    msg = ['log-likelihood on unseen data (descending order):']
+    logliks = [(c['method'], c['loglik']) for c in covs]
+    logliks.sort(reverse=True, key=lambda c: c[1])
+    for k, v in logliks:
+        msg.append('%s: %0.3f' % (k, v))
+    logger.info('\n   '.join(msg))
 
-    if ok_sklearn and not return_estimators:
+    if not return_estimators:
         keys, scores = zip(*[(c['method'], c['loglik']) for c in covs])
         out = covs[np.argmax(scores)]
         logger.info('selecting best estimator: {0}'.format(out['method']))
-    elif ok_sklearn:
+    else:
         out = covs
         out.sort(key=lambda c: c['loglik'], reverse=True)
-    else:
-        out = covs[0]
 
     return out
 
 
+def _apply_mean_normalization(cov, n_samples, data_mean, norm_const):
+    """Helper to apply the class-wise normalization (keep_sample_mean=False)
+
+    Operates in place on the (sample-count normalized) covariance.
+    """
+    # undo scaling
+    cov *= n_samples
+    # ... apply pre-computed class-wise normalization
+    for mean_cov in data_mean:
+        cov -= mean_cov
+    cov /= norm_const
+
+
 def _compute_covariance_auto(data, method, info, method_params, cv,
                              scalings, n_jobs, stop_early, picks_list,
                              verbose):
@@ -2,10 +2,14 @@
 #
 # License: BSD (3-clause)
 
+import atexit
+
 import numpy as np
-from scipy.fftpack import fft, ifft
+from scipy import fftpack
 
-from .utils import sizeof_fmt, logger, get_config
+from .fixes import partial
+from .utils import (sizeof_fmt, logger, get_config, _get_cache, _read_cache,
+                    _write_cache)
 
 
 # Support CUDA for FFTs; requires scikits.cuda and pycuda
@@ -104,6 +108,126 @@ def init_cuda(ignore_config=False):
     logger.info('Enabling CUDA with %s available memory' % get_cuda_memory())
 
 
+###############################################################################
+# FFT backends
+
+def _numpy_fft(x, n=None, axis=-1, overwrite_x=False):
+    """Wrap numpy.fft.fft to behave like scipy.fftpack.fft"""
+    return np.fft.fft(x, n, axis)
+
+
+def _numpy_ifft(x, n=None, axis=-1, overwrite_x=False):
+    """Wrap numpy.fft.ifft to behave like scipy.fftpack.ifft"""
+    return np.fft.ifft(x, n, axis)
+
+
+_fftw_fftpack = None
+
+
+def _init_fftw():
+    """Set up pyFFTW, loading accumulated wisdom from the persistent cache"""
+    global _fftw_fftpack
+    if _fftw_fftpack is None:
+        import pyfftw
+        from pyfftw.interfaces import scipy_fftpack, cache
+        cache.enable()  # keep FFTW objects around for repeated FFT sizes
+        fftw_cache = _get_cache('fftw')
+        if fftw_cache is not None:
+            wisdom = _read_cache(fftw_cache[0], 'wisdom')
+            if wisdom is not None:
+                pyfftw.import_wisdom(tuple(
+                    wisdom['wisdom_%d' % ii].tobytes()
+                    for ii in range(len(wisdom))))
+            atexit.register(_save_fftw_wisdom, *fftw_cache)
+        _fftw_fftpack = scipy_fftpack
+    return _fftw_fftpack
+
+
+def _save_fftw_wisdom(cache_dir, max_size):
+    """Store the FFTW wisdom so later sessions plan faster"""
+    import pyfftw
+    wisdom = dict(('wisdom_%d' % ii, np.frombuffer(w, np.uint8))
+                  for ii, w in enumerate(pyfftw.export_wisdom()))
+    _write_cache(cache_dir, 'wisdom', wisdom, max_size)
+
+
+def _fftw_fft(x, n=None, axis=-1, overwrite_x=False, threads=1):
+    """Compute a (multithreaded) FFT using pyFFTW"""
+    return _init_fftw().fft(x, n, axis, overwrite_x, threads=threads)
+
+
+def _fftw_ifft(x, n=None, axis=-1, overwrite_x=False, threads=1):
+    """Compute a (multithreaded) inverse FFT using pyFFTW"""
+    return _init_fftw().ifft(x, n, axis, overwrite_x, threads=threads)
+
+
+def _get_fftw(n_threads):
+    """Get pyFFTW fft and ifft functions that use n_threads threads"""
+    _init_fftw()
+    return (partial(_fftw_fft, threads=n_threads),
+            partial(_fftw_ifft, threads=n_threads))
+
+
+# Each backend is a function that takes the number of threads to use and
+# returns picklable fft and ifft functions with the call signature of
+# scipy.fftpack.fft and scipy.fftpack.ifft.
+_fft_backends = dict(
+    scipy=lambda n_threads: (fftpack.fft, fftpack.ifft),
+    numpy=lambda n_threads: (_numpy_fft, _numpy_ifft),
+    pyfftw=_get_fftw,
+)
+
+
+# The config is only read the first time _get_fft is called in a process
+# (clear _fft_config to read it again); functions are kept per
+# (backend, n_threads)
+_fft_config = dict()
+_fft_funcs = dict()
+
+
+def _get_fft(backend=None):
+    """Get the fft and ifft functions to use for CPU computations
+
+    Parameters
+    ----------
+    backend : str | None
+        The FFT backend to use. Can be 'scipy' (scipy.fftpack), 'numpy'
+        (numpy.fft) or 'pyfftw' (uses MNE_FFT_N_THREADS threads, default 1,
+        and can store its wisdom in the persistent cache, see
+        :func:`mne.set_cache_dir`). If None, the MNE_FFT_BACKEND config
+        value is used, defaulting to 'scipy'.
+
+    Returns
+    -------
+    fft : callable
+        Function with the signature of scipy.fftpack.fft.
+    ifft : callable
+        Function with the signature of scipy.fftpack.ifft.
+    """
+    if len(_fft_config) == 0:
+        default = get_config('MNE_FFT_BACKEND', 'scipy').lower()
+        if default not in _fft_backends:
+            raise ValueError('FFT backend must be one of %s, got "%s"'
+                             % (sorted(_fft_backends.keys()), default))
+        # a single thread by default, so that n_jobs workers do not
+        # oversubscribe the CPU
+        _fft_config.update(backend=default, n_threads=int(
+            get_config('MNE_FFT_N_THREADS', 1)))
+    backend = _fft_config['backend'] if backend is None else backend.lower()
+    if backend not in _fft_backends:
+        raise ValueError('FFT backend must be one of %s, got "%s"'
+                         % (sorted(_fft_backends.keys()), backend))
+    key = (backend, _fft_config['n_threads'])
+    if key not in _fft_funcs:
+        try:
+            _fft_funcs[key] = _fft_backends[backend](key[1])
+        except ImportError:
+            logger.warning('FFT backend "%s" could not be imported, falling '
+                           'back to scipy' % backend)
+            _fft_funcs[key] = _fft_backends['scipy'](key[1])
+    return _fft_funcs[key]
+
+
 ###############################################################################
 # Repeated FFT multiplication
 
@@ -139,6 +263,9 @@ def setup_cuda_fft_multiply_repeated(n_jobs, h_fft):
                 frequency-domain multiplication.
             x : instance of gpuarray
                 Empty allocated GPU space for the data to filter.
+            fft_funcs : tuple
+                The fft and ifft functions of the FFT backend to use when
+                CUDA is not used (see MNE_FFT_BACKEND).
     h_fft : array | instance of gpuarray
         This will either be a gpuarray (if CUDA enabled) or np.ndarray.
         If CUDA is enabled, h_fft will be modified appropriately for use
@@ -149,7 +276,7 @@ def setup_cuda_fft_multiply_repeated(n_jobs, h_fft):
     This function is designed to be used with fft_multiply_repeated().
     """
     cuda_dict = dict(use_cuda=False, fft_plan=None, ifft_plan=None,
-                     x_fft=None, x=None)
+                     x_fft=None, x=None, fft_funcs=_get_fft())
     n_fft = len(h_fft)
     cuda_fft_len = int((n_fft - (n_fft % 2)) / 2 + 1)
     if n_jobs == 'cuda':
@@ -199,6 +326,7 @@ def fft_multiply_repeated(h_fft, x, cuda_dict=dict(use_cuda=False)):
         Filtered version of x.
     """
     if not cuda_dict['use_cuda']:
+        fft, ifft = cuda_dict.get('fft_funcs') or _get_fft()
         # do the fourier-domain operations
         x = np.real(ifft(h_fft * fft(x), overwrite_x=True)).ravel()
     else:
@@ -253,6 +381,9 @@ def setup_cuda_fft_resample(n_jobs, W, new_len):
                 frequency-domain multiplication.
             x : instance of gpuarray
                 Empty allocated GPU space for the data to resample.
+            fft_funcs : tuple
+                The fft and ifft functions of the FFT backend to use when
+                CUDA is not used (see MNE_FFT_BACKEND).
     W : array | instance of gpuarray
         This will either be a gpuarray (if CUDA enabled) or np.ndarray.
         If CUDA is enabled, W will be modified appropriately for use
@@ -263,7 +394,8 @@ def setup_cuda_fft_resample(n_jobs, W, new_len):
     This function is designed to be used with fft_resample().
     """
     cuda_dict = dict(use_cuda=False, fft_plan=None, ifft_plan=None,
-                     x_fft=None, x=None, y_fft=None, y=None)
+                     x_fft=None, x=None, y_fft=None, y=None,
+                     fft_funcs=_get_fft())
     n_fft_x, n_fft_y = len(W), new_len
     cuda_fft_len_x = int((n_fft_x - (n_fft_x % 2)) // 2 + 1)
     cuda_fft_len_y = int((n_fft_y - (n_fft_y % 2)) // 2 + 1)
@@ -328,6 +460,7 @@ def fft_resample(x, W, new_len, npad, to_remove,
     old_len = len(x)
     shorter = new_len < old_len
     if not cuda_dict['use_cuda']:
+        fft, ifft = cuda_dict.get('fft_funcs') or _get_fft()
         N = int(min(new_len, old_len))
         sl_1 = slice((N + 1) // 2)
         y_fft = np.zeros(new_len, np.complex128)
@@ -372,13 +505,15 @@ def fft_resample(x, W, new_len, npad, to_remove,
 
 # this has to go in mne.cuda instead of mne.filter to avoid import errors
 def _smart_pad(x, n_pad):
-    """Pad vector x
+    """Pad x along the last axis
     """
     if n_pad == 0:
         return x
     elif n_pad < 0:
         raise RuntimeError('n_pad must be non-negative')
     # need to pad with zeros if len(x) <= npad
-    z_pad = np.zeros(max(n_pad - len(x) + 1, 0), dtype=x.dtype)
-    return np.concatenate([z_pad, 2 * x[0] - x[n_pad:0:-1], x,
-                           2 * x[-1] - x[-2:-n_pad - 2:-1], z_pad])
+    z_pad = np.zeros(x.shape[:-1] + (max(n_pad - x.shape[-1] + 1, 0),),
+                     dtype=x.dtype)
+    return np.concatenate([z_pad, 2 * x[..., :1] - x[..., n_pad:0:-1], x,
+                           2 * x[..., -1:] - x[..., -2:-n_pad - 2:-1], z_pad],
+                          axis=-1)
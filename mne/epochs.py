@@ -47,6 +47,11 @@ from .externals.six import iteritems, string_types
 from .externals.six.moves import zip
 
 
+# Maximum number of bytes of (float64) data to process at once when epochs
+# are loaded from disk or checked for rejection
+_EPOCHS_BATCH_SIZE = 2 ** 26
+
+
 def _save_split(epochs, fname, part_idx, n_parts):
     """Split epochs"""
 
@@ -535,6 +540,9 @@ class _BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin,
     def _detrend_offset_decim(self, epoch, verbose=None):
         """Aux Function: detrend, baseline correct, offset, decim
 
+        Works on a single epoch or a batch of shape
+        (n_epochs, n_channels, n_times).
+
         Note: operates inplace
         """
         if epoch is None:
@@ -543,21 +551,23 @@ class _BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         # Detrend
         if self.detrend is not None:
             picks = _pick_data_channels(self.info, exclude=[])
-            epoch[picks] = detrend(epoch[picks], self.detrend, axis=1)
+            epoch[..., picks, :] = detrend(epoch[..., picks, :], self.detrend,
+                                           axis=-1)
 
         # Baseline correct
         picks = pick_types(self.info, meg=True, eeg=True, stim=False,
                            ref_meg=True, eog=True, ecg=True, seeg=True,
                            emg=True, exclude=[])
-        epoch[picks] = rescale(epoch[picks], self._raw_times, self.baseline,
-                               'mean', copy=False, verbose=verbose)
+        epoch[..., picks, :] = rescale(epoch[..., picks, :], self._raw_times,
+                                       self.baseline, 'mean', copy=False,
+                                       verbose=verbose)
 
         # handle offset
         if self._offset is not None:
             epoch += self._offset
 
         # Decimate if necessary (i.e., epoch not preloaded)
-        epoch = epoch[:, self._decim_slice]
+        epoch = epoch[..., self._decim_slice]
         return epoch
 
     def iter_evoked(self):
@@ -1114,16 +1124,112 @@ class _BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         """Method to get a given epoch from disk"""
         raise NotImplementedError
 
+    def _get_epochs_from_raw(self, indices):
+        """Get several epochs from disk at once
+
+        Subclasses can override this to read the epochs more efficiently
+        than one at a time.
+
+        Returns
+        -------
+        data : ndarray, shape (len(indices), n_channels, n_times)
+            The epochs data. Rows of epochs that could not be read are zero.
+        drop_reasons : list
+            None for each epoch that could be read, otherwise the drop log
+            entry for it (['NO_DATA'] or ['TOO_SHORT']).
+        """
+        n_times = len(self._raw_times)
+        data, drop_reasons = None, list()
+        for ii, idx in enumerate(indices):
+            epoch = self._get_epoch_from_raw(idx)
+            if epoch is None:
+                drop_reasons.append(['NO_DATA'])
+                continue
+            if epoch.shape[1] < n_times:
+                drop_reasons.append(['TOO_SHORT'])
+                continue
+            if data is None:
+                data = np.zeros((len(indices),) + epoch.shape, epoch.dtype)
+            data[ii] = epoch
+            drop_reasons.append(None)
+        if data is None:
+            data = np.zeros((len(indices), len(self.ch_names), n_times))
+        return data, drop_reasons
+
     def _project_epoch(self, epoch):
-        """Helper to process a raw epoch based on the delayed param"""
+        """Helper to process a raw epoch based on the delayed param
+
+        Works on a single epoch or a batch of shape
+        (n_epochs, n_channels, n_times).
+        """
         # whenever requested, the first epoch is being projected.
         if epoch is None:  # can happen if t < 0
             return None
         proj = self._do_delayed_proj or self.proj
         if self._projector is not None and proj is True:
-            epoch = np.dot(self._projector, epoch)
+            if epoch.ndim == 3:
+                # one large product instead of one per epoch
+                n_epochs, n_channels, n_times = epoch.shape
+                epoch = np.dot(self._projector, np.reshape(
+                    epoch.transpose(1, 0, 2), (n_channels, -1)))
+                epoch = epoch.reshape(n_channels, n_epochs, n_times)
+                epoch = np.ascontiguousarray(epoch.transpose(1, 0, 2))
+            else:
+                epoch = np.dot(self._projector, epoch)
         return epoch
 
+    def _is_good_epochs(self, data, drop_reasons):
+        """Determine which epochs of a batch are good
+
+        Returns a list of (is_good, offenders) tuples, see _is_good_epoch.
+        """
+        if self.reject is None and self.flat is None:
+            good = [(True, None)] * len(data)
+        else:
+            if self._reject_time is not None:
+                data = data[..., self._reject_time]
+            good = _is_good_batch(data, self.ch_names,
+                                  self._channel_type_idx, self.reject,
+                                  self.flat, ignore_chs=self.info['bads'])
+        return [g if reason is None else (False, reason)
+                for g, reason in zip(good, drop_reasons)]
+
+    def _iter_epoch_batches(self):
+        """Helper to iterate over the (processed) epochs in batches
+
+        Yields
+        ------
+        indices : ndarray
+            The indices of the epochs in the batch.
+        epochs_noproj : ndarray, shape (n_epochs, n_channels, n_times) | None
+            The epochs before projection (None if preloaded and not
+            in delayed SSP mode).
+        epochs : ndarray, shape (n_epochs, n_channels, n_times)
+            The epochs after projection (if applicable).
+        drop_reasons : list
+            Reasons for epochs that could not be read, see
+            _get_epochs_from_raw.
+        """
+        n_events = len(self.events)
+        epoch_size = 8 * len(self.ch_names) * len(self._raw_times)
+        n_batch = max(int(_EPOCHS_BATCH_SIZE // epoch_size), 1)
+        for start in range(0, n_events, n_batch):
+            indices = np.arange(start, min(start + n_batch, n_events))
+            if self.preload:  # from memory
+                drop_reasons = [None] * len(indices)
+                if self._do_delayed_proj:
+                    epochs_noproj = self._data[indices[0]:indices[-1] + 1]
+                    epochs = self._project_epoch(epochs_noproj)
+                else:
+                    epochs_noproj = None
+                    epochs = self._data[indices[0]:indices[-1] + 1]
+            else:  # from disk
+                epochs_noproj, drop_reasons = \
+                    self._get_epochs_from_raw(indices)
+                epochs_noproj = self._detrend_offset_decim(epochs_noproj)
+                epochs = self._project_epoch(epochs_noproj)
+            yield indices, epochs_noproj, epochs, drop_reasons
+
     @verbose
     def _get_data(self, out=True, verbose=None):
         """Load all data, dropping bad epochs along the way
@@ -1152,52 +1258,42 @@ class _BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin,
                 return data
 
             # we need to load from disk, drop, and return data
-            for idx in range(n_events):
-                # faster to pre-allocate memory here
-                epoch_noproj = self._get_epoch_from_raw(idx)
-                epoch_noproj = self._detrend_offset_decim(epoch_noproj)
-                if self._do_delayed_proj:
-                    epoch_out = epoch_noproj
-                else:
-                    epoch_out = self._project_epoch(epoch_noproj)
-                if idx == 0:
+            for indices, epochs_noproj, epochs, _ in \
+                    self._iter_epoch_batches():
+                epochs_out = (epochs_noproj if self._do_delayed_proj
+                              else epochs)
+                if indices[0] == 0:
+                    # faster to pre-allocate memory here
                     data = np.empty((n_events, len(self.ch_names),
-                                     len(self.times)), dtype=epoch_out.dtype)
-                data[idx] = epoch_out
+                                     len(self.times)), dtype=epochs_out.dtype)
+                data[indices] = epochs_out
         else:
             # bads need to be dropped, this might occur after a preload
             # e.g., when calling drop_bad_epochs w/new params
             good_idx = []
             n_out = 0
             assert n_events == len(self.selection)
-            for idx, sel in enumerate(self.selection):
-                if self.preload:  # from memory
-                    if self._do_delayed_proj:
-                        epoch_noproj = self._data[idx]
-                        epoch = self._project_epoch(epoch_noproj)
-                    else:
-                        epoch_noproj = None
-                        epoch = self._data[idx]
-                else:  # from disk
-                    epoch_noproj = self._get_epoch_from_raw(idx)
-                    epoch_noproj = self._detrend_offset_decim(epoch_noproj)
-                    epoch = self._project_epoch(epoch_noproj)
-                epoch_out = epoch_noproj if self._do_delayed_proj else epoch
-                is_good, offenders = self._is_good_epoch(epoch)
-                if not is_good:
-                    self.drop_log[sel] += offenders
-                    continue
-                good_idx.append(idx)
-
-                # store the epoch if there is a reason to (output or update)
-                if out or self.preload:
-                    # faster to pre-allocate, then trim as necessary
-                    if n_out == 0 and not self.preload:
-                        data = np.empty((n_events, epoch_out.shape[0],
-                                         epoch_out.shape[1]),
-                                        dtype=epoch_out.dtype, order='C')
-                    data[n_out] = epoch_out
-                    n_out += 1
+            for indices, epochs_noproj, epochs, drop_reasons in \
+                    self._iter_epoch_batches():
+                epochs_out = (epochs_noproj if self._do_delayed_proj
+                              else epochs)
+                is_goods = self._is_good_epochs(epochs, drop_reasons)
+                for ii, idx in enumerate(indices):
+                    is_good, offenders = is_goods[ii]
+                    if not is_good:
+                        self.drop_log[self.selection[idx]] += offenders
+                        continue
+                    good_idx.append(idx)
+
+                    # store the epoch if there is a reason to (output or
+                    # update)
+                    if out or self.preload:
+                        # faster to pre-allocate, then trim as necessary
+                        if n_out == 0 and not self.preload:
+                            data = np.empty((n_events,) + epochs_out.shape[1:],
+                                            dtype=epochs_out.dtype, order='C')
+                        data[n_out] = epochs_out[ii]
+                        n_out += 1
 
             self._bad_dropped = True
             logger.info("%d bad epochs dropped" % (n_events - len(good_idx)))
@@ -1827,6 +1923,50 @@ class Epochs(_BaseEpochs):
         stop = start + len(self._raw_times)
         return None if start < 0 else self._raw[self.picks, start:stop][0]
 
+    def _get_epochs_from_raw(self, indices):
+        """Load several epochs from disk, coalescing nearby reads"""
+        if self._raw is None:
+            raise ValueError('An error has occurred, no valid raw file found.'
+                             ' Please report this to the mne-python '
+                             'developers.')
+        sfreq = self._raw.info['sfreq']
+        first_samp = self._raw.first_samp
+        n_times = len(self._raw_times)
+        starts = np.array([int(round(event_samp + self.tmin * sfreq)) -
+                           first_samp for event_samp in
+                           self.events[indices, 0]], int)
+        drop_reasons = [['NO_DATA'] if start < 0 else
+                        ['TOO_SHORT'] if start + n_times > self._raw.n_times
+                        else None for start in starts]
+        valid = np.array([reason is None for reason in drop_reasons], bool)
+        data = None
+        # Epochs that overlap or are separated by less than one epoch length
+        # are read as one segment, which is then sliced
+        order = np.where(valid)[0]
+        order = order[np.argsort(starts[order], kind='mergesort')]
+        max_span = max(_EPOCHS_BATCH_SIZE // (8 * len(self.picks)), n_times)
+        group_start = 0
+        for gi in range(len(order)):
+            first = starts[order[group_start]]
+            if gi + 1 < len(order):
+                next_start = starts[order[gi + 1]]
+                if (next_start <= starts[order[gi]] + 2 * n_times and
+                        next_start + n_times - first <= max_span):
+                    continue
+            group = order[group_start:gi + 1]
+            stop = starts[group[-1]] + n_times
+            segment = self._raw[self.picks, first:stop][0]
+            if data is None:
+                data = np.zeros((len(indices), len(self.picks), n_times),
+                                segment.dtype)
+            for ii in group:
+                offset = starts[ii] - first
+                data[ii] = segment[:, offset:offset + n_times]
+            group_start = gi + 1
+        if data is None:
+            data = np.zeros((len(indices), len(self.picks), n_times))
+        return data, drop_reasons
+
 
 class EpochsArray(_BaseEpochs):
     """Epochs object from numpy array
@@ -2124,6 +2264,38 @@ def _is_good(e, ch_names, channel_type_idx, reject, flat, full_report=False,
             return False, bad_list
 
 
+def _is_good_batch(data, ch_names, channel_type_idx, reject, flat,
+                   ignore_chs=[]):
+    """Test a batch of epochs with the criteria defined in reject and flat
+
+    This is a vectorized version of _is_good(..., full_report=True) for data
+    of shape (n_epochs, n_channels, n_times). Returns a list with a
+    (is_good, offending_channels) tuple for each epoch.
+    """
+    bad_lists = [list() for _ in range(len(data))]
+    checkable = np.ones(len(ch_names), dtype=bool)
+    checkable[np.array([c in ignore_chs
+                        for c in ch_names], dtype=bool)] = False
+    for refl, f, t in zip([reject, flat], [np.greater, np.less], ['', 'flat']):
+        if refl is not None:
+            for key, thresh in iteritems(refl):
+                idx = channel_type_idx[key]
+                name = key.upper()
+                if len(idx) > 0:
+                    e_idx = data[:, idx]
+                    deltas = np.max(e_idx, axis=2) - np.min(e_idx, axis=2)
+                    bads = np.logical_and(f(deltas, thresh), checkable[idx])
+                    for ei in np.where(bads.any(axis=1))[0]:
+                        ch_name = [ch_names[idx[i]]
+                                   for i in np.where(bads[ei])[0]]
+                        if len(bad_lists[ei]) == 0:
+                            logger.info('    Rejecting %s epoch based on %s : '
+                                        '%s' % (t, name, ch_name))
+                        bad_lists[ei].extend(ch_name)
+    return [(True, None) if len(bad_list) == 0 else (False, bad_list)
+            for bad_list in bad_lists]
+
+
 @verbose
 def _read_one_epoch_file(f, tree, fname, preload):
     """Helper to read a single FIF file"""
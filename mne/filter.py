@@ -1,6 +1,7 @@
 """IIR and FIR filtering functions"""
 
 from .externals.six import string_types, integer_types
+from fractions import Fraction
 import warnings
 import numpy as np
 from scipy.fftpack import fft, ifftshift, fftfreq
@@ -11,7 +12,7 @@ from .time_frequency.multitaper import dpss_windows, _mt_spectra
 from .parallel import parallel_func, check_n_jobs
 from .cuda import (setup_cuda_fft_multiply_repeated, fft_multiply_repeated,
                    setup_cuda_fft_resample, fft_resample, _smart_pad)
-from .utils import logger, verbose, sum_squared, check_version
+from .utils import logger, verbose, sum_squared, check_version, _LRUCache
 
 
 def is_power2(num):
@@ -38,8 +39,16 @@ def is_power2(num):
     return num != 0 and ((num & (num - 1)) == 0)
 
 
+# Designing a long FIR filter (and computing its FFT) can take longer than
+# applying it, so filters are kept around for when the same filter is used
+# again, e.g. when filtering many runs with the same parameters. Entries are
+# keyed by the design parameters, and spectra can be as long as the data, so
+# the total size is bounded too.
+_fir_cache = _LRUCache(32, '128M')
+
+
 def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
-                        n_jobs=1):
+                        n_jobs=1, h_key=None):
     """ Filter using overlap-add FFTs.
 
     Filters the signal x using a filter with the impulse response h.
@@ -64,6 +73,9 @@ def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
     n_jobs : int | str
         Number of jobs to run in parallel. Can be 'cuda' if scikits.cuda
         is installed properly and CUDA is initialized.
+    h_key : tuple | None
+        The design parameters of h, used to cache its FFT. If None, the FFT
+        is not cached.
 
     Returns
     -------
@@ -87,27 +99,8 @@ def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
 
     # Determine FFT length to use
     if n_fft is None:
-        min_fft = 2 * n_h - 1
-        max_fft = n_x
-        if max_fft >= min_fft:
-            n_tot = 2 * n_x if zero_phase else n_x
-
-            # cost function based on number of multiplications
-            N = 2 ** np.arange(np.ceil(np.log2(min_fft)),
-                               np.ceil(np.log2(max_fft)) + 1, dtype=int)
-            # if doing zero-phase, h needs to be thought of as ~ twice as long
-            n_h_cost = 2 * n_h - 1 if zero_phase else n_h
-            cost = (np.ceil(n_tot / (N - n_h_cost + 1).astype(np.float)) *
-                    N * (np.log2(N) + 1))
-
-            # add a heuristic term to prevent too-long FFT's which are slow
-            # (not predicted by mult. cost alone, 4e-5 exp. determined)
-            cost += 4e-5 * N * n_tot
-
-            n_fft = N[np.argmin(cost)]
-        else:
-            # Use only a single block
-            n_fft = 2 ** int(np.ceil(np.log2(n_x + n_h - 1)))
+        n_fft = _fir_cache.get(('n_fft', n_h, n_x, zero_phase), _get_n_fft,
+                               n_h, n_x, zero_phase)
 
     if zero_phase and n_fft <= 2 * n_h - 1:
         raise ValueError("n_fft is too short, has to be at least "
@@ -120,18 +113,11 @@ def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
         warnings.warn("FFT length is not a power of 2. Can be slower.")
 
     # Filter in frequency domain
-    h_fft = fft(np.concatenate([h, np.zeros(n_fft - n_h, dtype=h.dtype)]))
-    assert(len(h_fft) == n_fft)
-
-    if zero_phase:
-        """Zero-phase filtering is now done in one pass by taking the squared
-        magnitude of h_fft. This gives equivalent results to the old two-pass
-        method but theoretically doubles the speed for long fft lengths. To
-        compensate for this, overlapping must be done both before and after
-        each segment. When zero_phase == False it only needs to be done after.
-        """
-        h_fft = (h_fft * h_fft.conj()).real
-        # equivalent to convolving h(t) and h(-t) in the time domain
+    if h_key is None:
+        h_fft = _get_h_fft(h, n_fft, zero_phase)
+    else:
+        h_fft = _fir_cache.get(('h_fft', h_key, n_fft, zero_phase),
+                               _get_h_fft, h, n_fft, zero_phase)
 
     # Figure out if we should use CUDA
     n_jobs, cuda_dict, h_fft = setup_cuda_fft_multiply_repeated(n_jobs, h_fft)
@@ -152,6 +138,50 @@ def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
     return x
 
 
+def _get_n_fft(n_h, n_x, zero_phase):
+    """Helper to determine the optimal FFT length for overlap-add"""
+    min_fft = 2 * n_h - 1
+    max_fft = n_x
+    if max_fft >= min_fft:
+        n_tot = 2 * n_x if zero_phase else n_x
+
+        # cost function based on number of multiplications
+        N = 2 ** np.arange(np.ceil(np.log2(min_fft)),
+                           np.ceil(np.log2(max_fft)) + 1, dtype=int)
+        # if doing zero-phase, h needs to be thought of as ~ twice as long
+        n_h_cost = 2 * n_h - 1 if zero_phase else n_h
+        cost = (np.ceil(n_tot / (N - n_h_cost + 1).astype(np.float)) *
+                N * (np.log2(N) + 1))
+
+        # add a heuristic term to prevent too-long FFT's which are slow
+        # (not predicted by mult. cost alone, 4e-5 exp. determined)
+        cost += 4e-5 * N * n_tot
+
+        n_fft = N[np.argmin(cost)]
+    else:
+        # Use only a single block
+        n_fft = 2 ** int(np.ceil(np.log2(n_x + n_h - 1)))
+    return int(n_fft)
+
+
+def _get_h_fft(h, n_fft, zero_phase):
+    """Helper to compute the spectrum of a filter for overlap-add"""
+    n_h = len(h)
+    h_fft = fft(np.concatenate([h, np.zeros(n_fft - n_h, dtype=h.dtype)]))
+    assert(len(h_fft) == n_fft)
+
+    if zero_phase:
+        """Zero-phase filtering is now done in one pass by taking the squared
+        magnitude of h_fft. This gives equivalent results to the old two-pass
+        method but theoretically doubles the speed for long fft lengths. To
+        compensate for this, overlapping must be done both before and after
+        each segment. When zero_phase == False it only needs to be done after.
+        """
+        h_fft = (h_fft * h_fft.conj()).real
+        # equivalent to convolving h(t) and h(-t) in the time domain
+    return h_fft
+
+
 def _1d_overlap_filter(x, h_fft, n_h, n_edge, zero_phase, cuda_dict):
     """Do one-dimensional overlap-add FFT FIR filtering"""
     # pad to reduce ringing
@@ -257,6 +287,28 @@ def _prep_for_filtering(x, copy, picks=None):
     return x, orig_shape, picks
 
 
+def _design_fir(N, freq, gain, overlap_add):
+    """Helper to construct a zero-phase FIR filter
+
+    Returns the filter coefficients to use for overlap-add filtering, or
+    the (real) filter spectrum for direct FFT filtering, along with the
+    minimum attenuation at the stop frequency.
+    """
+    firwin2 = get_firwin2()
+    if overlap_add:
+        # construct filter with gain resulting from forward-backward filtering
+        h = firwin2(N, freq, gain, window='hann')
+        att_db, att_freq = _filter_attenuation(h, freq, gain)
+        att_db += 6  # the filter is applied twice (zero phase)
+        # reconstruct filter, this time with appropriate gain for fwd-bkwd
+        h = firwin2(N, freq, np.sqrt(gain), window='hann')
+    else:
+        h = firwin2(N, freq, gain)[np.newaxis, :]
+        att_db, att_freq = _filter_attenuation(h, freq, gain)
+        h = np.abs(fft(h)).ravel()
+    return h, att_db, att_freq
+
+
 def _filter(x, Fs, freq, gain, filter_length='10s', picks=None, n_jobs=1,
             copy=True):
     """Filter signal using gain control points in the frequency domain.
@@ -298,7 +350,6 @@ def _filter(x, Fs, freq, gain, filter_length='10s', picks=None, n_jobs=1,
     xf : array
         x filtered.
     """
-    firwin2 = get_firwin2()
     # set up array for filtering, reshape to 2D, operate on last axis
     x, orig_shape, picks = _prep_for_filtering(x, copy, picks)
 
@@ -324,17 +375,15 @@ def _filter(x, Fs, freq, gain, filter_length='10s', picks=None, n_jobs=1,
 
         N = x.shape[1] + (extend_x is True)
 
-        h = firwin2(N, freq, gain)[np.newaxis, :]
-
-        att_db, att_freq = _filter_attenuation(h, freq, gain)
+        # Make zero-phase filter function
+        B, att_db, att_freq = _fir_cache.get(
+            ('fir', tuple(freq), tuple(gain), N, False), _design_fir,
+            N, freq, gain, False)
         if att_db < min_att_db:
             att_freq *= Fs / 2
             warnings.warn('Attenuation at stop frequency %0.1fHz is only '
                           '%0.1fdB.' % (att_freq, att_db))
 
-        # Make zero-phase filter function
-        B = np.abs(fft(h)).ravel()
-
         # Figure out if we should use CUDA
         n_jobs, cuda_dict, B = setup_cuda_fft_multiply_repeated(n_jobs, B)
 
@@ -356,22 +405,16 @@ def _filter(x, Fs, freq, gain, filter_length='10s', picks=None, n_jobs=1,
             # Gain at Nyquist freq: 1: make N EVEN, 0: make N ODD
             N += 1
 
-        # construct filter with gain resulting from forward-backward filtering
-        h = firwin2(N, freq, gain, window='hann')
-
-        att_db, att_freq = _filter_attenuation(h, freq, gain)
-        att_db += 6  # the filter is applied twice (zero phase)
+        h_key = ('fir', tuple(freq), tuple(gain), N, True)
+        h, att_db, att_freq = _fir_cache.get(h_key, _design_fir,
+                                             N, freq, gain, True)
         if att_db < min_att_db:
             att_freq *= Fs / 2
             warnings.warn('Attenuation at stop frequency %0.1fHz is only '
                           '%0.1fdB. Increase filter_length for higher '
                           'attenuation.' % (att_freq, att_db))
-
-        # reconstruct filter, this time with appropriate gain for fwd-bkwd
-        gain = np.sqrt(gain)
-        h = firwin2(N, freq, gain, window='hann')
         x = _overlap_add_filter(x, h, zero_phase=True, picks=picks,
-                                n_jobs=n_jobs)
+                                n_jobs=n_jobs, h_key=h_key)
 
     x.shape = orig_shape
     return x
@@ -1252,7 +1295,7 @@ def _mt_spectrum_remove(x, sfreq, line_freqs, notch_widths,
 
 @verbose
 def resample(x, up, down, npad=100, axis=-1, window='boxcar', n_jobs=1,
-             verbose=None):
+             method='fft', verbose=None):
     """Resample the array x
 
     Operates along the last dimension of the array.
@@ -1270,10 +1313,19 @@ def resample(x, up, down, npad=100, axis=-1, window='boxcar', n_jobs=1,
     axis : int
         Axis along which to resample (default is the last axis).
     window : string or tuple
-        See scipy.signal.resample for description.
+        See scipy.signal.resample for description. Only used when
+        ``method='fft'``.
     n_jobs : int | str
         Number of jobs to run in parallel. Can be 'cuda' if scikits.cuda
         is installed properly and CUDA is initialized.
+    method : str
+        'fft' (default) resamples in the frequency domain. 'polyphase'
+        uses polyphase FIR filtering (scipy.signal.resample_poly), which
+        needs integer ``up`` and ``down`` factors but is much faster and
+        uses less memory for long signals, especially when downsampling
+        by a large factor.
+
+        .. versionadded:: 0.11
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -1290,12 +1342,16 @@ def resample(x, up, down, npad=100, axis=-1, window='boxcar', n_jobs=1,
     important consequences, and the default choices should work well
     for most natural signals.
 
-    Resampling arguments are broken into "up" and "down" components for future
-    compatibility in case we decide to use an upfirdn implementation. The
-    current implementation is functionally equivalent to passing
-    up=up/down and down=1.
+    Resampling arguments are broken into "up" and "down" components. With
+    ``method='fft'`` this is functionally equivalent to passing
+    up=up/down and down=1. With ``method='polyphase'``, the padding is
+    rounded up to a multiple of ``down`` (after reducing ``up`` and
+    ``down`` by their greatest common divisor).
     """
     from scipy.signal import get_window
+    if method not in ('fft', 'polyphase'):
+        raise ValueError('method must be "fft" or "polyphase", got "%s"'
+                         % (method,))
     # check explicitly for backwards compatibility
     if not isinstance(axis, int):
         err = ("The axis parameter needs to be an integer (got %s). "
@@ -1321,6 +1377,12 @@ def resample(x, up, down, npad=100, axis=-1, window='boxcar', n_jobs=1,
 
     # prep for resampling now
     x_flat = x.reshape((-1, x_len))
+    if method == 'polyphase':
+        y = _resample_polyphase(x_flat, up, down, npad, n_jobs)
+        y.shape = orig_shape[:-1] + (y.shape[1],)
+        if axis != orig_last_axis:
+            y = y.swapaxes(axis, orig_last_axis)
+        return y
     orig_len = x_len + 2 * npad  # length after padding
     new_len = int(round(ratio * orig_len))  # length after resampling
     to_remove = np.round(ratio * npad).astype(int)
@@ -1363,6 +1425,46 @@ def resample(x, up, down, npad=100, axis=-1, window='boxcar', n_jobs=1,
     return y
 
 
+def _resample_polyphase(x, up, down, npad, n_jobs):
+    """Helper to resample the rows of x using polyphase filtering"""
+    if not check_version('scipy', '0.18'):
+        raise RuntimeError('scipy >= 0.18 must be installed for polyphase '
+                           'resampling')
+    up_int, down_int = int(round(up)), int(round(down))
+    if not np.allclose([up, down], [up_int, down_int]) or \
+            min(up_int, down_int) < 1:
+        raise ValueError('up and down must be positive integers for '
+                         'polyphase resampling, got %s and %s' % (up, down))
+    ratio = Fraction(up_int, down_int)
+    up, down = ratio.numerator, ratio.denominator
+    # pad by a multiple of down so that the padding maps to whole samples
+    npad = int(np.ceil(npad / float(down))) * down
+    to_remove = npad * up // down
+    n_jobs = check_n_jobs(n_jobs, allow_cuda=True)
+    if n_jobs == 'cuda':
+        logger.info('CUDA is not used for polyphase resampling')
+        n_jobs = 1
+    if n_jobs == 1:
+        y = _polyphase_resample_rows(x, up, down, npad, to_remove)
+    else:
+        parallel, p_fun, _ = parallel_func(_polyphase_resample_rows, n_jobs)
+        y = parallel(p_fun(x_, up, down, npad, to_remove)
+                     for x_ in np.array_split(x, min(n_jobs, len(x))))
+        y = np.concatenate(y)
+    if np.issubdtype(x.dtype, np.floating):
+        y = y.astype(x.dtype)
+    return y
+
+
+def _polyphase_resample_rows(x, up, down, npad, to_remove):
+    """Helper to parallelize polyphase resampling"""
+    from scipy.signal import resample_poly
+    y = resample_poly(_smart_pad(x, npad), up, down, axis=-1)
+    if to_remove > 0:
+        y = y[:, to_remove:-to_remove]
+    return y
+
+
 def _resample_stim_channels(stim_data, up, down):
     """Resample stim channels, carefully.
 
@@ -20,7 +20,7 @@ from ..surface import (fast_cross_3d, _find_nearest_tri_pt, _get_tri_supp_geom,
                        _triangle_coords)
 from ..io.constants import FIFF
 from ..transforms import apply_trans
-from ..utils import logger, verbose
+from ..utils import logger, verbose, get_config, _parse_size
 from ..parallel import parallel_func
 from ..io.compensator import get_current_comp, make_compensator
 from ..io.pick import pick_types
@@ -380,7 +380,7 @@ def _bem_inf_fields(rr, rmag, cosmag):
 
 
 def _bem_pot_or_field(rr, mri_rr, mri_Q, coils, solution, bem_rr, n_jobs,
-                      coil_type):
+                      coil_type, buffer_size=None, dtype=np.float64):
     """Calculate the magnetic field or electric potential forward solution.
 
     The code is very similar between EEG and MEG potentials, so combine them.
@@ -405,31 +405,58 @@ def _bem_pot_or_field(rr, mri_rr, mri_Q, coils, solution, bem_rr, n_jobs,
         Number of jobs to run in parallel
     coil_type : str
         'meg' or 'eeg'
+    buffer_size : int | None
+        Approximate number of bytes of temporary storage to use (in total
+        across jobs). None uses the default (see _get_fwd_buffer_size).
+    dtype : numpy dtype
+        Data type of the output.
 
     Returns
     -------
     B : ndarray, shape (n_dipoles * 3, n_sensors)
         Foward solution for a set of sensors
     """
-    # Both MEG and EEG have the inifinite-medium potentials
+    # Both MEG and EEG have the inifinite-medium potentials.
     # This could be just vectorized, but eats too much memory, so instead we
-    # reduce memory by chunking within _do_inf_pots and parallelize, too:
-    parallel, p_fun, _ = parallel_func(_do_inf_pots, n_jobs)
-    nas = np.array_split
-    B = np.sum(parallel(p_fun(mri_rr, sr.copy(), mri_Q, sol.copy())
-                        for sr, sol in zip(nas(bem_rr, n_jobs),
-                                           nas(solution.T, n_jobs))), axis=0)
-    # The copy()s above should make it so the whole objects don't need to be
-    # pickled...
-
-    # Only MEG coils are sensitive to the primary current distribution.
-    if coil_type == 'meg':
-        # Primary current contribution (can be calc. in coil/dipole coords)
-        parallel, p_fun, _ = parallel_func(_do_prim_curr, n_jobs)
-        pcc = np.concatenate(parallel(p_fun(rr, c)
-                                      for c in nas(coils, n_jobs)), axis=1)
-        B += pcc
-        B *= _MAG_FACTOR
+    # split the sources across jobs and each job works through its share in
+    # chunks whose size is set by the memory budget.
+    if buffer_size is None:
+        buffer_size = _get_fwd_buffer_size()
+    n_chunk = _fwd_chunk_size(buffer_size // n_jobs, len(bem_rr))
+    parallel, p_fun, _ = parallel_func(_do_bem_pot_or_field, n_jobs)
+    B = np.concatenate(parallel(
+        p_fun(r, mr, mri_Q, coils, solution, bem_rr, coil_type, n_chunk,
+              dtype)
+        for r, mr in zip(np.array_split(rr, n_jobs),
+                         np.array_split(mri_rr, n_jobs))))
+    return B
+
+
+def _get_fwd_buffer_size():
+    """Get the memory budget for forward computations in bytes"""
+    return _parse_size(get_config('MNE_FORWARD_BUFFER_SIZE', '256M'))
+
+
+def _fwd_chunk_size(buffer_size, n_bem):
+    """Get the number of sources to process at once for a memory budget"""
+    # _bem_inf_pots needs roughly ten 8-byte floats per source / BEM vertex
+    return max(int(buffer_size // (80 * max(n_bem, 1))), 1)
+
+
+def _do_bem_pot_or_field(rr, mri_rr, mri_Q, coils, sol, bem_rr, coil_type,
+                         n_chunk, dtype):
+    """Calculate BEM potentials or fields for chunks of sources."""
+    B = np.empty((len(rr) * 3, sol.shape[0]), dtype)
+    for start in range(0, len(rr), n_chunk):
+        stop = min(start + n_chunk, len(rr))
+        # Infinite-medium potentials, common to MEG and EEG
+        this_B = _do_inf_pots(mri_rr[start:stop], bem_rr, mri_Q, sol.T)
+        # Only MEG coils are sensitive to the primary current distribution.
+        if coil_type == 'meg':
+            # Primary current contribution (can be calc. in coil/dipole coords)
+            this_B += _do_prim_curr(rr[start:stop], coils)
+            this_B *= _MAG_FACTOR
+        B[3 * start:3 * stop] = this_B
     return B
 
 
@@ -461,7 +488,7 @@ def _do_prim_curr(rr, coils):
 
 
 def _do_inf_pots(mri_rr, bem_rr, mri_Q, sol):
-    """Calculate infinite potentials for MEG or EEG sensors using chunks.
+    """Calculate infinite potentials for MEG or EEG sensors.
 
     Parameters
     ----------
@@ -471,7 +498,7 @@ def _do_inf_pots(mri_rr, bem_rr, mri_Q, sol):
         3D vertex positions for all surfaces in the BEM
     mri_Q :
         3x3 head -> MRI transform. I.e., head_mri_t.dot(np.eye(3))
-    sol : ndarray, shape (n_sensors_subset, n_BEM_vertices_subset)
+    sol : ndarray, shape (n_BEM_vertices, n_sensors)
         Comes from _bem_specify_coils
 
     Returns
@@ -480,34 +507,26 @@ def _do_inf_pots(mri_rr, bem_rr, mri_Q, sol):
         Foward solution for sensors due to volume currents
     """
 
-    # Doing work of 'fwd_bem_pot_calc' in MNE-C
-    # The following code is equivalent to this, but saves memory
-    # v0s = _bem_inf_pots(rr, bem_rr, Q)  # n_rr x 3 x n_bem_rr
-    # v0s.shape = (len(rr) * 3, v0s.shape[2])
-    # B = np.dot(v0s, sol)
-
-    # We chunk the source mri_rr's in order to save memory
-    bounds = np.r_[np.arange(0, len(mri_rr), 1000), len(mri_rr)]
-    B = np.empty((len(mri_rr) * 3, sol.shape[1]))
-    for bi in range(len(bounds) - 1):
-        # v0 in Hamalainen et al., 1989 == v_inf in Mosher, et al., 1999
-        v0s = _bem_inf_pots(mri_rr[bounds[bi]:bounds[bi + 1]], bem_rr, mri_Q)
-        v0s.shape = (v0s.shape[0] * 3, v0s.shape[2])
-        B[3 * bounds[bi]:3 * bounds[bi + 1]] = np.dot(v0s, sol)
-    return B
+    # Doing work of 'fwd_bem_pot_calc' in MNE-C. The sources are chunked by
+    # the caller (_do_bem_pot_or_field) to limit memory usage.
+    # v0 in Hamalainen et al., 1989 == v_inf in Mosher, et al., 1999
+    v0s = _bem_inf_pots(mri_rr, bem_rr, mri_Q)  # n_rr x 3 x n_bem_rr
+    v0s.shape = (v0s.shape[0] * 3, v0s.shape[2])
+    return np.dot(v0s, sol)
 
 
 # #############################################################################
 # SPHERE COMPUTATION
 
 def _sphere_pot_or_field(rr, mri_rr, mri_Q, coils, sphere, bem_rr,
-                         n_jobs, coil_type):
+                         n_jobs, coil_type, buffer_size=None,
+                         dtype=np.float64):
     """Do potential or field for spherical model."""
     fun = _eeg_spherepot_coil if coil_type == 'eeg' else _sphere_field
     parallel, p_fun, _ = parallel_func(fun, n_jobs)
     B = np.concatenate(parallel(p_fun(r, coils, sphere)
                        for r in np.array_split(rr, n_jobs)))
-    return B
+    return B.astype(dtype, copy=False)
 
 
 def _sphere_field(rrs, coils, sphere):
@@ -750,13 +769,15 @@ def _prep_field_computation(rr, bem, fwd_data, n_jobs, verbose=None):
     #    solutions (len 2 list; [ndarray, shape (n_MEG_sens, n BEM vertices),
     #                            ndarray, shape (n_EEG_sens, n BEM vertices)]
     #    csolutions (compensation for solution)
+    #    buffer_size (memory budget for the source chunks, in bytes)
     fwd_data.update(dict(bem_rr=bem_rr, mri_Q=mri_Q, head_mri_t=head_mri_t,
                          compensators=compensators, solutions=solutions,
-                         csolutions=csolutions, fun=fun))
+                         csolutions=csolutions, fun=fun,
+                         buffer_size=_get_fwd_buffer_size()))
 
 
 @verbose
-def _compute_forwards_meeg(rr, fd, n_jobs, verbose=None):
+def _compute_forwards_meeg(rr, fd, n_jobs, dtype=np.float64, verbose=None):
     """Compute MEG and EEG forward solutions for all sensor types.
 
     Parameters
@@ -767,6 +788,8 @@ def _compute_forwards_meeg(rr, fd, n_jobs, verbose=None):
         Dict containing forward data after update in _prep_field_computation
     n_jobs : int
         Number of jobs to run in parallel
+    dtype : numpy dtype
+        Data type of the computed forward solutions.
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose)
 
@@ -784,10 +807,11 @@ def _compute_forwards_meeg(rr, fd, n_jobs, verbose=None):
     if fd['head_mri_t'] is not None:
         mri_rr = apply_trans(fd['head_mri_t']['trans'], rr)
     mri_Q, bem_rr, fun = fd['mri_Q'], fd['bem_rr'], fd['fun']
+    buffer_size = fd.get('buffer_size')
     for ci in range(len(fd['coils_list'])):
         coils, ccoils = fd['coils_list'][ci], fd['ccoils_list'][ci]
         if len(coils) == 0:  # nothing to do
-            Bs.append(np.zeros((3 * len(rr), 0)))
+            Bs.append(np.zeros((3 * len(rr), 0), dtype))
             continue
 
         coil_type, compensator = fd['coil_types'][ci], fd['compensators'][ci]
@@ -801,27 +825,29 @@ def _compute_forwards_meeg(rr, fd, n_jobs, verbose=None):
                        '' if len(rr) == 1 else 's'))
         # Calculate foward solution using spherical or BEM model
         B = fun(rr, mri_rr, mri_Q, coils, solution, bem_rr, n_jobs,
-                coil_type)
+                coil_type, buffer_size, dtype)
 
         # Compensate if needed (only done for MEG systems w/compensation)
         if compensator is not None:
             # Compute the field in the compensation sensors
             work = fun(rr, mri_rr, mri_Q, ccoils, csolution, bem_rr,
-                       n_jobs, coil_type)
+                       n_jobs, coil_type, buffer_size, dtype)
             # Combine solutions so we can do the compensation
-            both = np.zeros((work.shape[0], B.shape[1] + work.shape[1]))
+            both = np.zeros((work.shape[0], B.shape[1] + work.shape[1]),
+                            dtype)
             picks = pick_types(info, meg=True, ref_meg=False)
             both[:, picks] = B
             picks = pick_types(info, meg=False, ref_meg=True)
             both[:, picks] = work
-            B = np.dot(both, compensator.T)
+            del work
+            B = np.dot(both, compensator.T.astype(dtype))
         Bs.append(B)
     return Bs
 
 
 @verbose
 def _compute_forwards(rr, bem, coils_list, ccoils_list, infos, coil_types,
-                      n_jobs, verbose=None):
+                      n_jobs, dtype=np.float64, verbose=None):
     """Compute the MEG and EEG forward solutions.
 
     This effectively combines compute_forward_meg and compute_forward_eeg
@@ -843,6 +869,8 @@ def _compute_forwards(rr, bem, coils_list, ccoils_list, infos, coil_types,
         Number of jobs to run in parallel
     infos : list, len(2)
         infos[0] is MEG info, infos[1] is EEG info
+    dtype : numpy dtype
+        Data type of the computed forward solutions.
 
     Returns
     -------
@@ -856,5 +884,5 @@ def _compute_forwards(rr, bem, coils_list, ccoils_list, infos, coil_types,
     fwd_data = dict(coils_list=coils_list, ccoils_list=ccoils_list,
                     infos=infos, coil_types=coil_types)
     _prep_field_computation(rr, bem, fwd_data, n_jobs)
-    Bs = _compute_forwards_meeg(rr, fwd_data, n_jobs)
+    Bs = _compute_forwards_meeg(rr, fwd_data, n_jobs, dtype)
     return Bs
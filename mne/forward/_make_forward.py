@@ -450,7 +450,8 @@ def _prepare_for_forward(src, mri_head_t, info, bem, mindist, n_jobs,
 @verbose
 def make_forward_solution(info, trans, src, bem, fname=None, meg=True,
                           eeg=True, mindist=0.0, ignore_ref=False,
-                          overwrite=False, n_jobs=1, verbose=None):
+                          overwrite=False, n_jobs=1, dtype=np.float64,
+                          verbose=None):
     """Calculate a forward solution for a subject
 
     Parameters
@@ -489,7 +490,15 @@ def make_forward_solution(info, trans, src, bem, fname=None, meg=True,
         If True, the destination file (if it exists) will be overwritten.
         If False (default), an error will be raised if the file exists.
     n_jobs : int
-        Number of jobs to run in parallel.
+        Number of jobs to run in parallel. The source locations are split
+        across the jobs.
+    dtype : numpy dtype
+        Data type of the gain matrix. Use ``np.float32`` to halve the memory
+        needed to store the solution, e.g. for large volume source spaces
+        (forward solutions are stored in single precision on disk anyway).
+
+        .. versionadded:: 0.11
+
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -508,6 +517,11 @@ def make_forward_solution(info, trans, src, bem, fname=None, meg=True,
     (e.g., `--grad`, `--fixed`) are not implemented here. For those,
     consider using the C command line tools or the Python wrapper
     `do_forward_solution`.
+
+    The sources are processed in chunks to limit the memory used for
+    temporary arrays. The budget (in total across jobs) can be changed
+    with the ``MNE_FORWARD_BUFFER_SIZE`` config value (default ``'256M'``),
+    see :func:`mne.set_config`.
     """
     # Currently not (sup)ported:
     # 1. --grad option (gradients of the field, not used much)
@@ -558,7 +572,7 @@ def make_forward_solution(info, trans, src, bem, fname=None, meg=True,
     ccoils = [compcoils, None]
     infos = [meg_info, None]
     megfwd, eegfwd = _compute_forwards(rr, bem, coils, ccoils,
-                                       infos, coil_types, n_jobs)
+                                       infos, coil_types, n_jobs, dtype)
 
     # merge forwards
     fwd = _merge_meg_eeg_fwds(_to_forward_dict(megfwd, megnames),
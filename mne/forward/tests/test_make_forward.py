@@ -200,6 +200,24 @@ def test_make_forward_solution():
     assert_true(isinstance(fwd, Forward))
     _compare_forwards(fwd, fwd_py, 366, 1494, meg_rtol=1e-3)
 
+    # splitting the sources across jobs and into small chunks, and storing
+    # the gain in single precision, should give the same results
+    orig_size = os.getenv('MNE_FORWARD_BUFFER_SIZE', None)
+    try:
+        os.environ['MNE_FORWARD_BUFFER_SIZE'] = '1M'
+        fwd_py_32 = make_forward_solution(fname_raw, fname_trans, fname_src,
+                                          fname_bem, mindist=5.0, n_jobs=2,
+                                          dtype=np.float32)
+    finally:
+        if orig_size is not None:
+            os.environ['MNE_FORWARD_BUFFER_SIZE'] = orig_size
+        else:
+            del os.environ['MNE_FORWARD_BUFFER_SIZE']
+    assert_equal(fwd_py_32['sol']['data'].dtype, np.float32)
+    assert_equal(fwd_py_32['_orig_sol'].dtype, np.float32)
+    _compare_forwards(fwd_py, fwd_py_32, 366, 1494, meg_rtol=1e-5,
+                      eeg_rtol=1e-5)
+
 
 @testing.requires_testing_data
 @requires_mne
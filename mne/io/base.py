@@ -31,9 +31,9 @@ from .write import (start_file, end_file, start_block, end_block,
 
 from ..filter import (low_pass_filter, high_pass_filter, band_pass_filter,
                       notch_filter, band_stop_filter, resample,
-                      _resample_stim_channels)
+                      _resample_stim_channels, _get_filter_length)
 from ..fixes import in1d
-from ..parallel import parallel_func
+from ..parallel import parallel_func, check_n_jobs
 from ..utils import (_check_fname, _check_pandas_installed,
                      _check_pandas_index_arguments,
                      check_fname, _get_stim_channel, object_hash,
@@ -44,6 +44,11 @@ from ..externals.six import string_types
 from ..event import find_events, concatenate_events
 
 
+# Maximum number of bytes of (float64) data to filter at once for data that
+# are not preloaded
+_FILTER_CHUNK_SIZE = 2 ** 27
+
+
 class ToDataFrameMixin(object):
     '''Class to add to_data_frame capabilities to certain classes.'''
     def _get_check_picks(self, picks, picks_check):
@@ -713,14 +718,16 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
     @verbose
     def filter(self, l_freq, h_freq, picks=None, filter_length='10s',
                l_trans_bandwidth=0.5, h_trans_bandwidth=0.5, n_jobs=1,
-               method='fft', iir_params=None, verbose=None):
+               method='fft', iir_params=None, data_buffer=None,
+               verbose=None):
         """Filter a subset of channels.
 
         Applies a zero-phase low-pass, high-pass, band-pass, or band-stop
         filter to the channels selected by "picks". The data of the Raw
         object is modified inplace.
 
-        The Raw object has to be constructed using preload=True (or string).
+        The Raw object has to be constructed using preload=True (or string),
+        unless ``data_buffer`` is used.
 
         l_freq and h_freq are the frequencies below which and above which,
         respectively, to filter out of the data. Thus the uses are:
@@ -772,6 +779,18 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
             Dictionary of parameters to use for IIR filtering.
             See mne.filter.construct_iir_filter for details. If iir_params
             is None and method="iir", 4th order Butterworth will be used.
+        data_buffer : str | None
+            File name of a memory-mapped file to store the filtered data in
+            when the data are not preloaded. The data are then read from
+            disk and filtered in overlapping chunks, which are spread over
+            ``n_jobs`` workers, so the data never need to fit in memory.
+            Afterward the Raw object uses the memory-mapped data as if it
+            had been constructed with ``preload=data_buffer``; use
+            :meth:`save` to write the result to a new FIF file. Only
+            ``method='fft'`` with a ``filter_length`` shorter than the data
+            is supported.
+
+            .. versionadded:: 0.11
         verbose : bool, str, int, or None
             If not None, override default verbose level (see mne.verbose).
             Defaults to self.verbose.
@@ -792,9 +811,12 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         if h_freq is not None and not isinstance(h_freq, float):
             h_freq = float(h_freq)
 
-        if not self.preload:
+        if not self.preload and data_buffer is None:
             raise RuntimeError('Raw data needs to be preloaded to filter. Use '
-                               'preload=True (or string) in the constructor.')
+                               'preload=True (or string) in the constructor, '
+                               'or pass data_buffer to filter the data '
+                               'without preloading.')
+        lowpass, highpass = self.info['lowpass'], self.info['highpass']
         if picks is None:
             if 'ICA ' in ','.join(self.ch_names):
                 pick_parameters = dict(misc=True, ref_meg=False)
@@ -808,64 +830,54 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
                                    'MNE-Python developers.')
 
             # update info if filter is applied to all data channels,
-            # and it's not a band-stop filter
+            # and it's not a band-stop filter (once the data are filtered)
             if h_freq is not None:
                 if (l_freq is None or l_freq < h_freq) and \
                    (self.info["lowpass"] is None or
                    h_freq < self.info['lowpass']):
-                        self.info['lowpass'] = h_freq
+                        lowpass = h_freq
             if l_freq is not None:
                 if (h_freq is None or l_freq < h_freq) and \
                    (self.info["highpass"] is None or
                    l_freq > self.info['highpass']):
-                        self.info['highpass'] = l_freq
+                        highpass = l_freq
         if l_freq is None and h_freq is not None:
             logger.info('Low-pass filtering at %0.2g Hz' % h_freq)
-            low_pass_filter(self._data, fs, h_freq,
-                            filter_length=filter_length,
-                            trans_bandwidth=h_trans_bandwidth, method=method,
-                            iir_params=iir_params, picks=picks, n_jobs=n_jobs,
-                            copy=False)
         if l_freq is not None and h_freq is None:
             logger.info('High-pass filtering at %0.2g Hz' % l_freq)
-            high_pass_filter(self._data, fs, l_freq,
-                             filter_length=filter_length,
-                             trans_bandwidth=l_trans_bandwidth, method=method,
-                             iir_params=iir_params, picks=picks, n_jobs=n_jobs,
-                             copy=False)
         if l_freq is not None and h_freq is not None:
             if l_freq < h_freq:
                 logger.info('Band-pass filtering from %0.2g - %0.2g Hz'
                             % (l_freq, h_freq))
-                self._data = band_pass_filter(
-                    self._data, fs, l_freq, h_freq,
-                    filter_length=filter_length,
-                    l_trans_bandwidth=l_trans_bandwidth,
-                    h_trans_bandwidth=h_trans_bandwidth,
-                    method=method, iir_params=iir_params, picks=picks,
-                    n_jobs=n_jobs, copy=False)
             else:
                 logger.info('Band-stop filtering from %0.2g - %0.2g Hz'
                             % (h_freq, l_freq))
-                self._data = band_stop_filter(
-                    self._data, fs, h_freq, l_freq,
-                    filter_length=filter_length,
-                    l_trans_bandwidth=h_trans_bandwidth,
-                    h_trans_bandwidth=l_trans_bandwidth, method=method,
-                    iir_params=iir_params, picks=picks, n_jobs=n_jobs,
-                    copy=False)
+        kwargs = dict(Fs=fs, l_freq=l_freq, h_freq=h_freq, picks=picks,
+                      filter_length=filter_length,
+                      l_trans_bandwidth=l_trans_bandwidth,
+                      h_trans_bandwidth=h_trans_bandwidth, method=method,
+                      iir_params=iir_params)
+        if self.preload:
+            self._data = _filter_raw_data(self._data, n_jobs=n_jobs,
+                                          **kwargs)
+        else:
+            self._filter_chunked(_filter_raw_data, kwargs, data_buffer,
+                                 n_jobs)
+        self.info['lowpass'], self.info['highpass'] = lowpass, highpass
 
     @verbose
     def notch_filter(self, freqs, picks=None, filter_length='10s',
                      notch_widths=None, trans_bandwidth=1.0, n_jobs=1,
                      method='fft', iir_params=None,
-                     mt_bandwidth=None, p_value=0.05, verbose=None):
+                     mt_bandwidth=None, p_value=0.05, data_buffer=None,
+                     verbose=None):
         """Notch filter a subset of channels.
 
         Applies a zero-phase notch filter to the channels selected by
         "picks". The data of the Raw object is modified inplace.
 
-        The Raw object has to be constructed using preload=True (or string).
+        The Raw object has to be constructed using preload=True (or string),
+        unless ``data_buffer`` is used.
 
         Note: If n_jobs > 1, more memory is required as "len(picks) * n_times"
               additional time points need to be temporaily stored in memory.
@@ -912,6 +924,18 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
             sinusoidal components to remove when method='spectrum_fit' and
             freqs=None. Note that this will be Bonferroni corrected for the
             number of frequencies, so large p-values may be justified.
+        data_buffer : str | None
+            File name of a memory-mapped file to store the filtered data in
+            when the data are not preloaded. The data are then read from
+            disk and filtered in overlapping chunks, which are spread over
+            ``n_jobs`` workers, so the data never need to fit in memory.
+            Afterward the Raw object uses the memory-mapped data as if it
+            had been constructed with ``preload=data_buffer``; use
+            :meth:`save` to write the result to a new FIF file. Only
+            ``method='fft'`` with a ``filter_length`` shorter than the data
+            is supported.
+
+            .. versionadded:: 0.11
         verbose : bool, str, int, or None
             If not None, override default verbose level (see mne.verbose).
             Defaults to self.verbose.
@@ -934,21 +958,66 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
                 raise RuntimeError('Could not find any valid channels for '
                                    'your Raw object. Please contact the '
                                    'MNE-Python developers.')
-        if not self.preload:
+        if not self.preload and data_buffer is None:
             raise RuntimeError('Raw data needs to be preloaded to filter. Use '
-                               'preload=True (or string) in the constructor.')
+                               'preload=True (or string) in the constructor, '
+                               'or pass data_buffer to filter the data '
+                               'without preloading.')
+
+        kwargs = dict(Fs=fs, freqs=freqs, filter_length=filter_length,
+                      notch_widths=notch_widths,
+                      trans_bandwidth=trans_bandwidth, method=method,
+                      iir_params=iir_params, mt_bandwidth=mt_bandwidth,
+                      p_value=p_value, picks=picks, copy=False)
+        if self.preload:
+            self._data = notch_filter(self._data, n_jobs=n_jobs, **kwargs)
+        else:
+            self._filter_chunked(notch_filter, kwargs, data_buffer, n_jobs)
+
+    def _filter_chunked(self, fun, kwargs, data_buffer, n_jobs):
+        """Helper to filter data that are not preloaded in chunks
 
-        self._data = notch_filter(self._data, fs, freqs,
-                                  filter_length=filter_length,
-                                  notch_widths=notch_widths,
-                                  trans_bandwidth=trans_bandwidth,
-                                  method=method, iir_params=iir_params,
-                                  mt_bandwidth=mt_bandwidth, p_value=p_value,
-                                  picks=picks, n_jobs=n_jobs, copy=False)
+        The chunks overlap by more than the filter length, so the result is
+        the same as when filtering all data at once.
+        """
+        if kwargs['method'] != 'fft':
+            raise ValueError('Only method="fft" can be used to filter data '
+                             'that are not preloaded, got "%s"'
+                             % kwargs['method'])
+        # use the same filter length for all chunks
+        filter_length = _get_filter_length(kwargs['filter_length'],
+                                           self.info['sfreq'],
+                                           len_x=self.n_times)
+        if filter_length is None or filter_length >= self.n_times:
+            raise ValueError('filter_length must be shorter than the data to '
+                             'filter data that are not preloaded')
+        kwargs = dict(kwargs, filter_length=filter_length)
+        n_pad = filter_length + 1  # the filter can be one sample longer
+        chunk_size = max(_FILTER_CHUNK_SIZE // (8 * self.info['nchan']),
+                         2 * n_pad)
+        starts = np.arange(0, self.n_times, chunk_size)
+        stops = np.minimum(starts + chunk_size, self.n_times)
+        logger.info('Filtering %d chunks of data' % len(starts))
+
+        # allocate the output, each chunk is written to it directly
+        data = np.memmap(data_buffer, mode='w+', dtype=self._dtype,
+                         shape=(self.info['nchan'], self.n_times))
+        del data
+        n_jobs = check_n_jobs(n_jobs, allow_cuda=True)
+        if n_jobs == 'cuda':  # one chunk at a time on the GPU
+            kwargs['n_jobs'], n_jobs = n_jobs, 1
+        parallel, p_fun, _ = parallel_func(_filter_raw_chunk, n_jobs)
+        parallel(p_fun(self, data_buffer, start, stop, n_pad, fun, kwargs)
+                 for start, stop in zip(starts, stops))
+        self._data = np.memmap(data_buffer, mode='r+', dtype=self._dtype,
+                               shape=(self.info['nchan'], self.n_times))
+        self.preload = True
+        self.close()
 
     @verbose
     def resample(self, sfreq, npad=100, window='boxcar', stim_picks=None,
-                 n_jobs=1, events=None, copy=False, verbose=None):
+                 n_jobs=1, events=None, copy=False, method='fft',
+                 verbose=None):
         """Resample data channels.
 
         Resamples all channels.
@@ -994,6 +1063,14 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         copy : bool
             Whether to operate on a copy of the data (True) or modify data
             in-place (False). Defaults to False.
+        method : str
+            'fft' (default) or 'polyphase'. The latter is faster and needs
+            less memory, but can only be used when the ratio of the new
+            and old sample rates is a ratio of integers, e.g. when
+            downsampling from 5000 Hz to 250 Hz.
+            See :func:`mne.filter.resample`.
+
+            .. versionadded:: 0.11
         verbose : bool, str, int, or None
             If not None, override default verbose level (see mne.verbose).
             Defaults to self.verbose.
@@ -1041,7 +1118,7 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         for ri in range(len(inst._raw_lengths)):
             data_chunk = inst._data[:, offsets[ri]:offsets[ri + 1]]
             new_data.append(resample(data_chunk, sfreq, o_sfreq, npad,
-                                     n_jobs=n_jobs))
+                                     n_jobs=n_jobs, method=method))
             new_ntimes = new_data[ri].shape[1]
 
             # In empirical testing, it was faster to resample all channels
@@ -1821,6 +1898,51 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         return int(np.ceil(buffer_size_sec * self.info['sfreq']))
 
 
+def _filter_raw_data(x, Fs, l_freq, h_freq, picks, filter_length,
+                     l_trans_bandwidth, h_trans_bandwidth, method,
+                     iir_params, n_jobs=1):
+    """Helper to apply the filter described by l_freq and h_freq in place"""
+    if l_freq is None and h_freq is not None:
+        low_pass_filter(x, Fs, h_freq, filter_length=filter_length,
+                        trans_bandwidth=h_trans_bandwidth, method=method,
+                        iir_params=iir_params, picks=picks, n_jobs=n_jobs,
+                        copy=False)
+    if l_freq is not None and h_freq is None:
+        high_pass_filter(x, Fs, l_freq, filter_length=filter_length,
+                         trans_bandwidth=l_trans_bandwidth, method=method,
+                         iir_params=iir_params, picks=picks, n_jobs=n_jobs,
+                         copy=False)
+    if l_freq is not None and h_freq is not None:
+        if l_freq < h_freq:
+            x = band_pass_filter(
+                x, Fs, l_freq, h_freq, filter_length=filter_length,
+                l_trans_bandwidth=l_trans_bandwidth,
+                h_trans_bandwidth=h_trans_bandwidth, method=method,
+                iir_params=iir_params, picks=picks, n_jobs=n_jobs,
+                copy=False)
+        else:
+            x = band_stop_filter(
+                x, Fs, h_freq, l_freq, filter_length=filter_length,
+                l_trans_bandwidth=h_trans_bandwidth,
+                h_trans_bandwidth=l_trans_bandwidth, method=method,
+                iir_params=iir_params, picks=picks, n_jobs=n_jobs,
+                copy=False)
+    return x
+
+
+def _filter_raw_chunk(raw, data_buffer, start, stop, n_pad, fun, kwargs):
+    """Helper to filter one chunk of raw data and store it in a memmap"""
+    read_start = max(start - n_pad, 0)
+    read_stop = min(stop + n_pad, raw.n_times)
+    data = raw._read_segment(read_start, read_stop, verbose=False)
+    data = fun(data, **kwargs)
+    out = np.memmap(data_buffer, mode='r+', dtype=raw._dtype,
+                    shape=(len(data), raw.n_times))
+    out[:, start:stop] = data[:, start - read_start:stop - read_start]
+    out.flush()
+    del out
+
+
 def _mult_cal_one(data_view, one, idx, cals, mult):
     """Take a chunk of raw data, multiply by mult or cals, and store"""
     one = np.asarray(one, dtype=data_view.dtype)
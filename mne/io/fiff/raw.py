@@ -24,6 +24,14 @@ from ..base import (_BaseRaw, _RawShell, _check_raw_compatibility,
                     _mult_cal_one)
 
 from ...utils import check_fname, logger, verbose
+from ...externals.six import string_types
+
+
+# on-disk (big-endian) dtypes of the data buffer tags, used for memory mapping
+_mmap_dtypes = {FIFF.FIFFT_DAU_PACK16: '>i2', FIFF.FIFFT_SHORT: '>i2',
+                FIFF.FIFFT_INT: '>i4', FIFF.FIFFT_FLOAT: '>f4',
+                FIFF.FIFFT_DOUBLE: '>f8', FIFF.FIFFT_COMPLEX_FLOAT: '>c8',
+                FIFF.FIFFT_COMPLEX_DOUBLE: '>c16'}
 
 
 class RawFIF(_BaseRaw):
@@ -46,7 +54,11 @@ class RawFIF(_BaseRaw):
         If True, the data will be preloaded into memory (fast, requires
         large amount of memory). If preload is a string, preload is the
         file name of a memory-mapped file which is used to store the data
-        on the hard drive (slower, requires less memory).
+        on the hard drive (slower, requires less memory). If preload is
+        'mmap', the data are not preloaded, but the data buffers of the
+        file are memory-mapped so that on-demand reads (e.g., for epoching)
+        slice the file directly instead of seeking and reading each tag.
+        This is not possible for compressed (.gz) files.
     proj : bool
         Apply the signal space projection (SSP) operators present in
         the file to the data. Note: Once the projectors have been
@@ -86,6 +98,7 @@ class RawFIF(_BaseRaw):
             fnames = [fnames]
         fnames = [op.realpath(f) for f in fnames]
         split_fnames = []
+        use_mmap = isinstance(preload, string_types) and preload == 'mmap'
 
         raws = []
         for ii, fname in enumerate(fnames):
@@ -119,6 +132,10 @@ class RawFIF(_BaseRaw):
             [r.filename for r in raws], [r._raw_extras for r in raws],
             copy.deepcopy(raws[0].comp), raws[0]._orig_comp_grade,
             raws[0].orig_format, None, verbose=verbose)
+        # memory-mapped data buffers, populated on first read of each file
+        self._mmap_bufs = dict() if use_mmap else None
+        if use_mmap:
+            preload = False
 
         # combine information from each raw file to construct self
         if add_eeg_ref and _needs_eeg_average_ref_proj(self.info):
@@ -147,6 +164,11 @@ class RawFIF(_BaseRaw):
 
         #   Read in the whole file if preload is on and .fif.gz (saves time)
         ext = os.path.splitext(fname)[1].lower()
+        if isinstance(preload, string_types) and preload == 'mmap':
+            if '.gz' in ext:
+                raise ValueError('preload="mmap" cannot be used with '
+                                 'compressed files (%s)' % fname)
+            preload = False
         whole_file = preload if '.gz' in ext else False
         ff, tree, _ = fiff_open(fname, preload=whole_file)
         with ff as fid:
@@ -342,12 +364,35 @@ class RawFIF(_BaseRaw):
         self._dtype_ = dtype
         return dtype
 
+    def _get_mmap_bufs(self, fi):
+        """Get memory-mapped views of the data buffers of a file"""
+        if self._mmap_bufs is None:
+            return None
+        fname = self._filenames[fi]
+        if fname not in self._mmap_bufs:
+            mm = np.memmap(fname, dtype=np.uint8, mode='r')
+            nchan = self.info['nchan']
+            bufs = list()
+            for this in self._raw_extras[fi]:
+                ent = this['ent']
+                if ent is None:
+                    bufs.append(None)
+                    continue
+                # the tag data follow the 16-byte tag header
+                bufs.append(np.ndarray((this['nsamp'], nchan),
+                                       dtype=_mmap_dtypes[ent.type],
+                                       buffer=mm, offset=ent.pos + 16))
+            self._mmap_bufs[fname] = bufs
+        return self._mmap_bufs[fname]
+
     def _read_segment_file(self, data, idx, fi, start, stop, cals, mult):
         """Read a segment of data from a file"""
         stop -= 1
         offset = 0
-        with _fiff_get_fid(self._filenames[fi]) as fid:
-            for this in self._raw_extras[fi]:
+        bufs = self._get_mmap_bufs(fi)
+        fid = _fiff_get_fid(self._filenames[fi]) if bufs is None else None
+        try:
+            for bi, this in enumerate(self._raw_extras[fi]):
                 #  Do we need this buffer
                 if this['last'] >= start:
                     #  The picking logic is a bit complicated
@@ -378,11 +423,15 @@ class RawFIF(_BaseRaw):
                     if picksamp > 0:
                         # only read data if it exists
                         if this['ent'] is not None:
-                            one = read_tag(fid, this['ent'].pos,
-                                           shape=(this['nsamp'],
-                                                  self.info['nchan']),
-                                           rlims=(first_pick, last_pick)).data
-                            one.shape = (picksamp, self.info['nchan'])
+                            if bufs is not None:
+                                one = bufs[bi][first_pick:last_pick]
+                            else:
+                                one = read_tag(fid, this['ent'].pos,
+                                               shape=(this['nsamp'],
+                                                      self.info['nchan']),
+                                               rlims=(first_pick,
+                                                      last_pick)).data
+                                one.shape = (picksamp, self.info['nchan'])
                             _mult_cal_one(data[:, offset:(offset + picksamp)],
                                           one.T, idx, cals, mult)
                         offset += picksamp
@@ -390,6 +439,21 @@ class RawFIF(_BaseRaw):
                 #   Done?
                 if this['last'] >= stop:
                     break
+        finally:
+            if fid is not None:
+                fid.close()
+
+    def close(self):
+        """Clean up the object, releasing any memory-mapped data buffers"""
+        if getattr(self, '_mmap_bufs', None) is not None:
+            self._mmap_bufs = dict()
+
+    def __getstate__(self):
+        """Drop the memory maps, they are recreated on demand"""
+        state = self.__dict__.copy()
+        if state.get('_mmap_bufs', None) is not None:
+            state['_mmap_bufs'] = dict()
+        return state
 
     def fix_mag_coil_types(self):
         """Fix Elekta magnetometer coil types
@@ -446,7 +510,11 @@ def read_raw_fif(fnames, allow_maxshield=False, preload=False,
         If True, the data will be preloaded into memory (fast, requires
         large amount of memory). If preload is a string, preload is the
         file name of a memory-mapped file which is used to store the data
-        on the hard drive (slower, requires less memory).
+        on the hard drive (slower, requires less memory). If preload is
+        'mmap', the data are not preloaded, but the data buffers of the
+        file are memory-mapped so that on-demand reads (e.g., for epoching)
+        slice the file directly instead of seeking and reading each tag.
+        This is not possible for compressed (.gz) files.
     proj : bool
         Apply the signal space projection (SSP) operators present in
         the file to the data. Note: Once the projectors have been
@@ -26,6 +26,8 @@ from mne.utils import (_TempDir, requires_pandas, slow_test,
 from mne.externals.six.moves import zip, cPickle as pickle
 from mne.io.proc_history import _get_sss_rank
 from mne.io.pick import _picks_by_type
+from mne.io.open import fiff_open
+from mne.io import base as io_base
 
 warnings.simplefilter('always')  # enable b/c these tests throw warnings
 
@@ -558,6 +560,80 @@ def test_io_complex():
         assert_allclose(raw2_data[:, :n_samp], raw_cp._data[picks, :n_samp])
 
 
+def test_io_mmap():
+    """Test reading with memory-mapped data buffers
+    """
+    tempdir = _TempDir()
+    info = create_info(['EEG %03d' % ii for ii in range(10)], 1000., 'eeg')
+    raw = RawArray(1e-5 * rng.randn(10, 5000), info)
+    temp_file = op.join(tempdir, 'raw.fif')
+    for fmt in ('short', 'int', 'single', 'double'):
+        raw.save(temp_file, fmt=fmt, buffer_size_sec=1., overwrite=True)
+        raw_read = Raw(temp_file, add_eeg_ref=False)
+        raw_mmap = Raw(temp_file, preload='mmap', add_eeg_ref=False)
+        assert_true(not raw_mmap.preload)
+        for sl in (slice(0, 100), slice(950, 3050), slice(None)):
+            assert_array_equal(raw_mmap[:, sl][0], raw_read[:, sl][0])
+            assert_array_equal(raw_mmap[[1, 3], sl][0],
+                               raw_read[[1, 3], sl][0])
+        # copies and pickles re-create the maps on demand
+        for raw_new in (raw_mmap.copy(),
+                        pickle.loads(pickle.dumps(raw_mmap))):
+            assert_array_equal(raw_new[:, :][0], raw_read[:, :][0])
+        raw_mmap.load_data()
+        assert_array_equal(raw_mmap._data, raw_read[:, :][0])
+    raw.save(temp_file + '.gz', overwrite=True)
+    assert_raises(ValueError, Raw, temp_file + '.gz', preload='mmap')
+
+
+def test_fiff_index_cache():
+    """Test caching of the tag directory and tree of FIF files
+    """
+    tempdir = _TempDir()
+    cache_dir = op.join(tempdir, 'cache')
+    os.mkdir(cache_dir)
+    info = create_info(['EEG %03d' % ii for ii in range(3)], 1000., 'eeg')
+    raw = RawArray(rng.randn(3, 2000), info)
+    temp_file = op.join(tempdir, 'raw.fif')
+    raw.save(temp_file, buffer_size_sec=0.1)
+    orig_dir = os.getenv('MNE_CACHE_DIR', None)
+    orig_size = os.getenv('MNE_FIFF_INDEX_CACHE_SIZE', None)
+    orig_use = os.getenv('MNE_USE_PERSISTENT_CACHE', None)
+    try:
+        os.environ['MNE_CACHE_DIR'] = cache_dir
+        os.environ['MNE_USE_PERSISTENT_CACHE'] = 'true'
+        os.environ['MNE_FIFF_INDEX_CACHE_SIZE'] = '1M'
+        fid, tree, directory = fiff_open(temp_file)
+        fid.close()
+        index_dir = op.join(cache_dir, 'fiff_index')
+        assert_equal(len(os.listdir(index_dir)), 1)
+        assert_true(os.listdir(index_dir)[0].endswith('.npz'))
+        fid, tree_cached, directory_cached = fiff_open(temp_file)
+        fid.close()
+        assert_equal([(d.kind, d.pos) for d in directory],
+                     [(d.kind, d.pos) for d in directory_cached])
+        assert_equal(len(tree['children']), len(tree_cached['children']))
+        assert_allclose(Raw(temp_file, add_eeg_ref=False)[:, :][0],
+                        raw[:, :][0], rtol=1e-6)
+        # modifying the file invalidates the entry
+        raw.crop(0, 1., copy=False).save(temp_file, overwrite=True)
+        assert_equal(Raw(temp_file, add_eeg_ref=False).n_times, 1001)
+        assert_equal(len(os.listdir(index_dir)), 2)
+        # least recently used entries get evicted
+        os.environ['MNE_FIFF_INDEX_CACHE_SIZE'] = '1'
+        raw.save(op.join(tempdir, 'raw2.fif'))
+        fiff_open(op.join(tempdir, 'raw2.fif'))[0].close()
+        assert_equal(len(os.listdir(index_dir)), 0)
+    finally:
+        for key, val in (('MNE_CACHE_DIR', orig_dir),
+                         ('MNE_FIFF_INDEX_CACHE_SIZE', orig_size),
+                         ('MNE_USE_PERSISTENT_CACHE', orig_use)):
+            if val is not None:
+                os.environ[key] = val
+            else:
+                del os.environ[key]
+
+
 @testing.requires_testing_data
 def test_getitem():
     """Test getitem/indexing of Raw
@@ -751,6 +827,48 @@ def test_filter():
     assert_array_almost_equal(data, data_notch, sig_dec_notch_fit)
 
 
+def test_filter_chunked():
+    """Test filtering data that are not preloaded in chunks
+    """
+    tempdir = _TempDir()
+    info = create_info(['EEG %03d' % ii for ii in range(4)] + ['STI 014'],
+                       1000., ['eeg'] * 4 + ['stim'])
+    raw = RawArray(rng.randn(5, 20000), info)
+    temp_file = op.join(tempdir, 'raw.fif')
+    data_buffer = op.join(tempdir, 'filt.dat')
+    raw.save(temp_file, buffer_size_sec=1.)
+    raw_band = Raw(temp_file, preload=True, add_eeg_ref=False)
+    raw_band.filter(1., 40., filter_length=2000)
+    raw_notch = Raw(temp_file, preload=True, add_eeg_ref=False)
+    raw_notch.notch_filter(50., filter_length=2000)
+    orig_size = io_base._FILTER_CHUNK_SIZE
+    try:
+        for chunk_size, n_jobs in ((orig_size, 1), (1, 1), (1, 2)):
+            io_base._FILTER_CHUNK_SIZE = chunk_size
+            raw_ooc = Raw(temp_file, add_eeg_ref=False)
+            raw_ooc.filter(1., 40., filter_length=2000, n_jobs=n_jobs,
+                           data_buffer=data_buffer)
+            assert_true(raw_ooc.preload)
+            assert_allclose(raw_ooc._data, raw_band._data, atol=1e-12)
+            assert_equal(raw_ooc.info['lowpass'], 40.)
+            assert_equal(raw_ooc.info['highpass'], 1.)
+            raw_ooc = Raw(temp_file, add_eeg_ref=False)
+            raw_ooc.notch_filter(50., filter_length=2000, n_jobs=n_jobs,
+                                 data_buffer=data_buffer)
+            assert_allclose(raw_ooc._data, raw_notch._data, atol=1e-12)
+    finally:
+        io_base._FILTER_CHUNK_SIZE = orig_size
+    raw_ooc = Raw(temp_file, add_eeg_ref=False)
+    assert_raises(RuntimeError, raw_ooc.filter, 1., 40.)
+    assert_raises(ValueError, raw_ooc.filter, 1., 40., method='iir',
+                  data_buffer=data_buffer)
+    assert_raises(ValueError, raw_ooc.filter, 1., 40., filter_length=30000,
+                  data_buffer=data_buffer)
+    # info is only updated once the data are filtered
+    assert_equal(raw_ooc.info['lowpass'], raw_notch.info['lowpass'])
+    assert_equal(raw_ooc.info['highpass'], raw_notch.info['highpass'])
+
+
 @testing.requires_testing_data
 def test_crop():
     """Test cropping raw files
@@ -6,13 +6,14 @@
 
 from ..externals.six import string_types
 import numpy as np
+import os
 import os.path as op
 from io import BytesIO
 
 from .tag import read_tag_info, read_tag, read_big, Tag
 from .tree import make_dir_tree, dir_tree_find
 from .constants import FIFF
-from ..utils import logger, verbose
+from ..utils import logger, verbose, _get_cache, _get_cached
 from ..externals import six
 from ..fixes import gzip_open
 
@@ -73,6 +74,111 @@ def _get_next_fname(fid, fname, tree):
     return next_fname
 
 
+def _get_index_key(fname):
+    """Helper to get what the tag directory and tree of a file depend on
+
+    Returns None if the index of the file cannot be cached.
+    """
+    if not isinstance(fname, string_types) or \
+            _get_cache('fiff_index') is None:
+        return None
+    fname = op.realpath(fname)
+    stat = os.stat(fname)
+    # the float st_mtime can miss quick rewrites, use nanoseconds if we can
+    mtime = getattr(stat, 'st_mtime_ns', repr(stat.st_mtime))
+    return repr((fname, stat.st_size, mtime))
+
+
+def _make_index(fid, tag, fname):
+    """Helper to read or create the tag directory and make the tree
+
+    tag is the directory pointer tag of the file.
+    """
+    logger.debug('    Creating tag directory for %s...' % fname)
+    dirpos = int(tag.data)
+    if dirpos > 0:
+        tag = read_tag(fid, dirpos)
+        directory = tag.data
+    else:
+        fid.seek(0, 0)
+        directory = list()
+        while tag.next >= 0:
+            pos = fid.tell()
+            tag = read_tag_info(fid)
+            if tag is None:
+                break  # HACK : to fix file ending with empty tag...
+            else:
+                tag.pos = pos
+                directory.append(tag)
+
+    tree, _ = make_dir_tree(fid, directory)
+    return directory, tree
+
+
+def _make_index_arrays(fid, tag, fname):
+    """Helper to make the tag directory and tree as arrays for caching"""
+    return _index_to_arrays(*_make_index(fid, tag, fname))
+
+
+def _index_to_arrays(directory, tree):
+    """Helper to convert a tag directory and tree to arrays for caching
+
+    The tree nodes are stored in depth-first order, each with the index of
+    its parent node and the indices of its entries in the directory.
+    """
+    tag_idx = dict((id(tag), ii) for ii, tag in enumerate(directory))
+    nodes, parents, entries, ids = list(), list(), list(), list()
+    stack = [(tree, -1)]
+    while len(stack) > 0:
+        node, parent = stack.pop()
+        parents.append(parent)
+        node_entries = [tag_idx[id(tag)] for tag in node['directory'] or []]
+        nodes.append([int(node['block']), len(node_entries),
+                      isinstance(node['block'], np.ndarray)])
+        entries.extend(node_entries)
+        for key in ('id', 'parent_id'):
+            id_ = node[key]
+            ids.append([-1] * 6 if id_ is None else
+                       [1, id_['version'], id_['machid'][0],
+                        id_['machid'][1], id_['secs'], id_['usecs']])
+        stack.extend((child, len(nodes) - 1)
+                     for child in node['children'][::-1])
+    return dict(directory=np.array([[tag.kind, tag.type, tag.size, tag.next,
+                                     tag.pos] for tag in directory],
+                                   np.int64).reshape(-1, 5),
+                nodes=np.array(nodes, np.int64),
+                parents=np.array(parents, np.int64),
+                entries=np.array(entries, np.int64),
+                ids=np.array(ids, np.int64).reshape(-1, 2, 6))
+
+
+def _index_from_arrays(index):
+    """Helper to restore the tag directory and tree from cached arrays"""
+    directory = [Tag(*ent) for ent in index['directory'].tolist()]
+    nodes, ids = list(), index['ids'].tolist()
+    entries = index['entries'].tolist()
+    offset = 0
+    for ni, ((block, nent, block_array), parent) in enumerate(
+            zip(index['nodes'].tolist(), index['parents'].tolist())):
+        if block_array:  # as read from the block start tag
+            block = np.array([block], '>i4')
+        node = dict(block=block, nent=nent, nchild=0, children=list())
+        for key, id_ in zip(('id', 'parent_id'), ids[ni]):
+            node[key] = None if id_[0] < 0 else dict(
+                version=id_[1], machid=np.array(id_[2:4], '>i4'),
+                secs=id_[4], usecs=id_[5])
+        node['directory'] = [directory[ii]
+                             for ii in entries[offset:offset + nent]]
+        if nent == 0:
+            node['directory'] = None
+        offset += nent
+        if parent >= 0:
+            nodes[parent]['children'].append(node)
+            nodes[parent]['nchild'] += 1
+        nodes.append(node)
+    return directory, nodes[0]
+
+
 @verbose
 def fiff_open(fname, preload=False, verbose=None):
     """Open a FIF file.
@@ -97,7 +203,14 @@ def fiff_open(fname, preload=False, verbose=None):
         lists and tags.
     directory : list
         A list of tags.
+
+    Notes
+    -----
+    The tag directory and tree can be stored in a persistent cache, keyed
+    by the path, size and modification time of the file, see
+    :func:`mne.set_cache_dir`.
     """
+    index_key = _get_index_key(fname)
     fid = _fiff_get_fid(fname)
     # do preloading of entire file
     if preload:
@@ -125,25 +238,14 @@ def fiff_open(fname, preload=False, verbose=None):
         raise ValueError('file does not have a directory pointer')
 
     #   Read or create the directory tree
-    logger.debug('    Creating tag directory for %s...' % fname)
-
-    dirpos = int(tag.data)
-    if dirpos > 0:
-        tag = read_tag(fid, dirpos)
-        directory = tag.data
+    if index_key is None:
+        directory, tree = _make_index(fid, tag, fname)
     else:
-        fid.seek(0, 0)
-        directory = list()
-        while tag.next >= 0:
-            pos = fid.tell()
-            tag = read_tag_info(fid)
-            if tag is None:
-                break  # HACK : to fix file ending with empty tag...
-            else:
-                tag.pos = pos
-                directory.append(tag)
-
-    tree, _ = make_dir_tree(fid, directory)
+        index, cached = _get_cached('fiff_index', index_key,
+                                    _make_index_arrays, fid, tag, fname)
+        if cached:
+            logger.debug('    Using cached tag directory for %s' % fname)
+        directory, tree = _index_from_arrays(index)
 
     logger.debug('[done]')
 
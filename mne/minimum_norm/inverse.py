@@ -32,14 +32,41 @@ from ..source_space import (_read_source_spaces_from_tree,
                             _write_source_spaces_to_fid, label_src_vertno_sel)
 from ..transforms import _ensure_trans, transform_surface_to
 from ..source_estimate import _make_stc
-from ..utils import check_fname, logger, verbose
+from ..utils import check_fname, logger, verbose, object_hash, _LRUCache
+from ..externals.six import string_types
 from functools import reduce
 
+# number of source time points computed at once by the batched inverse
+# (larger blocks do not help as the products become memory bound)
+_INV_BUFFER_SIZE = 2 ** 20
+# number of source time points per segment when streaming raw data to disk
+_RAW_INV_BUFFER_SIZE = 2 ** 24
+
+# maximum number of prepared operators and imaging kernels kept with each
+# inverse operator (see _get_inverse_cache), and their total size
+_INV_CACHE_SIZES = dict(inverse=4, kernel=32)
+_INV_CACHE_BYTES = '256M'
+
 
 class InverseOperator(dict):
     """InverseOperator class to represent info from inverse operator
+
+    Notes
+    -----
+    The prepared operators and imaging kernels computed when applying an
+    inverse operator are kept with it, so that applying it again (e.g., to
+    many conditions or labels) reuses them. They are computed again once an
+    entry of the operator is replaced (e.g., ``inv['sing'] = ...``), but the
+    arrays of an operator that has been applied must not be modified in
+    place. Copies of the operator do not share them.
     """
 
+    def __getstate__(self):
+        """Do not copy or pickle the cached results"""
+        state = self.__dict__.copy()
+        state.pop('_caches', None)
+        return state
+
     def __repr__(self):
         """Summarize inverse info instead of printing all"""
 
@@ -694,6 +721,63 @@ def _assemble_kernel(inv, label, method, pick_ori, verbose=None):
     return K, noise_norm, vertno
 
 
+def _get_inverse_cache(inv, kind):
+    """Get the cache of results of a kind computed from an inverse operator
+
+    The caches are stored with the operator, so they are freed along with
+    it. They are reset when an entry of the operator is replaced. Returns
+    None if the operator cannot hold them (e.g., a plain dict).
+    """
+    if not isinstance(inv, InverseOperator):
+        return None
+    caches = inv.__dict__.get('_caches')
+    if caches is None or len(caches['items']) != len(inv) or any(
+            inv.get(key) is not val for key, val in caches['items'].items()):
+        caches = dict(items=dict(inv))
+        inv._caches = caches
+    if kind not in caches:
+        caches[kind] = _LRUCache(_INV_CACHE_SIZES[kind], _INV_CACHE_BYTES)
+    return caches[kind]
+
+
+def _prepare_inverse_cached(orig, nave, lambda2, method, prepared):
+    """Get a prepared inverse operator, reusing earlier ones
+
+    The returned operator can be shared between calls and must not be
+    modified.
+    """
+    if prepared:
+        return orig
+    cache = _get_inverse_cache(orig, 'inverse')
+    if cache is None:
+        return prepare_inverse_operator(orig, nave, lambda2, method)
+    return cache.get((nave, lambda2, method), prepare_inverse_operator, orig,
+                     nave, lambda2, method)
+
+
+def _get_kernel_key(inv, label, method, pick_ori):
+    """Get the key of an imaging kernel in the cache of inv"""
+    label_key = None
+    if label is not None:
+        label_key = object_hash(label_src_vertno_sel(label, inv['src'])[1])
+    return (label_key, method, pick_ori)
+
+
+def _assemble_kernel_cached(inv, label, method, pick_ori):
+    """Assemble the imaging kernel, reusing earlier ones
+
+    The returned arrays are read-only if they are cached.
+    """
+    cache = _get_inverse_cache(inv, 'kernel')
+    if cache is None:
+        return _assemble_kernel(inv, label, method, pick_ori)
+    K, noise_norm, vertno = cache.get(
+        _get_kernel_key(inv, label, method, pick_ori), _assemble_kernel,
+        inv, label, method, pick_ori)
+    # the vertices end up in (and can be modified with) the source estimates
+    return K, noise_norm, [v.copy() for v in vertno]
+
+
 def _check_method(method):
     if method not in ["MNE", "dSPM", "sLORETA"]:
         raise ValueError('method parameter should be "MNE" or "dSPM" '
@@ -772,17 +856,16 @@ def apply_inverse(evoked, inverse_operator, lambda2=1. / 9.,
 
     _check_ch_names(inverse_operator, evoked.info)
 
-    if not prepared:
-        inv = prepare_inverse_operator(inverse_operator, nave, lambda2, method)
-    else:
-        inv = inverse_operator
+    inv = _prepare_inverse_cached(inverse_operator, nave, lambda2, method,
+                                  prepared)
     #
     #   Pick the correct channels from the data
     #
     sel = _pick_channels_inverse_operator(evoked.ch_names, inv)
     logger.info('Picked %d channels from the data' % len(sel))
     logger.info('Computing inverse...')
-    K, noise_norm, vertno = _assemble_kernel(inv, label, method, pick_ori)
+    K, noise_norm, vertno = _assemble_kernel_cached(inv, label, method,
+                                                    pick_ori)
     sol = np.dot(K, evoked.data[sel])  # apply imaging kernel
 
     is_free_ori = (inverse_operator['source_ori'] ==
@@ -811,7 +894,7 @@ def apply_inverse(evoked, inverse_operator, lambda2=1. / 9.,
 def apply_inverse_raw(raw, inverse_operator, lambda2, method="dSPM",
                       label=None, start=None, stop=None, nave=1,
                       time_func=None, pick_ori=None, buffer_size=None,
-                      prepared=False, verbose=None):
+                      prepared=False, out_fname=None, verbose=None):
     """Apply inverse operator to Raw data
 
     Parameters
@@ -848,9 +931,20 @@ def apply_inverse_raw(raw, inverse_operator, lambda2, method="dSPM",
         reduces the memory requirements by approx. a factor of 3 (assuming
         buffer_size << data length).
         Note that this setting has no effect for fixed-orientation inverse
-        operators.
+        operators, unless ``out_fname`` is used.
     prepared : bool
         If True, do not call `prepare_inverse_operator`.
+    out_fname : str | None
+        If not None, the raw data are read and processed in segments of
+        ``buffer_size`` samples (by default, segments with about 16 million
+        source time points) and the source time courses are written to a
+        memory-mapped file with this name, which is used as the data of the
+        returned source estimate. This way, only one segment of sensor and
+        source data is held in memory at a time. ``time_func`` is applied
+        to each segment separately.
+
+        .. versionadded:: 0.11
+
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -873,10 +967,8 @@ def apply_inverse_raw(raw, inverse_operator, lambda2, method="dSPM",
     #
     #   Set up the inverse according to the parameters
     #
-    if not prepared:
-        inv = prepare_inverse_operator(inverse_operator, nave, lambda2, method)
-    else:
-        inv = inverse_operator
+    inv = _prepare_inverse_cached(inverse_operator, nave, lambda2, method,
+                                  prepared)
     #
     #   Pick the correct channels from the data
     #
@@ -884,16 +976,27 @@ def apply_inverse_raw(raw, inverse_operator, lambda2, method="dSPM",
     logger.info('Picked %d channels from the data' % len(sel))
     logger.info('Computing inverse...')
 
+    K, noise_norm, vertno = _assemble_kernel_cached(inv, label, method,
+                                                    pick_ori)
+
+    is_free_ori = (inverse_operator['source_ori'] ==
+                   FIFF.FIFFV_MNE_FREE_ORI and pick_ori is None)
+
+    if out_fname is not None:
+        sol, tmin = _apply_kernel_raw_segments(
+            raw, sel, start, stop, time_func, K, noise_norm, is_free_ori,
+            buffer_size, out_fname)
+        stc = _make_stc(sol, vertices=vertno, tmin=tmin,
+                        tstep=1.0 / raw.info['sfreq'],
+                        subject=_subject_from_inverse(inverse_operator))
+        logger.info('[done]')
+        return stc
+
     data, times = raw[sel, start:stop]
 
     if time_func is not None:
         data = time_func(data)
 
-    K, noise_norm, vertno = _assemble_kernel(inv, label, method, pick_ori)
-
-    is_free_ori = (inverse_operator['source_ori'] ==
-                   FIFF.FIFFV_MNE_FREE_ORI and pick_ori is None)
-
     if buffer_size is not None and is_free_ori:
         # Process the data in segments to conserve memory
         n_seg = int(np.ceil(data.shape[1] / float(buffer_size)))
@@ -930,10 +1033,46 @@ def apply_inverse_raw(raw, inverse_operator, lambda2, method="dSPM",
     return stc
 
 
-def _apply_inverse_epochs_gen(epochs, inverse_operator, lambda2, method='dSPM',
-                              label=None, nave=1, pick_ori=None,
-                              prepared=False, verbose=None):
-    """ see apply_inverse_epochs """
+def _apply_kernel_raw_segments(raw, sel, start, stop, time_func, K,
+                               noise_norm, is_free_ori, buffer_size,
+                               out_fname):
+    """Apply an imaging kernel to raw data segment by segment
+
+    The solution is written to a memory-mapped file.
+    """
+    from ..io.base import _allocate_data
+    start, stop = slice(start, stop).indices(raw.n_times)[:2]
+    if stop <= start:
+        raise ValueError('No data in the requested time span (start=%d, '
+                         'stop=%d)' % (start, stop))
+    if buffer_size is None:
+        buffer_size = max(int(_RAW_INV_BUFFER_SIZE // K.shape[0]), 1)
+    n_sources = K.shape[0] // 3 if is_free_ori else K.shape[0]
+    sol = _allocate_data(None, out_fname, (n_sources, stop - start),
+                         np.float64)
+    n_seg = int(np.ceil((stop - start) / float(buffer_size)))
+    logger.info('computing inverse and writing it to %s (using %d '
+                'segments)...' % (out_fname, n_seg))
+    tmin = float(raw.times[start])
+    for pos in range(start, stop, buffer_size):
+        data = raw[sel, pos:min(pos + buffer_size, stop)][0]
+        if time_func is not None:
+            data = time_func(data)
+        this_sol = np.dot(K, data)
+        if is_free_ori:
+            this_sol = combine_xyz(this_sol)
+        if noise_norm is not None:
+            this_sol *= noise_norm
+        sol[:, pos - start:pos - start + this_sol.shape[1]] = this_sol
+        logger.info('segment %d / %d done..'
+                    % ((pos - start) // buffer_size + 1, n_seg))
+    sol.flush()
+    return sol, tmin
+
+
+def _setup_inverse_epochs(epochs, inverse_operator, lambda2, method, label,
+                          nave, pick_ori, prepared):
+    """Set up the kernel for applying an inverse operator to epochs"""
     method = _check_method(method)
     pick_ori = _check_ori(pick_ori)
 
@@ -942,27 +1081,36 @@ def _apply_inverse_epochs_gen(epochs, inverse_operator, lambda2, method='dSPM',
     #
     #   Set up the inverse according to the parameters
     #
-    if not prepared:
-        inv = prepare_inverse_operator(inverse_operator, nave, lambda2, method)
-    else:
-        inv = inverse_operator
+    inv = _prepare_inverse_cached(inverse_operator, nave, lambda2, method,
+                                  prepared)
     #
     #   Pick the correct channels from the data
     #
     sel = _pick_channels_inverse_operator(epochs.ch_names, inv)
     logger.info('Picked %d channels from the data' % len(sel))
     logger.info('Computing inverse...')
-    K, noise_norm, vertno = _assemble_kernel(inv, label, method, pick_ori)
-
-    tstep = 1.0 / epochs.info['sfreq']
-    tmin = epochs.times[0]
+    K, noise_norm, vertno = _assemble_kernel_cached(inv, label, method,
+                                                    pick_ori)
 
     is_free_ori = (inverse_operator['source_ori'] ==
                    FIFF.FIFFV_MNE_FREE_ORI and pick_ori is None)
 
     if not is_free_ori and noise_norm is not None:
         # premultiply kernel with noise normalization
-        K *= noise_norm
+        K = K * noise_norm
+    return K, noise_norm, vertno, sel, is_free_ori
+
+
+def _apply_inverse_epochs_gen(epochs, inverse_operator, lambda2, method='dSPM',
+                              label=None, nave=1, pick_ori=None,
+                              prepared=False, verbose=None):
+    """ see apply_inverse_epochs """
+    K, noise_norm, vertno, sel, is_free_ori = _setup_inverse_epochs(
+        epochs, inverse_operator, lambda2, method, label, nave, pick_ori,
+        prepared)
+
+    tstep = 1.0 / epochs.info['sfreq']
+    tmin = epochs.times[0]
 
     subject = _subject_from_inverse(inverse_operator)
     for k, e in enumerate(epochs):
@@ -991,11 +1139,59 @@ def _apply_inverse_epochs_gen(epochs, inverse_operator, lambda2, method='dSPM',
     logger.info('[done]')
 
 
+def _apply_inverse_epochs_array(epochs, inverse_operator, lambda2, method,
+                                label, nave, pick_ori, prepared, data_buffer,
+                                dtype):
+    """Apply the inverse to blocks of epochs, see apply_inverse_epochs"""
+    from ..io.base import _allocate_data
+    K, noise_norm, vertno, sel, is_free_ori = _setup_inverse_epochs(
+        epochs, inverse_operator, lambda2, method, label, nave, pick_ori,
+        prepared)
+    K = K.astype(dtype)
+    if not epochs._bad_dropped:
+        logger.info('Dropping bad epochs...')
+        epochs.drop_bad_epochs()
+    n_epochs, n_times = len(epochs), len(epochs.times)
+    n_sources = K.shape[0] // 3 if is_free_ori else K.shape[0]
+    data = _allocate_data(None, data_buffer, (n_epochs, n_sources, n_times),
+                          dtype)
+    # stack the epochs in time so that each block needs a single product
+    n_block = max(int(_INV_BUFFER_SIZE // (K.shape[0] * n_times)), 1)
+    logger.info('Processing %d epochs in blocks of %d...'
+                % (n_epochs, n_block))
+    block = list()
+    start = 0
+    for e in epochs:
+        block.append(e[sel])
+        if len(block) == n_block:
+            _apply_kernel_block(K, noise_norm, is_free_ori, block, data, start)
+            start += len(block)
+            block = list()
+    if len(block) > 0:
+        _apply_kernel_block(K, noise_norm, is_free_ori, block, data, start)
+    logger.info('[done]')
+    return data, vertno, epochs.times[0], 1.0 / epochs.info['sfreq']
+
+
+def _apply_kernel_block(K, noise_norm, is_free_ori, block, data, start):
+    """Apply an imaging kernel to a list of epochs and store the result"""
+    n_times = block[0].shape[1]
+    sol = np.dot(K, np.concatenate(block, axis=1).astype(K.dtype))
+    if is_free_ori:
+        # combine current components (non-linear)
+        sol = combine_xyz(sol)
+        if noise_norm is not None:
+            sol *= noise_norm
+    sol.shape = (sol.shape[0], len(block), n_times)
+    data[start:start + len(block)] = sol.transpose(1, 0, 2)
+
+
 @verbose
 def apply_inverse_epochs(epochs, inverse_operator, lambda2, method="dSPM",
                          label=None, nave=1, pick_ori=None,
                          return_generator=False,
-                         prepared=False, verbose=None):
+                         prepared=False, return_array=False,
+                         dtype=np.float64, verbose=None):
     """Apply inverse operator to Epochs
 
     Parameters
@@ -1024,13 +1220,41 @@ def apply_inverse_epochs(epochs, inverse_operator, lambda2, method="dSPM",
         over the stcs without having to keep them all in memory.
     prepared : bool
         If True, do not call `prepare_inverse_operator`.
+    return_array : bool | str
+        If True, apply the inverse operator to blocks of epochs at once and
+        return the source time courses of all epochs in a single array
+        instead of a list of source estimates. If str, the array is stored
+        in a memory-mapped file with that name (like ``preload`` for Raw).
+        Bad epochs are dropped first if needed.
+
+        .. versionadded:: 0.11
+
+    dtype : numpy dtype
+        Data type used for the computations when ``return_array`` is used,
+        e.g. ``np.float32`` to halve the memory requirements.
+
+        .. versionadded:: 0.11
+
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
     Returns
     -------
     stc : list of SourceEstimate or VolSourceEstimate
-        The source estimates for all epochs.
+        The source estimates for all epochs. Only returned if
+        ``return_array`` is False.
+    data : ndarray, shape (n_epochs, n_sources, n_times)
+        The source time courses of all epochs. Only returned if
+        ``return_array`` is used.
+    vertices : list of array
+        The vertices of the sources in ``data``.
+        Only returned if ``return_array`` is used.
+    tmin : float
+        Time of the first sample in seconds. Only returned if
+        ``return_array`` is used.
+    tstep : float
+        Time step between successive samples in seconds. Only returned if
+        ``return_array`` is used.
 
     See Also
     --------
@@ -1038,6 +1262,15 @@ def apply_inverse_epochs(epochs, inverse_operator, lambda2, method="dSPM",
     apply_inverse : Apply inverse operator to evoked object
     """
     _check_reference(epochs)
+    if return_array is not False:
+        if return_generator:
+            raise ValueError('return_generator cannot be used together '
+                             'with return_array')
+        data_buffer = (return_array if isinstance(return_array, string_types)
+                       else None)
+        return _apply_inverse_epochs_array(
+            epochs, inverse_operator, lambda2, method, label, nave, pick_ori,
+            prepared, data_buffer, dtype)
     stcs = _apply_inverse_epochs_gen(epochs, inverse_operator, lambda2,
                                      method=method, label=label, nave=nave,
                                      pick_ori=pick_ori, verbose=verbose,
@@ -315,6 +315,61 @@ def test_apply_inverse_operator():
     assert_raises(ValueError, apply_inverse, evoked, inv_op, lambda2, "MNE")
 
 
+@testing.requires_testing_data
+def test_inverse_cache():
+    """Test reusing prepared inverse operators and kernels
+    """
+    inverse_operator = read_inverse_operator(fname_full)
+    evoked = _get_evoked()
+    label = read_label(fname_label % 'Aud-lh')
+
+    def n_cached(inv, kind):
+        return len(inv._caches[kind]._keys)
+
+    stc = apply_inverse(evoked, inverse_operator, lambda2, "dSPM")
+    inv = inverse_operator._caches['inverse']._data[(evoked.nave, lambda2,
+                                                     "dSPM")]
+    assert_equal(n_cached(inverse_operator, 'inverse'), 1)
+    assert_equal(n_cached(inv, 'kernel'), 1)
+    # the same operator is not prepared again
+    stc_2 = apply_inverse(evoked, inverse_operator, lambda2, "dSPM")
+    assert_equal(n_cached(inverse_operator, 'inverse'), 1)
+    assert_equal(n_cached(inv, 'kernel'), 1)
+    assert_array_equal(stc.data, stc_2.data)
+    # cached entries are protected, and the vertices are not shared
+    assert_true(not inv._caches['kernel']._data[
+        inv._caches['kernel']._keys[0]][0].flags.writeable)
+    stc_2.expand([np.arange(10), np.arange(10)])
+    assert_array_equal(apply_inverse(evoked, inverse_operator, lambda2,
+                                     "dSPM").vertices[0], stc.vertices[0])
+    # but other parameters and labels need another operator or kernel
+    stc_label = apply_inverse(evoked, inverse_operator, lambda2, "dSPM",
+                              label=label)
+    assert_equal(n_cached(inverse_operator, 'inverse'), 1)
+    assert_equal(n_cached(inv, 'kernel'), 2)
+    assert_array_almost_equal(stc.in_label(label).data, stc_label.data)
+    stc_mne = apply_inverse(evoked, inverse_operator, lambda2, "MNE")
+    assert_equal(n_cached(inverse_operator, 'inverse'), 2)
+    assert_true(np.abs(stc_mne.data - stc.data).max() > 1)
+    # kernels of prepared operators are kept with them
+    inv_op = prepare_inverse_operator(inverse_operator, nave=evoked.nave,
+                                      lambda2=lambda2, method="MNE")
+    assert_array_almost_equal(apply_inverse(evoked, inv_op, lambda2, "MNE",
+                                            prepared=True).data, stc_mne.data)
+    assert_equal(n_cached(inv_op, 'kernel'), 1)
+    assert_true('inverse' not in inv_op._caches)
+    # copies do not share the cache
+    inv_op = copy.deepcopy(inverse_operator)
+    assert_true(not hasattr(inv_op, '_caches'))
+    # replacing an entry of the operator resets the cache
+    inverse_operator['sing'] = inverse_operator['sing'] * 2.
+    stc_2 = apply_inverse(evoked, inverse_operator, lambda2, "dSPM")
+    assert_equal(n_cached(inverse_operator, 'inverse'), 1)
+    assert_true(np.abs(stc_2.data - stc.data).max() > 1e-3)
+    # plain dicts are not cached
+    apply_inverse(evoked, dict(inverse_operator), lambda2, "dSPM")
+
+
 @testing.requires_testing_data
 def test_make_inverse_operator_fixed():
     """Test MNE inverse computation (fixed orientation)
@@ -493,6 +548,21 @@ def test_apply_mne_inverse_raw():
         assert_array_almost_equal(stc2.times, times)
         assert_array_almost_equal(stc.data, stc2.data)
 
+        # stream the solution to disk
+        tempdir = _TempDir()
+        stc3 = apply_inverse_raw(raw, inverse_operator, lambda2, "dSPM",
+                                 label=label_lh, start=start, stop=stop,
+                                 nave=1, pick_ori=pick_ori, buffer_size=3,
+                                 prepared=True,
+                                 out_fname=op.join(tempdir, 'stc.dat'))
+        assert_true(isinstance(stc3.data, np.memmap))
+        assert_array_almost_equal(stc3.times, times)
+        assert_array_almost_equal(stc.data, stc3.data)
+        del stc3
+    assert_raises(ValueError, apply_inverse_raw, raw, inverse_operator,
+                  lambda2, "dSPM", start=stop, stop=start, prepared=True,
+                  out_fname=op.join(tempdir, 'stc.dat'))
+
 
 @testing.requires_testing_data
 def test_apply_mne_inverse_fixed_raw():
@@ -598,6 +668,34 @@ def test_apply_mne_inverse_epochs():
     assert_true(label_stc.subject == 'sample')
     assert_array_almost_equal(stcs_rh[0].data, label_stc.data)
 
+    # test the batched computation returning a single array
+    tempdir = _TempDir()
+    for label, pick_ori in ((label_lh, 'normal'), (None, 'normal'),
+                            (None, None)):
+        stcs = apply_inverse_epochs(epochs, inverse_operator, lambda2, "dSPM",
+                                    label=label, pick_ori=pick_ori,
+                                    prepared=True)
+        data, vertices, tmin, tstep = apply_inverse_epochs(
+            epochs, inverse_operator, lambda2, "dSPM", label=label,
+            pick_ori=pick_ori, prepared=True, return_array=True)
+        assert_equal(data.shape, (len(stcs),) + stcs[0].data.shape)
+        assert_array_almost_equal(data, [stc.data for stc in stcs])
+        for v1, v2 in zip(vertices, stcs[0].vertices):
+            assert_array_equal(v1, v2)
+        assert_allclose(tmin, stcs[0].tmin)
+        assert_allclose(tstep, stcs[0].tstep)
+        data_32 = apply_inverse_epochs(
+            epochs, inverse_operator, lambda2, "dSPM", label=label,
+            pick_ori=pick_ori, prepared=True, dtype=np.float32,
+            return_array=op.join(tempdir, 'stcs.dat'))[0]
+        assert_true(isinstance(data_32, np.memmap))
+        assert_equal(data_32.dtype, np.float32)
+        assert_allclose(data_32, data, rtol=1e-4, atol=1e-4 * data.max())
+        del data_32
+    assert_raises(ValueError, apply_inverse_epochs, epochs, inverse_operator,
+                  lambda2, "dSPM", prepared=True, return_array=True,
+                  return_generator=True)
+
 
 @testing.requires_testing_data
 def test_make_inverse_operator_bads():
@@ -15,10 +15,13 @@ from ..time_frequency.tfr import cwt, morlet
 from ..time_frequency.multitaper import (dpss_windows, _psd_from_mt,
                                          _psd_from_mt_adaptive, _mt_spectra)
 from ..baseline import rescale
-from .inverse import (combine_xyz, prepare_inverse_operator, _assemble_kernel,
+from .inverse import (combine_xyz, _prepare_inverse_cached,
+                      _assemble_kernel_cached, _get_inverse_cache,
+                      _get_kernel_key,
                       _pick_channels_inverse_operator, _check_method,
                       _check_ori, _subject_from_inverse)
 from ..parallel import parallel_func
+from ..cuda import _get_fft
 from ..utils import logger, verbose
 from ..externals import six
 
@@ -28,10 +31,8 @@ def _prepare_source_params(inst, inverse_operator, label=None,
                            decim=1, pca=True, pick_ori="normal",
                            prepared=False, verbose=None):
     """Prepare inverse operator and params for spectral / TFR analysis"""
-    if not prepared:
-        inv = prepare_inverse_operator(inverse_operator, nave, lambda2, method)
-    else:
-        inv = inverse_operator
+    inv = _prepare_inverse_cached(inverse_operator, nave, lambda2, method,
+                                  prepared)
     #
     #   Pick the correct channels from the data
     #
@@ -45,14 +46,18 @@ def _prepare_source_params(inst, inverse_operator, label=None,
     #   This does all the data transformations to compute the weights for the
     #   eigenleads
     #
-    K, noise_norm, vertno = _assemble_kernel(inv, label, method, pick_ori)
+    # the kernel (and its PCA) are reused when e.g. looping over conditions
+    K, noise_norm, vertno = _assemble_kernel_cached(inv, label, method,
+                                                    pick_ori)
 
     if pca:
-        U, s, Vh = linalg.svd(K, full_matrices=False)
-        rank = np.sum(s > 1e-8 * s[0])
-        K = s[:rank] * U[:, :rank]
-        Vh = Vh[:rank]
-        logger.info('Reducing data rank to %d' % rank)
+        cache = _get_inverse_cache(inv, 'kernel')
+        if cache is None:
+            K, Vh = _reduce_kernel_rank(K)
+        else:
+            key = _get_kernel_key(inv, label, method, pick_ori) + ('pca',)
+            K, Vh = cache.get(key, _reduce_kernel_rank, K)
+        logger.info('Reducing data rank to %d' % len(Vh))
     else:
         Vh = None
     is_free_ori = inverse_operator['source_ori'] == FIFF.FIFFV_MNE_FREE_ORI
@@ -60,6 +65,13 @@ def _prepare_source_params(inst, inverse_operator, label=None,
     return K, sel, Vh, vertno, is_free_ori, noise_norm
 
 
+def _reduce_kernel_rank(K):
+    """Get the PCA of an imaging kernel"""
+    U, s, Vh = linalg.svd(K, full_matrices=False)
+    rank = np.sum(s > 1e-8 * s[0])
+    return s[:rank] * U[:, :rank], Vh[:rank]
+
+
 @verbose
 def source_band_induced_power(epochs, inverse_operator, bands, label=None,
                               lambda2=1.0 / 9.0, method="dSPM", nave=1,
@@ -450,6 +462,7 @@ def compute_source_psd(raw, inverse_operator, lambda2=1. / 9., method="dSPM",
     Fs = raw.info['sfreq']
     window = hanning(n_fft)
     freqs = fftpack.fftfreq(n_fft, 1. / Fs)
+    fft = _get_fft()[0]
     freqs_mask = (freqs >= 0) & (freqs >= fmin) & (freqs <= fmax)
     freqs = freqs[freqs_mask]
     fstep = np.mean(np.diff(freqs))
@@ -467,7 +480,7 @@ def compute_source_psd(raw, inverse_operator, lambda2=1. / 9., method="dSPM",
 
         data *= window[None, :]
 
-        data_fft = fftpack.fft(data)[:, freqs_mask]
+        data_fft = fft(data)[:, freqs_mask]
         sol = np.dot(K, data_fft)
 
         if is_free_ori and pick_ori is None:
@@ -10,7 +10,7 @@ import logging
 import os
 
 from . import get_config
-from .utils import logger, verbose
+from .utils import logger, verbose, _parse_size
 from .fixes import _get_args
 
 if 'MNE_FORCE_SERIAL' in os.environ:
@@ -18,6 +18,30 @@ if 'MNE_FORCE_SERIAL' in os.environ:
 else:
     _force_serial = None
 
+# process ID, Parallel instance, number of jobs and memmapping threshold of
+# the active pool
+_pool = None
+
+
+def _get_joblib():
+    """Helper to import Parallel and delayed from joblib if available"""
+    try:
+        from joblib import Parallel, delayed
+    except ImportError:
+        try:
+            from sklearn.externals.joblib import Parallel, delayed
+        except ImportError:
+            Parallel = delayed = None
+    return Parallel, delayed
+
+
+def _get_active_pool():
+    """Helper to get the pool of the current process, if any"""
+    # worker processes may inherit the global, but cannot use the pool
+    if _pool is not None and _pool[0] == os.getpid():
+        return _pool
+    return None
+
 
 @verbose
 def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
@@ -39,7 +63,8 @@ def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
         triggers automated memmory mapping. Can be an int in Bytes,
         or a human-readable string, e.g., '1M' for 1 megabyte.
         Use None to disable memmaping of large arrays. Use 'auto' to
-        use the value set using mne.set_memmap_min_size.
+        use the value set using mne.set_memmap_min_size (or the value of
+        the active :class:`pool`).
 
     Returns
     -------
@@ -49,6 +74,16 @@ def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
         func if not parallel or delayed(func)
     n_jobs: int
         Number of jobs >= 0
+
+    Notes
+    -----
+    Memory-mapped arrays are opened copy-on-write (``mmap_mode='c'``), so
+    ``func`` can modify its inputs in place without changing the files or
+    the data of other workers.
+
+    Within a :class:`pool` context, the workers of the pool are used if
+    ``n_jobs`` matches that of the pool and ``max_nbytes`` is ``'auto'`` or
+    matches that of the pool.
     """
     # for a single job, we don't need joblib
     if n_jobs == 1:
@@ -57,31 +92,50 @@ def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
         parallel = list
         return parallel, my_func, n_jobs
 
-    try:
-        from joblib import Parallel, delayed
-    except ImportError:
-        try:
-            from sklearn.externals.joblib import Parallel, delayed
-        except ImportError:
-            logger.warning('joblib not installed. Cannot run in parallel.')
-            n_jobs = 1
-            my_func = func
-            parallel = list
-            return parallel, my_func, n_jobs
+    Parallel, delayed = _get_joblib()
+    if Parallel is None:
+        logger.warning('joblib not installed. Cannot run in parallel.')
+        n_jobs = 1
+        my_func = func
+        parallel = list
+        return parallel, my_func, n_jobs
 
-    # check if joblib is recent enough to support memmaping
-    p_args = _get_args(Parallel.__init__)
-    joblib_mmap = ('temp_folder' in p_args and 'max_nbytes' in p_args)
+    n_jobs = check_n_jobs(n_jobs)
+    active_pool = _get_active_pool()
+    if isinstance(max_nbytes, string_types) and max_nbytes == 'auto' and \
+            active_pool is not None:
+        max_nbytes = active_pool[3]
+    max_nbytes = _check_max_nbytes(max_nbytes)
+    if active_pool is not None and active_pool[2:] == (n_jobs, max_nbytes):
+        return active_pool[1], delayed(func), n_jobs
 
     cache_dir = get_config('MNE_CACHE_DIR', None)
+    kwargs = _get_parallel_kwargs(Parallel, max_nbytes, cache_dir)
+    parallel = Parallel(n_jobs, **kwargs)
+    my_func = delayed(func)
+    return parallel, my_func, n_jobs
+
+
+def _check_max_nbytes(max_nbytes):
+    """Helper to get the memmapping threshold in bytes (or None)"""
     if isinstance(max_nbytes, string_types) and max_nbytes == 'auto':
         max_nbytes = get_config('MNE_MEMMAP_MIN_SIZE', None)
+    if max_nbytes is not None:
+        max_nbytes = _parse_size(max_nbytes)
+    return max_nbytes
+
+
+def _get_parallel_kwargs(Parallel, max_nbytes, temp_folder):
+    """Helper to create keyword arguments for Parallel"""
+    # check if joblib is recent enough to support memmaping
+    p_args = _get_args(Parallel.__init__)
+    joblib_mmap = ('temp_folder' in p_args and 'max_nbytes' in p_args)
 
     if max_nbytes is not None:
-        if not joblib_mmap and cache_dir is not None:
+        if not joblib_mmap and temp_folder is not None:
             logger.warning('"MNE_CACHE_DIR" is set but a newer version of '
                            'joblib is needed to use the memmapping pool.')
-        if joblib_mmap and cache_dir is None:
+        if joblib_mmap and temp_folder is None:
             logger.info('joblib supports memapping pool but "MNE_CACHE_DIR" '
                         'is not set in MNE-Python config. To enable it, use, '
                         'e.g., mne.set_cache_dir(\'/tmp/shm\'). This will '
@@ -92,15 +146,97 @@ def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
     kwargs = {'verbose': 5 if logger.level <= logging.INFO else 0}
 
     if joblib_mmap:
-        if cache_dir is None:
+        if temp_folder is None:
             max_nbytes = None  # disable memmaping
-        kwargs['temp_folder'] = cache_dir
+        kwargs['temp_folder'] = temp_folder
         kwargs['max_nbytes'] = max_nbytes
+        if max_nbytes is not None and 'mmap_mode' in p_args:
+            # copy-on-write, so workers can modify their inputs in place
+            kwargs['mmap_mode'] = 'c'
+    return kwargs
 
-    n_jobs = check_n_jobs(n_jobs)
-    parallel = Parallel(n_jobs, **kwargs)
-    my_func = delayed(func)
-    return parallel, my_func, n_jobs
+
+class pool(object):
+    """Keep worker processes alive for parallel computations
+
+    Within the context, all functions that are called with the same
+    ``n_jobs`` as the pool use the same worker processes, so that the
+    workers are not started again for every call. Arrays larger than
+    ``max_nbytes`` are passed to the workers as (copy-on-write)
+    memory-mapped files in ``temp_folder`` instead of being pickled.
+
+    Parameters
+    ----------
+    n_jobs : int
+        Number of worker processes. Negative values are counted from the
+        number of CPUs (e.g., -1 uses all CPUs).
+    max_nbytes : int | str | None
+        Threshold on the size of arrays passed to the workers that triggers
+        memory mapping, e.g. '1M'. Use None to pickle all arrays. 'auto'
+        (default) uses the MNE_MEMMAP_MIN_SIZE config value if it is set,
+        and otherwise '1M' if there is a ``temp_folder``.
+    temp_folder : str | None
+        Folder for the memory-mapped arrays. If None, MNE_CACHE_DIR is used
+        if set, and otherwise /dev/shm (POSIX shared memory) if it exists.
+
+    Examples
+    --------
+    Filter several runs, starting the workers only once::
+
+        >>> with mne.parallel.pool(n_jobs=16):  # doctest: +SKIP
+        ...     for raw in raws:
+        ...         raw.filter(1., 40., n_jobs=16)
+
+    Notes
+    -----
+    Pools cannot be nested. If joblib is not installed, the computations
+    are done serially.
+
+    .. versionadded:: 0.11
+    """
+    def __init__(self, n_jobs, max_nbytes='auto', temp_folder=None):
+        self.n_jobs = check_n_jobs(n_jobs)
+        if temp_folder is None:
+            temp_folder = get_config('MNE_CACHE_DIR', None)
+            if temp_folder is None and os.path.isdir('/dev/shm'):
+                temp_folder = '/dev/shm'
+        self.temp_folder = temp_folder
+        if isinstance(max_nbytes, string_types) and max_nbytes == 'auto':
+            max_nbytes = get_config('MNE_MEMMAP_MIN_SIZE', None)
+            # pass large arrays through (shared) memory-mapped files
+            if max_nbytes is None and temp_folder is not None and \
+                    os.path.isdir(temp_folder):
+                max_nbytes = '1M'
+        self.max_nbytes = _check_max_nbytes(max_nbytes)
+        self._parallel = None
+
+    def __repr__(self):
+        return '<pool  |  n_jobs : %d>' % self.n_jobs
+
+    def __enter__(self):
+        global _pool
+        if _get_active_pool() is not None:
+            raise RuntimeError('Pools cannot be nested')
+        Parallel = _get_joblib()[0]
+        if Parallel is None:
+            logger.warning('joblib not installed. Cannot run in parallel.')
+            return self
+        kwargs = _get_parallel_kwargs(Parallel, self.max_nbytes,
+                                      self.temp_folder)
+        self._parallel = Parallel(self.n_jobs, **kwargs)
+        # older joblib versions start new workers for every call
+        if hasattr(self._parallel, '__enter__'):
+            self._parallel.__enter__()
+        _pool = (os.getpid(), self._parallel, self.n_jobs, self.max_nbytes)
+        return self
+
+    def __exit__(self, *args):
+        global _pool
+        if self._parallel is not None:
+            _pool = None
+            parallel, self._parallel = self._parallel, None
+            if hasattr(parallel, '__exit__'):
+                parallel.__exit__(*args)
 
 
 def check_n_jobs(n_jobs, allow_cuda=False):
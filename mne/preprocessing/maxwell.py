@@ -23,7 +23,8 @@ from ..io.proc_history import _read_ctc
 from ..io.write import _generate_meas_id, _date_now
 from ..io import _loc_to_coil_trans, _BaseRaw
 from ..io.pick import pick_types, pick_info, pick_channels
-from ..utils import verbose, logger, _clean_names
+from ..utils import (verbose, logger, _clean_names, _LRUCache, object_hash,
+                     _get_cached)
 from ..fixes import _get_args
 from ..externals.six import string_types
 from ..channels.channels import _get_T1T2_mag_inds
@@ -147,6 +148,12 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
         * Epoch-based movement compensation as described in [1]_ through
           :func:`mne.epochs.average_movements`.
 
+    The multipolar bases, their regularization and pseudo-inverse only
+    depend on the sensor geometry, origin, expansion orders and fine
+    calibration, so they are computed once and reused by later calls
+    (e.g., for other runs of the same subject). They can also be stored in
+    a persistent cache, see :func:`mne.set_cache_dir`.
+
     .. note:: Various Maxwell filtering algorithm components are covered by
               patents owned by Elekta Oy, Helsinki, Finland.
               These patents include, but may not be limited to:
@@ -246,7 +253,6 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
 
     # Determine/check the origin of the expansion
     origin = _check_origin(origin, raw_sss.info, coord_frame, disp=True)
-    n_in, n_out = _get_n_moments([int_order, ext_order])
 
     #
     # Cross-talk processing
@@ -264,27 +270,9 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
     else:
         sss_ctc = dict()
 
-    #
-    # Fine calibration processing (point-like magnetometers and calib. coeffs)
-    #
-    S_decomp = _info_sss_basis(info, None, origin, int_order, ext_order,
-                               head_frame, coil_scale)
-    if calibration is not None:
-        # Compute point-like mags to incorporate gradiometer imbalance
-        grad_info = pick_info(info, grad_picks)
-        S_fine = _sss_basis_point(origin, grad_info, int_order, ext_order,
-                                  grad_imbalances, head_frame=head_frame)
-        # Add point like magnetometer data to bases.
-        S_decomp[grad_picks, :] += S_fine
-        # Scale magnetometers by calibration coefficient
-        S_decomp[mag_picks, :] /= mag_cals
-    S_decomp = S_decomp[good_picks]
-
     #
     # Translate to destination frame (always use non-fine-cal bases)
     #
-    S_recon = _info_sss_basis(info, recon_trans, origin,
-                              int_order, 0, head_frame, coil_scale)
     if recon_trans is not None:
         # warn if we have translated too far
         diff = 1000 * (info['dev_head_t']['trans'][:3, 3] -
@@ -295,32 +283,23 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
                            % (', '.join('%0.1f' % x for x in diff), dist))
 
     #
-    # Regularization
+    # Compute (or reuse) the bases, their regularization and pseudo-inverse
     #
-    reg_moments, n_use_in = _regularize(regularize, int_order, ext_order,
-                                        S_decomp)
-    if n_use_in != n_in:
-        S_decomp = S_decomp.take(reg_moments, axis=1)
-        S_recon = S_recon.take(reg_moments[:n_use_in], axis=1)
+    fine_cal = None if calibration is None else (grad_imbalances, mag_cals)
+    S_decomp, S_recon, pS_decomp_good, reg_moments, n_use_in = \
+        _get_sss_bases(info, origin, int_order, ext_order, head_frame,
+                       recon_trans, regularize, fine_cal, good_picks,
+                       mag_picks, grad_picks, coil_scale)
 
     #
     # Do the heavy lifting
     #
 
-    # Pseudo-inverse of total multipolar moment basis set (Part of Eq. 37)
-    pS_decomp_good = _col_norm_pinv(S_decomp.copy())
-
-    # Build in our data scaling here
-    pS_decomp_good *= coil_scale[good_picks].T
-
     # Split into inside and outside versions
     pS_decomp_in = pS_decomp_good[:n_use_in]
     pS_decomp_out = pS_decomp_good[n_use_in:]
     del pS_decomp_good
 
-    # Reconstruct data from internal space only (Eq. 38), first rescale S_recon
-    S_recon /= coil_scale
-
     # Reconstruct raw file object with spatiotemporal processed data
     max_st = dict()
     if st_duration is not None:
@@ -345,7 +324,6 @@ def maxwell_filter(raw, origin='auto', int_order=8, ext_order=3,
                         'raw object. The final %0.2f seconds were lumped '
                         'onto the previous window.' % len_last_buf)
 
-    S_decomp /= coil_scale[good_picks]
     logger.info('    Processing data in chunks of %0.1f sec' % st_duration)
     # Loop through buffer windows of data
     for start, stop in zip(lims[:-1], lims[1:]):
@@ -394,9 +372,6 @@ def _regularize(regularize, int_order, ext_order, S_decomp, verbose=None):
         logger.info('    Computing regularization')
         in_removes, out_removes = _regularize_in(
             int_order, ext_order, S_decomp)
-        logger.info('        Using %s/%s inside and %s/%s outside harmonic '
-                    'components' % (n_in - len(in_removes), n_in,
-                                    n_out - len(out_removes), n_out))
         reg_in_moments = np.setdiff1d(np.arange(n_in), in_removes)
         n_use_in = len(reg_in_moments)
         reg_out_moments = np.arange(n_in, n_in + n_out)
@@ -407,6 +382,111 @@ def _regularize(regularize, int_order, ext_order, S_decomp, verbose=None):
     return reg_moments, n_use_in
 
 
+# Bases for the most recently used sensor geometries, see _get_sss_bases
+_sss_cache = _LRUCache(4)
+
+
+def _get_sss_bases(info, origin, int_order, ext_order, head_frame,
+                   recon_trans, regularize, fine_cal, good_picks, mag_picks,
+                   grad_picks, coil_scale):
+    """Helper to get the (regularized) SSS bases and their pseudo-inverse
+
+    Results are kept in memory and in the persistent cache (see
+    :func:`mne.set_cache_dir`) so that runs sharing the same sensor geometry
+    reuse them.
+    """
+    args = (info, origin, int_order, ext_order, head_frame, recon_trans,
+            regularize, fine_cal, good_picks, mag_picks, grad_picks,
+            coil_scale)
+    key = object_hash(_get_sss_key(*args))
+    bases = _sss_cache.get(key, _read_or_compute_sss_bases, key, args)
+    if regularize is not None:
+        n_in, n_out = _get_n_moments([int_order, ext_order])
+        reg_moments, n_use_in = bases[3:]
+        logger.info('        Using %s/%s inside and %s/%s outside harmonic '
+                    'components' % (n_use_in, n_in,
+                                    len(reg_moments) - n_use_in, n_out))
+    return bases
+
+
+def _get_sss_key(info, origin, int_order, ext_order, head_frame, recon_trans,
+                 regularize, fine_cal, good_picks, mag_picks, grad_picks,
+                 coil_scale):
+    """Helper to collect everything the SSS bases depend on"""
+    meg_picks = pick_types(info, meg=True, exclude=[])
+    arrays = [origin, good_picks, mag_picks, grad_picks, coil_scale]
+    arrays += [info['chs'][pick]['loc'] for pick in meg_picks]
+    if head_frame:
+        arrays.append(info['dev_head_t']['trans'])
+    if recon_trans is not None:
+        arrays.append(recon_trans)
+    if fine_cal is not None:
+        arrays.extend(fine_cal)
+    return (int(int_order), int(ext_order), bool(head_frame), regularize,
+            [int(info['chs'][pick]['coil_type']) for pick in meg_picks],
+            [np.asarray(array, np.float64) for array in arrays])
+
+
+def _read_or_compute_sss_bases(key, args):
+    """Helper to read the SSS bases from the persistent cache or compute"""
+    bases, cached = _get_cached('maxwell', key, _compute_sss_bases, *args)
+    if cached:
+        logger.info('    Using cached SSS bases')
+    return (bases['S_decomp'], bases['S_recon'], bases['pS_decomp_good'],
+            bases['reg_moments'], int(bases['n_use_in']))
+
+
+def _compute_sss_bases(info, origin, int_order, ext_order, head_frame,
+                       recon_trans, regularize, fine_cal, good_picks,
+                       mag_picks, grad_picks, coil_scale):
+    """Compute the regularized SSS bases and their pseudo-inverse"""
+    n_in, n_out = _get_n_moments([int_order, ext_order])
+
+    #
+    # Fine calibration processing (point-like magnetometers and calib. coeffs)
+    #
+    S_decomp = _info_sss_basis(info, None, origin, int_order, ext_order,
+                               head_frame, coil_scale)
+    if fine_cal is not None:
+        grad_imbalances, mag_cals = fine_cal
+        # Compute point-like mags to incorporate gradiometer imbalance
+        grad_info = pick_info(info, grad_picks)
+        S_fine = _sss_basis_point(origin, grad_info, int_order, ext_order,
+                                  grad_imbalances, head_frame=head_frame)
+        # Add point like magnetometer data to bases.
+        S_decomp[grad_picks, :] += S_fine
+        # Scale magnetometers by calibration coefficient
+        S_decomp[mag_picks, :] /= mag_cals
+    S_decomp = S_decomp[good_picks]
+
+    # Translate to destination frame (always use non-fine-cal bases)
+    S_recon = _info_sss_basis(info, recon_trans, origin,
+                              int_order, 0, head_frame, coil_scale)
+
+    #
+    # Regularization
+    #
+    reg_moments, n_use_in = _regularize(regularize, int_order, ext_order,
+                                        S_decomp)
+    if n_use_in != n_in:
+        S_decomp = S_decomp.take(reg_moments, axis=1)
+        S_recon = S_recon.take(reg_moments[:n_use_in], axis=1)
+
+    # Pseudo-inverse of total multipolar moment basis set (Part of Eq. 37)
+    pS_decomp_good = _col_norm_pinv(S_decomp.copy())
+
+    # Build in our data scaling here
+    pS_decomp_good *= coil_scale[good_picks].T
+
+    # Reconstruct data from internal space only (Eq. 38), first rescale S_recon
+    S_recon /= coil_scale
+    S_decomp /= coil_scale[good_picks]
+    reg_moments = np.arange(n_in + n_out)[reg_moments]
+    return dict(S_decomp=S_decomp, S_recon=S_recon,
+                pS_decomp_good=pS_decomp_good, reg_moments=reg_moments,
+                n_use_in=np.array(n_use_in))
+
+
 def _get_mf_picks(info, int_order, ext_order, mag_scale=100.):
     """Helper to pick types for Maxwell filtering"""
     # Check for T1/T2 mag types
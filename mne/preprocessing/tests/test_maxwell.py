@@ -2,6 +2,7 @@
 #
 # License: BSD (3-clause)
 
+import os
 import os.path as op
 import warnings
 import numpy as np
@@ -22,7 +23,7 @@ from mne.preprocessing.maxwell import (maxwell_filter, _get_n_moments,
                                        _sh_real_to_complex, _sh_negate,
                                        _bases_complex_to_real, _sss_basis,
                                        _bases_real_to_complex, _sph_harm,
-                                       _get_coil_scale)
+                                       _get_coil_scale, _sss_cache)
 from mne.tests.common import assert_meg_snr
 from mne.utils import (_TempDir, run_tests_if_main, slow_test, catch_logging,
                        requires_version, object_diff)
@@ -242,6 +243,44 @@ def test_basic():
     assert_raises(ValueError, maxwell_filter, raw, origin=[0] * 4)
 
 
+@testing.requires_testing_data
+def test_maxwell_filter_cache():
+    """Test caching of Maxwell filter bases"""
+    with warnings.catch_warnings(record=True):  # maxshield
+        raw = Raw(raw_fname, allow_maxshield=True).crop(0., 1., False)
+    raw_sss = maxwell_filter(raw, origin=mf_head_origin)
+    cache_dir = _TempDir()
+    orig_dir = os.getenv('MNE_CACHE_DIR', None)
+    orig_use = os.getenv('MNE_USE_PERSISTENT_CACHE', None)
+    try:
+        os.environ['MNE_CACHE_DIR'] = cache_dir
+        os.environ['MNE_USE_PERSISTENT_CACHE'] = 'true'
+        _sss_cache.clear()
+        raw_sss_cached = maxwell_filter(raw, origin=mf_head_origin)
+        assert_equal(len(os.listdir(op.join(cache_dir, 'maxwell'))), 1)
+        assert_allclose(raw_sss_cached[:][0], raw_sss[:][0])
+        _sss_cache.clear()
+        with catch_logging() as log:
+            raw_sss_cached = maxwell_filter(raw, origin=mf_head_origin,
+                                            verbose=True)
+        assert_true('Using cached SSS bases' in log.getvalue())
+        assert_true('outside harmonic components' in log.getvalue())
+        assert_allclose(raw_sss_cached[:][0], raw_sss[:][0])
+        # another origin or set of bad channels needs other bases
+        maxwell_filter(raw, origin=[0., 0.02, 0.02])
+        raw.info['bads'] = [raw.ch_names[0]]
+        maxwell_filter(raw, origin=mf_head_origin)
+        assert_equal(len(os.listdir(op.join(cache_dir, 'maxwell'))), 3)
+    finally:
+        _sss_cache.clear()
+        for key, val in (('MNE_CACHE_DIR', orig_dir),
+                         ('MNE_USE_PERSISTENT_CACHE', orig_use)):
+            if val is not None:
+                os.environ[key] = val
+            else:
+                del os.environ[key]
+
+
 @testing.requires_testing_data
 def test_maxwell_filter_additional():
     """Test processing of Maxwell filtered data"""
@@ -6,6 +6,7 @@
 # License: BSD (3-clause)
 
 import os
+import os.path as op
 import copy
 from math import ceil
 import warnings
@@ -22,7 +23,7 @@ from .surface import (read_surface, _get_ico_surface, read_morph_map,
 from .source_space import (_ensure_src, _get_morph_src_reordering,
                            _ensure_src_subject)
 from .utils import (get_subjects_dir, _check_subject, logger, verbose,
-                    _time_mask)
+                    _time_mask, check_fname, _get_cached)
 from .viz import plot_source_estimates
 from .fixes import in1d, sparse_block_diag
 from .io.base import ToDataFrameMixin
@@ -2087,6 +2088,10 @@ def morph_data(subject_from, subject_to, stc_from, grade=5, smooth=None,
     -------
     stc_to : SourceEstimate
         Source estimate for the destination subject.
+
+    See Also
+    --------
+    SourceMorph : precompute the morphing to apply it to many estimates.
     """
     if not isinstance(stc_from, SourceEstimate):
         raise ValueError('Morphing is only possible with surface source '
@@ -2173,6 +2178,10 @@ def compute_morph_matrix(subject_from, subject_to, vertices_from, vertices_to,
     -------
     morph_matrix : sparse matrix
         matrix that morphs data from subject_from to subject_to
+
+    See Also
+    --------
+    SourceMorph : cache and apply morph matrices.
     """
     logger.info('Computing morph matrix...')
     subjects_dir = get_subjects_dir(subjects_dir, raise_error=True)
@@ -2313,6 +2322,238 @@ def morph_data_precomputed(subject_from, subject_to, stc_from, vertices_to,
     return stc_to
 
 
+def _compute_morph_arrays(subject_from, subject_to, vertices_from,
+                          vertices_to, smooth, subjects_dir, warn):
+    """Helper to compute a morph matrix as arrays that can be cached"""
+    morph_mat = compute_morph_matrix(subject_from, subject_to, vertices_from,
+                                     vertices_to, smooth, subjects_dir,
+                                     warn=warn).tocsr()
+    return dict(data=morph_mat.data, indices=morph_mat.indices,
+                indptr=morph_mat.indptr, shape=np.array(morph_mat.shape))
+
+
+def _get_morph_files_key(subject_from, subject_to, subjects_dir):
+    """Helper to get the size and mtime of the files a morph depends on
+
+    These are the morph map (in either direction) and the spherical
+    registrations of both subjects. Missing files are None.
+    """
+    fnames = [op.join(subjects_dir, 'morph-maps', '%s-%s-morph.fif' % names)
+              for names in ((subject_from, subject_to),
+                            (subject_to, subject_from))]
+    fnames += [op.join(subjects_dir, subject, 'surf', '%s.sphere.reg' % hemi)
+               for subject in (subject_from, subject_to)
+               for hemi in ('lh', 'rh')]
+    key = list()
+    for fname in fnames:
+        try:
+            stat = os.stat(fname)
+        except OSError:  # e.g., the morph map has not been created yet
+            key.append(None)
+            continue
+        # the float st_mtime can miss quick rewrites, use nanoseconds if we can
+        key.append((stat.st_size,
+                    getattr(stat, 'st_mtime_ns', repr(stat.st_mtime))))
+    return key
+
+
+class SourceMorph(object):
+    """Morph surface source estimates between subjects with a fixed operator
+
+    The sparse morphing matrix, including all the smoothing steps, is
+    computed once (see :func:`compute_morph_matrix`) and applying it to
+    source estimates defined on the same vertices is a single sparse
+    matrix product.
+
+    Parameters
+    ----------
+    subject_from : str
+        Name of the original subject as named in the SUBJECTS_DIR.
+    subject_to : str
+        Name of the subject on which to morph as named in the SUBJECTS_DIR.
+    vertices_from : list of array of int
+        Vertices for each hemisphere (LH, RH) for subject_from, e.g.,
+        ``stc.vertices``.
+    grade : int | list of array of int | None
+        Resolution of the icosahedral mesh (typically 5) on subject_to,
+        or the vertices for each hemisphere (LH, RH) to morph to. If None,
+        all vertices will be used. See :func:`morph_data`.
+    smooth : int | None
+        Number of iterations for the smoothing of the surface data.
+        If None, smooth is automatically defined to fill the surface
+        with non-zero values.
+    subjects_dir : str | None
+        Path to SUBJECTS_DIR if it is not set in the environment.
+    morph_mat : sparse matrix | None
+        A precomputed morphing matrix, e.g., from :func:`compute_morph_matrix`
+        (grade must then be a list of vertices). If None, it is computed.
+    dtype : numpy dtype
+        The data type of the morphing matrix and of the morphed data.
+        np.float32 halves the memory needed.
+    warn : bool
+        If True, warn if not all vertices were used.
+    verbose : bool, str, int, or None
+        If not None, override default verbose level (see mne.verbose).
+
+    Attributes
+    ----------
+    vertices_to : list of array of int
+        The vertices for each hemisphere (LH, RH) on subject_to.
+    morph_mat : sparse matrix, shape (n_vertices_to, n_vertices_from)
+        The morphing matrix.
+
+    See Also
+    --------
+    read_source_morph, compute_morph_matrix, morph_data
+
+    Notes
+    -----
+    Computed morphing matrices can be stored in a persistent cache, see
+    :func:`mne.set_cache_dir`.
+
+    .. versionadded:: 0.11
+    """
+    @verbose
+    def __init__(self, subject_from, subject_to, vertices_from, grade=5,
+                 smooth=None, subjects_dir=None, morph_mat=None,
+                 dtype=np.float64, warn=True, verbose=None):
+        if not isinstance(vertices_from, list) or len(vertices_from) != 2:
+            raise ValueError('vertices_from must be a list of length 2')
+        vertices_from = [np.asarray(v, int) for v in vertices_from]
+        if morph_mat is None:
+            subjects_dir = get_subjects_dir(subjects_dir, raise_error=True)
+            vertices_to = grade_to_vertices(subject_to, grade, subjects_dir)
+            vertices_to = [np.asarray(v, int) for v in vertices_to]
+            key = (subject_from, subject_to, smooth,
+                   op.realpath(subjects_dir), vertices_from, vertices_to,
+                   _get_morph_files_key(subject_from, subject_to,
+                                        subjects_dir))
+            morph, cached = _get_cached(
+                'morph', key, _compute_morph_arrays, subject_from,
+                subject_to, vertices_from, vertices_to, smooth,
+                subjects_dir, warn)
+            if cached:
+                logger.info('Using cached morph matrix')
+            morph_mat = sparse.csr_matrix(
+                (morph['data'], morph['indices'], morph['indptr']),
+                shape=tuple(morph['shape']))
+        else:
+            if not sparse.issparse(morph_mat):
+                raise ValueError('morph_mat must be a sparse matrix')
+            if not isinstance(grade, list) or len(grade) != 2:
+                raise ValueError('grade must be a list of vertices when '
+                                 'morph_mat is provided')
+            vertices_to = [np.asarray(v, int) for v in grade]
+        if morph_mat.shape != (sum(len(v) for v in vertices_to),
+                               sum(len(v) for v in vertices_from)):
+            raise ValueError('morph_mat with shape %s does not match the '
+                             'vertices' % (morph_mat.shape,))
+        self.subject_from = subject_from
+        self.subject_to = subject_to
+        self.vertices_from = vertices_from
+        self.vertices_to = vertices_to
+        self.smooth = smooth
+        self.morph_mat = sparse.csr_matrix(morph_mat, dtype=dtype)
+
+    def __repr__(self):
+        s = '%s -> %s' % (self.subject_from, self.subject_to)
+        s += ', %d -> %d vertices' % self.morph_mat.shape[::-1]
+        s += ', smooth : %s' % self.smooth
+        return '<SourceMorph  |  %s>' % s
+
+    def apply(self, stc):
+        """Morph source estimate(s)
+
+        Parameters
+        ----------
+        stc : SourceEstimate | list of SourceEstimate
+            The source estimate(s) of subject_from to morph. A list is
+            morphed at once with a single matrix product.
+
+        Returns
+        -------
+        stc_to : SourceEstimate | list of SourceEstimate
+            The source estimate(s) of subject_to.
+        """
+        stcs = [stc] if isinstance(stc, SourceEstimate) else stc
+        if not isinstance(stcs, (list, tuple)) or len(stcs) == 0:
+            raise ValueError('stc must be a SourceEstimate or a list of '
+                             'SourceEstimate')
+        for this_stc in stcs:
+            if not isinstance(this_stc, SourceEstimate):
+                raise ValueError('Morphing is only possible with surface '
+                                 'source estimates')
+            if this_stc.subject not in (None, self.subject_from):
+                raise ValueError('stc.subject (%s) does not match '
+                                 'subject_from (%s)'
+                                 % (this_stc.subject, self.subject_from))
+            if not all(np.array_equal(v1, v2) for v1, v2
+                       in zip(this_stc.vertices, self.vertices_from)):
+                raise ValueError('The vertices of the source estimate do '
+                                 'not match vertices_from')
+        data = np.concatenate([this_stc.data for this_stc in stcs], axis=1)
+        data = self.morph_mat * data.astype(self.morph_mat.dtype)
+        n_times = np.cumsum([this_stc.shape[1] for this_stc in stcs])
+        stcs_to = [SourceEstimate(this_data, [v.copy() for v in
+                                              self.vertices_to],
+                                  this_stc.tmin, this_stc.tstep,
+                                  subject=self.subject_to,
+                                  verbose=this_stc.verbose)
+                   for this_data, this_stc
+                   in zip(np.split(data, n_times[:-1], axis=1), stcs)]
+        return stcs_to[0] if isinstance(stc, SourceEstimate) else stcs_to
+
+    def save(self, fname, overwrite=False):
+        """Save the morphing to disk
+
+        Parameters
+        ----------
+        fname : str
+            The file name, which should end with -morph.h5 .
+        overwrite : bool
+            If True, overwrite file (if it exists). Defaults to False.
+        """
+        check_fname(fname, 'morph', ('-morph.h5',))
+        write_hdf5(fname, dict(subject_from=self.subject_from,
+                               subject_to=self.subject_to,
+                               vertices_from=self.vertices_from,
+                               vertices_to=self.vertices_to,
+                               smooth=self.smooth,
+                               morph_mat=sparse.csc_matrix(self.morph_mat)),
+                   overwrite=overwrite, title='mnepython')
+
+
+def read_source_morph(fname):
+    """Read a SourceMorph from disk
+
+    Parameters
+    ----------
+    fname : str
+        The file name, which should end with -morph.h5 .
+
+    Returns
+    -------
+    morph : instance of SourceMorph
+        The morphing.
+
+    See Also
+    --------
+    SourceMorph
+
+    Notes
+    -----
+    .. versionadded:: 0.11
+    """
+    check_fname(fname, 'morph', ('-morph.h5',))
+    logger.info('Reading %s ...' % fname)
+    morph = read_hdf5(fname, title='mnepython')
+    return SourceMorph(morph['subject_from'], morph['subject_to'],
+                       morph['vertices_from'], morph['vertices_to'],
+                       morph.get('smooth', None),
+                       morph_mat=morph['morph_mat'],
+                       dtype=morph['morph_mat'].dtype)
+
+
 @verbose
 def spatio_temporal_src_connectivity(src, n_times, dist=None, verbose=None):
     """Compute connectivity for a source space activation over time
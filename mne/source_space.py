@@ -2178,6 +2178,9 @@ def add_source_space_distances(src, dist_limit=np.inf, n_jobs=1, verbose=None):
     takes about 10 minutes to compute all distances (`dist_limit = np.inf`).
     With `dist_limit = 0.007`, computing distances takes about 1 minute.
 
+    Only the distances within ``dist_limit`` are kept (in a sparse matrix),
+    so limiting the distance also reduces the memory needed considerably.
+
     We recommend computing distances once per source space and then saving
     the source space to disk, as the computed distances will automatically be
     stored along with the source space data for future use.
@@ -2209,30 +2212,30 @@ def add_source_space_distances(src, dist_limit=np.inf, n_jobs=1, verbose=None):
     min_idxs = list()
     logger.info('Calculating source space distances (limit=%s mm)...'
                 % (1000 * dist_limit))
-    for s in src:
-        connectivity = mesh_dist(s['tris'], s['rr'])
-        d = parallel(p_fun(connectivity, s['vertno'], r, dist_limit)
-                     for r in np.array_split(np.arange(len(s['vertno'])),
-                                             n_jobs))
+    # run the blocks of all source spaces in one go to keep all jobs busy
+    connectivity = [mesh_dist(s['tris'], s['rr']) for s in src]
+    blocks = [(si, r) for si, s in enumerate(src)
+              for r in np.array_split(np.arange(len(s['vertno'])), n_jobs)
+              if len(r) > 0]
+    d = parallel(p_fun(connectivity[si], src[si]['vertno'], r, dist_limit)
+                 for si, r in blocks)
+    for si, s in enumerate(src):
+        this_d = [dd for dd, (sj, _) in zip(d, blocks) if sj == si]
         # deal with indexing so we can add patch info
-        min_idx = np.array([dd[1] for dd in d])
-        min_dist = np.array([dd[2] for dd in d])
-        midx = np.argmin(min_dist, axis=0)
-        range_idx = np.arange(len(s['rr']))
-        min_dist = min_dist[midx, range_idx]
-        min_idx = min_idx[midx, range_idx]
+        min_dist = np.inf * np.ones(s['np'])
+        min_idx = np.zeros(s['np'], np.int32)
+        for dd in this_d:
+            mask = dd[2] < min_dist
+            min_dist[mask] = dd[2][mask]
+            min_idx[mask] = dd[1][mask]
         min_dists.append(min_dist)
         min_idxs.append(min_idx)
-        # now actually deal with distances, convert to sparse representation
-        d = np.concatenate([dd[0] for dd in d]).ravel()  # already float32
-        idx = d > 0
-        d = d[idx]
-        i, j = np.meshgrid(s['vertno'], s['vertno'])
-        i = i.ravel()[idx]
-        j = j.ravel()[idx]
-        d = sparse.csr_matrix((d, (i, j)),
-                              shape=(s['np'], s['np']), dtype=np.float32)
-        s['dist'] = d
+        # distances are already in a sparse representation
+        i, j, d_data = [np.concatenate(x) for x in
+                        zip(*[dd[0] for dd in this_d])]
+        s['dist'] = sparse.csr_matrix((d_data, (i, j)),
+                                      shape=(s['np'], s['np']),
+                                      dtype=np.float32)
         s['dist_limit'] = np.array([dist_limit], np.float32)
 
     # Let's see if our distance was sufficient to allow for patch info
@@ -2248,31 +2251,37 @@ def add_source_space_distances(src, dist_limit=np.inf, n_jobs=1, verbose=None):
 
 
 def _do_src_distances(con, vertno, run_inds, limit):
-    """Helper to compute source space distances in chunks"""
+    """Helper to compute source space distances in chunks
+
+    Only the non-zero distances (within the limit) between the vertices are
+    kept, as the rows, columns and values of a sparse matrix.
+    """
     if limit < np.inf:
         func = partial(sparse.csgraph.dijkstra, limit=limit)
     else:
         func = sparse.csgraph.dijkstra
     chunk_size = 20  # save memory by chunking (only a little slower)
     lims = np.r_[np.arange(0, len(run_inds), chunk_size), len(run_inds)]
-    n_chunks = len(lims) - 1
-    # eventually we want this in float32, so save memory by only storing 32-bit
-    d = np.empty((len(run_inds), len(vertno)), np.float32)
-    min_dist = np.empty((n_chunks, con.shape[0]))
-    min_idx = np.empty((n_chunks, con.shape[0]), np.int32)
+    rows, cols, data = list(), list(), list()
+    min_dist = np.inf * np.ones(con.shape[0])
+    min_idx = np.zeros(con.shape[0], np.int32)
     range_idx = np.arange(con.shape[0])
-    for li, (l1, l2) in enumerate(zip(lims[:-1], lims[1:])):
+    for l1, l2 in zip(lims[:-1], lims[1:]):
         idx = vertno[run_inds[l1:l2]]
         out = func(con, indices=idx)
         midx = np.argmin(out, axis=0)
-        min_idx[li] = idx[midx]
-        min_dist[li] = out[midx, range_idx]
-        d[l1:l2] = out[:, vertno]
-    midx = np.argmin(min_dist, axis=0)
-    min_dist = min_dist[midx, range_idx]
-    min_idx = min_idx[midx, range_idx]
-    d[d == np.inf] = 0  # scipy will give us np.inf for uncalc. distances
-    return d, min_idx, min_dist
+        mask = out[midx, range_idx] < min_dist
+        min_idx[mask] = idx[midx[mask]]
+        min_dist[mask] = out[midx[mask], range_idx[mask]]
+        # eventually we want this in float32, so only store 32-bit
+        # (scipy will give us np.inf for uncalc. distances)
+        out = out[:, vertno].astype(np.float32)
+        r, c = np.where((out > 0) & (out < np.inf))
+        rows.append(idx[r])
+        cols.append(vertno[c])
+        data.append(out[r, c])
+    return ((np.concatenate(rows), np.concatenate(cols),
+             np.concatenate(data)), min_idx, min_dist)
 
 
 def get_volume_labels_from_aseg(mgz_fname):
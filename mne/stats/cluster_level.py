@@ -15,231 +15,93 @@ import logging
 from scipy import sparse
 
 from .parametric import f_oneway
+from .permutations import _get_perm_block_size, _t_sign_flips
 from ..parallel import parallel_func, check_n_jobs
 from ..utils import split_list, logger, verbose, ProgressBar
-from ..fixes import in1d, unravel_index
+from ..fixes import unravel_index, partial
 from ..source_estimate import SourceEstimate
 
 
-def _get_clusters_spatial(s, neighbors):
-    """Helper function to form spatial clusters using neighbor lists
-
-    This is equivalent to _get_components with n_times = 1, with a properly
-    reconfigured connectivity matrix (formed as "neighbors" list)
-    """
-    # s is a vector of spatial indices that are significant, like:
-    #     s = np.where(x_in)[0]
-    # for x_in representing a single time-instant
-    r = np.ones(s.shape, dtype=bool)
-    clusters = list()
-    next_ind = 0 if s.size > 0 else None
-    while next_ind is not None:
-        # put first point in a cluster, adjust remaining
-        t_inds = [next_ind]
-        r[next_ind] = False
-        icount = 1  # count of nodes in the current cluster
-        while icount <= len(t_inds):
-            ind = t_inds[icount - 1]
-            # look across other vertices
-            buddies = np.where(r)[0]
-            buddies = buddies[in1d(s[buddies], neighbors[s[ind]],
-                                   assume_unique=True)]
-            t_inds += buddies.tolist()
-            r[buddies] = False
-            icount += 1
-        # this is equivalent to np.where(r)[0] for these purposes, but it's
-        # a little bit faster. Unfortunately there's no way to tell numpy
-        # just to find the first instance (to save checking every one):
-        next_ind = np.argmax(r)
-        if next_ind == 0:
-            next_ind = None
-        clusters.append(s[t_inds])
-    return clusters
-
-
-def _reassign(check, clusters, base, num):
-    """Helper function to reassign cluster numbers"""
-    # reconfigure check matrix
-    check[check == num] = base
-    # concatenate new values into clusters array
-    clusters[base - 1] = np.concatenate((clusters[base - 1],
-                                         clusters[num - 1]))
-    clusters[num - 1] = np.array([], dtype=int)
-
-
-def _get_clusters_st_1step(keepers, neighbors):
-    """Directly calculate connectivity based on knowledge that time points are
-    only connected to adjacent neighbors for data organized as time x space.
-
-    This algorithm time increases linearly with the number of time points,
-    compared to with the square for the standard (graph) algorithm.
-
-    This algorithm creates clusters for each time point using a method more
-    efficient than the standard graph method (but otherwise equivalent), then
-    combines these clusters across time points in a reasonable way."""
-    n_src = len(neighbors)
-    n_times = len(keepers)
-    # start cluster numbering at 1 for diffing convenience
-    enum_offset = 1
-    check = np.zeros((n_times, n_src), dtype=int)
-    clusters = list()
-    for ii, k in enumerate(keepers):
-        c = _get_clusters_spatial(k, neighbors)
-        for ci, cl in enumerate(c):
-            check[ii, cl] = ci + enum_offset
-        enum_offset += len(c)
-        # give them the correct offsets
-        c = [cl + ii * n_src for cl in c]
-        clusters += c
-
-    # now that each cluster has been assigned a unique number, combine them
-    # by going through each time point
-    for check1, check2, k in zip(check[:-1], check[1:], keepers[:-1]):
-        # go through each one that needs reassignment
-        inds = k[check2[k] - check1[k] > 0]
-        check1_d = check1[inds]
-        n = check2[inds]
-        nexts = np.unique(n)
-        for num in nexts:
-            prevs = check1_d[n == num]
-            base = np.min(prevs)
-            for pr in np.unique(prevs[prevs != base]):
-                _reassign(check1, clusters, base, pr)
-            # reassign values
-            _reassign(check2, clusters, base, num)
-    # clean up clusters
-    clusters = [cl for cl in clusters if len(cl) > 0]
-    return clusters
-
-
-def _get_clusters_st_multistep(keepers, neighbors, max_step=1):
-    """Directly calculate connectivity based on knowledge that time points are
-    only connected to adjacent neighbors for data organized as time x space.
-
-    This algorithm time increases linearly with the number of time points,
-    compared to with the square for the standard (graph) algorithm."""
-    n_src = len(neighbors)
-    n_times = len(keepers)
-    t_border = list()
-    t_border.append(0)
-    for ki, k in enumerate(keepers):
-        keepers[ki] = k + ki * n_src
-        t_border.append(t_border[ki] + len(k))
-    t_border = np.array(t_border)
-    keepers = np.concatenate(keepers)
-    v = keepers
-    t, s = divmod(v, n_src)
-
-    r = np.ones(t.shape, dtype=bool)
-    clusters = list()
-    next_ind = 0
-    inds = np.arange(t_border[0], t_border[n_times])
-    if s.size > 0:
-        while next_ind is not None:
-            # put first point in a cluster, adjust remaining
-            t_inds = [next_ind]
-            r[next_ind] = False
-            icount = 1  # count of nodes in the current cluster
-            # look for significant values at the next time point,
-            # same sensor, not placed yet, and add those
-            while icount <= len(t_inds):
-                ind = t_inds[icount - 1]
-                selves = inds[t_border[max(t[ind] - max_step, 0)]:
-                              t_border[min(t[ind] + max_step + 1, n_times)]]
-                selves = selves[r[selves]]
-                selves = selves[s[ind] == s[selves]]
-
-                # look at current time point across other vertices
-                buddies = inds[t_border[t[ind]]:t_border[t[ind] + 1]]
-                buddies = buddies[r[buddies]]
-                buddies = buddies[in1d(s[buddies], neighbors[s[ind]],
-                                       assume_unique=True)]
-                buddies = np.concatenate((selves, buddies))
-                t_inds += buddies.tolist()
-                r[buddies] = False
-                icount += 1
-            # this is equivalent to np.where(r)[0] for these purposes, but it's
-            # a little bit faster. Unfortunately there's no way to tell numpy
-            # just to find the first instance (to save checking every one):
-            next_ind = np.argmax(r)
-            if next_ind == 0:
-                next_ind = None
-            clusters.append(v[t_inds])
-
-    return clusters
-
-
 def _get_clusters_st(x_in, neighbors, max_step=1):
-    """Helper function to choose the most efficient version"""
+    """Helper function to find spatio-temporal clusters using neighbor lists
+
+    Rather than growing clusters point by point, this builds the sparse
+    spatio-temporal adjacency restricted to the supra-threshold points
+    (spatial neighbors at the same time point, and the same vertex up to
+    ``max_step`` time points away) and labels it in a single pass using
+    :func:`scipy.sparse.csgraph.connected_components`. Clusters are returned
+    ordered by their first (time-major) index, with sorted indices.
+    """
     n_src = len(neighbors)
-    n_times = x_in.size // n_src
-    cl_goods = np.where(x_in)[0]
-    if len(cl_goods) > 0:
-        keepers = [np.array([], dtype=int)] * n_times
-        row, col = unravel_index(cl_goods, (n_times, n_src))
-        if isinstance(row, int):
-            row = [row]
-            col = [col]
-            lims = [0]
-        else:
-            order = np.argsort(row)
-            row = row[order]
-            col = col[order]
-            lims = [0] + (np.where(np.diff(row) > 0)[0] +
-                          1).tolist() + [len(row)]
-
-        for start, end in zip(lims[:-1], lims[1:]):
-            keepers[row[start]] = np.sort(col[start:end])
-        if max_step == 1:
-            return _get_clusters_st_1step(keepers, neighbors)
-        else:
-            return _get_clusters_st_multistep(keepers, neighbors,
-                                              max_step)
-    else:
+    idx = np.where(x_in)[0]
+    if len(idx) == 0:
         return []
+    t, s = divmod(idx, n_src)
+    # spatial edges: neighbors of each point at the same time point
+    lengths = np.array([len(n) for n in neighbors], dtype=np.intp)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    all_neighbors = np.concatenate(neighbors).astype(np.intp)
+    counts = lengths[s]
+    row = np.repeat(np.arange(len(idx)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts,
+                                                  counts)
+    col = (all_neighbors[np.repeat(starts[s], counts) + offsets] +
+           np.repeat(t * n_src, counts))
+    keep = x_in[col]
+    rows = [row[keep]]
+    cols = [np.searchsorted(idx, col[keep])]
+    # temporal edges: the same vertex up to max_step time points later
+    for step in range(1, max_step + 1):
+        col = idx + step * n_src
+        keep = np.where(col < x_in.size)[0]
+        keep = keep[x_in[col[keep]]]
+        rows.append(keep)
+        cols.append(np.searchsorted(idx, col[keep]))
+    row = np.concatenate(rows)
+    col = np.concatenate(cols)
+    adjacency = sparse.coo_matrix((np.ones(len(row), dtype=np.int8),
+                                   (row, col)), shape=(len(idx), len(idx)))
+    return _components_to_clusters(adjacency, idx)
+
+
+def _components_to_clusters(adjacency, idx):
+    """Label a graph and split the node indices ``idx`` by component"""
+    from scipy.sparse.csgraph import connected_components
+    n_components, labels = connected_components(adjacency, directed=False)
+    order = np.argsort(labels, kind='mergesort')
+    splits = np.cumsum(np.bincount(labels, minlength=n_components))[:-1]
+    return np.split(idx[order], splits)
 
 
 def _get_components(x_in, connectivity, return_list=True):
     """get connected components from a mask and a connectivity matrix"""
-    try:
-        from sklearn.utils._csgraph import cs_graph_components
-    except ImportError:
-        try:
-            from scikits.learn.utils._csgraph import cs_graph_components
-        except ImportError:
-            try:
-                from sklearn.utils.sparsetools import connected_components
-                cs_graph_components = connected_components
-            except ImportError:
-                # in theory we might be able to shoehorn this into using
-                # _get_clusters_spatial if we transform connectivity into
-                # a neighbor list, and it might end up being faster anyway,
-                # but for now:
-                raise ImportError('scikit-learn must be installed')
-
+    from scipy.sparse.csgraph import connected_components
     mask = np.logical_and(x_in[connectivity.row], x_in[connectivity.col])
-    data = connectivity.data[mask]
-    row = connectivity.row[mask]
-    col = connectivity.col[mask]
-    shape = connectivity.shape
     idx = np.where(x_in)[0]
-    row = np.concatenate((row, idx))
-    col = np.concatenate((col, idx))
-    data = np.concatenate((data, np.ones(len(idx), dtype=data.dtype)))
-    connectivity = sparse.coo_matrix((data, (row, col)), shape=shape)
-    _, components = cs_graph_components(connectivity)
     if return_list:
-        start = np.min(components)
-        stop = np.max(components)
-        comp_list = [list() for i in range(start, stop + 1, 1)]
-        mask = np.zeros(len(comp_list), dtype=bool)
-        for ii, comp in enumerate(components):
-            comp_list[comp].append(ii)
-            mask[comp] += x_in[ii]
-        clusters = [np.array(k) for k, m in zip(comp_list, mask) if m]
-        return clusters
+        # restrict the graph to the points in the mask
+        row = np.searchsorted(idx, connectivity.row[mask])
+        col = np.searchsorted(idx, connectivity.col[mask])
+        adjacency = sparse.coo_matrix((connectivity.data[mask], (row, col)),
+                                      shape=(len(idx), len(idx)))
+        return _components_to_clusters(adjacency, idx)
     else:
-        return components
+        row = np.concatenate((connectivity.row[mask], idx))
+        col = np.concatenate((connectivity.col[mask], idx))
+        data = np.ones(len(row), dtype=np.int8)
+        connectivity = sparse.coo_matrix((data, (row, col)),
+                                         shape=connectivity.shape)
+        return connected_components(connectivity, directed=False)[1]
+
+
+def _sum_cluster_data(data, clusters):
+    """Sum data over each cluster (list of index arrays) using np.bincount"""
+    if len(clusters) == 0:
+        return np.empty(0)
+    lengths = [len(c) for c in clusters]
+    labels = np.repeat(np.arange(len(clusters)), lengths)
+    return np.bincount(labels, weights=data[np.concatenate(clusters)],
+                       minlength=len(clusters))
 
 
 def _find_clusters(x, threshold, tail=0, connectivity=None, max_step=1,
@@ -468,10 +330,10 @@ def _find_clusters_1dir(x, x_in, connectivity, max_step, t_power, ndimage):
         else:
             raise ValueError('Connectivity must be a sparse matrix or list')
         if t_power == 1:
-            sums = np.array([np.sum(x[c]) for c in clusters])
+            sums = _sum_cluster_data(x, clusters)
         else:
-            sums = np.array([np.sum(np.sign(x[c]) * np.abs(x[c]) ** t_power)
-                            for c in clusters])
+            sums = _sum_cluster_data(np.sign(x) * np.abs(x) ** t_power,
+                                     clusters)
 
     return clusters, np.atleast_1d(sums)
 
@@ -596,6 +458,41 @@ def _do_permutations(X_full, slices, threshold, tail, connectivity, stat_fun,
     return max_cluster_sums
 
 
+def _get_1samp_signs(seed, n_samp):
+    """Aux function to get the sign flips of a one sample permutation"""
+    if isinstance(seed, np.ndarray):
+        # new surrogate data with specified sign flip
+        if not seed.size == n_samp:
+            raise ValueError('rng string must be n_samples long')
+        signs = 2 * seed.astype(int) - 1
+        if not np.all(np.equal(np.abs(signs), 1)):
+            raise ValueError('signs from rng must be +/- 1')
+    else:
+        rng = np.random.RandomState(seed)
+        # new surrogate data with random sign flip
+        signs = np.sign(0.5 - rng.rand(n_samp))
+    return signs
+
+
+def _get_ttest_params(stat_fun):
+    """Aux function to get the parameters if stat_fun is ttest_1samp_no_p
+
+    Returns None for other functions, whose statistic has to be computed on
+    the sign-flipped data.
+    """
+    args, kwargs = (), {}
+    if isinstance(stat_fun, partial):
+        args, kwargs = stat_fun.args or (), stat_fun.keywords or {}
+        stat_fun = stat_fun.func
+    if stat_fun is not ttest_1samp_no_p or len(args) > 0 or \
+            not set(kwargs).issubset(('sigma', 'method')):
+        return None
+    method = kwargs.get('method', 'relative')
+    if method not in ('absolute', 'relative'):
+        return None  # let ttest_1samp_no_p raise the error
+    return kwargs.get('sigma', 0), method
+
+
 def _do_1samp_permutations(X, slices, threshold, tail, connectivity, stat_fun,
                            max_step, include, partitions, t_power, seeds,
                            sample_shape, buffer_size, progress_bar):
@@ -608,7 +505,13 @@ def _do_1samp_permutations(X, slices, threshold, tail, connectivity, stat_fun,
     # allocate space for output
     max_cluster_sums = np.empty(len(seeds), dtype=np.double)
 
-    if buffer_size is not None:
+    ttest_params = _get_ttest_params(stat_fun)
+    if ttest_params is not None:
+        # t-values of blocks of sign flips can be computed directly with
+        # matrix products, the second moments do not change with sign flips
+        X2 = np.mean(X * X, axis=0)
+        n_block = _get_perm_block_size(n_vars, X.dtype)
+    elif buffer_size is not None:
         # allocate a buffer so we don't need to allocate memory in loop
         X_flip_buffer = np.empty((n_samp, buffer_size), dtype=X.dtype)
 
@@ -617,20 +520,15 @@ def _do_1samp_permutations(X, slices, threshold, tail, connectivity, stat_fun,
             if not (seed_idx + 1) % 32 or seed_idx == 0:
                 progress_bar.update(seed_idx + 1)
 
-        if isinstance(seed, np.ndarray):
-            # new surrogate data with specified sign flip
-            if not seed.size == n_samp:
-                raise ValueError('rng string must be n_samples long')
-            signs = 2 * seed[:, None].astype(int) - 1
-            if not np.all(np.equal(np.abs(signs), 1)):
-                raise ValueError('signs from rng must be +/- 1')
-        else:
-            rng = np.random.RandomState(seed)
-            # new surrogate data with random sign flip
-            signs = np.sign(0.5 - rng.rand(n_samp))
-            signs = signs[:, np.newaxis]
-
-        if buffer_size is None:
+        if ttest_params is not None:
+            if seed_idx % n_block == 0:
+                signs = np.array([_get_1samp_signs(s, n_samp) for s in
+                                  seeds[seed_idx:seed_idx + n_block]],
+                                 dtype=X.dtype)
+                T_block = _t_sign_flips(X, X2, signs, *ttest_params)
+            T_obs_surr = T_block[seed_idx % n_block]
+        elif buffer_size is None:
+            signs = _get_1samp_signs(seed, n_samp)[:, np.newaxis]
             # be careful about non-writable memmap (GH#1507)
             if X.flags.writeable:
                 X *= signs
@@ -641,6 +539,7 @@ def _do_1samp_permutations(X, slices, threshold, tail, connectivity, stat_fun,
             else:
                 T_obs_surr = stat_fun(X * signs)
         else:
+            signs = _get_1samp_signs(seed, n_samp)[:, np.newaxis]
             # only sign-flip a small data buffer, so we need less memory
             T_obs_surr = np.empty(n_vars, dtype=X.dtype)
 
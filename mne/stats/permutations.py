@@ -10,6 +10,7 @@ from math import sqrt
 import numpy as np
 
 from ..parallel import parallel_func
+from ..utils import check_random_state
 from .. import verbose
 
 
@@ -48,18 +49,85 @@ def bin_perm_rep(ndim, a=0, b=1):
     return perms
 
 
-def _max_stat(X, X2, perms, dof_scaling):
-    """Aux function for permutation_t_test (for parallel comp)"""
+# Maximum size (in bytes) of the block of statistics computed at once for
+# the sign flips, small enough to stay in cache
+_PERM_BUFFER_SIZE = 2 ** 20
+
+
+def _get_perm_block_size(n_tests, dtype):
+    """Aux function to get the number of sign flips to compute at once"""
+    return int(max(_PERM_BUFFER_SIZE // (n_tests * np.dtype(dtype).itemsize),
+                   1))
+
+
+def _unpack_signs(packed, n_samples, dtype):
+    """Expand bit-packed sign flips (a set bit means -1) to +/- 1"""
+    signs = np.unpackbits(packed, axis=1)[:, :n_samples].astype(dtype)
+    signs *= -2
+    signs += 1
+    return signs
+
+
+def _enumerate_signs(start, stop, n_samples, dtype):
+    """Get sign flips start to stop of the exact test as +/- 1
+
+    Sign flips are enumerated as the bits of integers, ordered as in
+    bin_perm_rep(n_samples, a=1, b=-1).
+    """
+    ints = np.arange(start, stop, dtype=np.int64)[:, np.newaxis]
+    bits = (ints >> np.arange(n_samples - 1, -1, -1)) & 1
+    return (1 - 2 * bits).astype(dtype)
+
+
+def _t_sign_flips(X, X2, signs, sigma=0., method='relative'):
+    """Compute one sample t-values for a block of sign flips using BLAS
+
+    X2 is the mean of X ** 2 over samples, which does not change with sign
+    flips. The variance adjustment is that of ttest_1samp_no_p.
+    """
     n_samples = len(X)
-    mus = np.dot(perms, X) / float(n_samples)
-    stds = np.sqrt(X2[None, :] - mus ** 2) * dof_scaling  # std with splitting
-    max_abs = np.max(np.abs(mus) / (stds / sqrt(n_samples)), axis=1)  # t-max
+    mus = np.dot(signs, X)
+    mus /= n_samples
+    var = X2 - mus * mus
+    var *= n_samples / (n_samples - 1.)
+    if sigma > 0:
+        if method == 'relative':
+            var += sigma * np.max(var, axis=1)[:, np.newaxis]
+        else:
+            var += sigma
+    var /= n_samples
+    np.sqrt(var, out=var)
+    mus /= var
+    return mus
+
+
+def _max_stat(X, X2, perms, n_samples):
+    """Aux function for permutation_t_test (for parallel comp)
+
+    perms is either an array of bit-packed sign flips, or a (start, stop)
+    range of the sign flips of the exact test.
+    """
+    if isinstance(perms, tuple):
+        offset, n_perms = perms[0], perms[1] - perms[0]
+    else:
+        n_perms = len(perms)
+    n_block = _get_perm_block_size(X.shape[1], X.dtype)
+    max_abs = np.empty(n_perms)
+    for start in range(0, n_perms, n_block):
+        stop = min(start + n_block, n_perms)
+        if isinstance(perms, tuple):
+            signs = _enumerate_signs(offset + start, offset + stop,
+                                     n_samples, X.dtype)
+        else:
+            signs = _unpack_signs(perms[start:stop], n_samples, X.dtype)
+        max_abs[start:stop] = np.max(np.abs(_t_sign_flips(X, X2, signs)),
+                                     axis=1)  # t-max
     return max_abs
 
 
 @verbose
 def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1,
-                       verbose=None):
+                       seed=None, dtype=np.float64, verbose=None):
     """One sample/paired sample permutation test based on a t-statistic.
 
     This function can perform the test on one variable or
@@ -89,6 +157,16 @@ def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1,
         is that the mean of the data is less than 0 (lower tailed test).
     n_jobs : int
         Number of CPUs to use for computation.
+    seed : None | int | instance of RandomState
+        Seed for the random number generator used to draw the sign flips.
+        If None, the global numpy random state is used.
+
+        .. versionadded:: 0.11
+    dtype : np.float64 | np.float32
+        The precision used to compute the statistics of the sign flips.
+        Single precision is faster and needs half the memory.
+
+        .. versionadded:: 0.11
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -113,6 +191,11 @@ def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1,
     Overview of standard nonparametric randomization and permutation
     testing applied to neuroimaging data (e.g. fMRI)
     DOI: http://dx.doi.org/10.1002/hbm.1058
+
+    The sign flips are stored bit-packed (or enumerated on the fly for the
+    exact test), and the statistics are computed in small blocks of sign
+    flips using matrix products, so the memory usage stays low even for a
+    large number of permutations.
     """
     n_samples, n_tests = X.shape
 
@@ -127,15 +210,26 @@ def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1,
     std0 = np.sqrt(X2 - mu0 ** 2) * dof_scaling  # get std with var splitting
     T_obs = np.mean(X, axis=0) / (std0 / sqrt(n_samples))
 
+    X_perm = np.asarray(X, dtype=dtype)
+    X2_perm = np.mean(X_perm * X_perm, axis=0)
+    parallel, my_max_stat, n_jobs = parallel_func(_max_stat, n_jobs)
     if do_exact:
-        perms = bin_perm_rep(n_samples, a=1, b=-1)[1:, :]
+        bounds = np.linspace(1, n_permutations + 1, n_jobs + 1).astype(int)
+        perms = [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
     else:
-        perms = np.sign(0.5 - np.random.rand(n_permutations, n_samples))
-
-    parallel, my_max_stat, n_jobs = parallel_func(_max_stat, n_jobs)
-
-    max_abs = np.concatenate(parallel(my_max_stat(X, X2, p, dof_scaling)
-                                      for p in np.array_split(perms, n_jobs)))
+        # draw the sign flips in blocks and store them as bits
+        rng = check_random_state(seed)
+        packed = np.empty((n_permutations, (n_samples + 7) // 8), np.uint8)
+        n_block = _get_perm_block_size(n_samples, np.float64)
+        for start in range(0, n_permutations, n_block):
+            stop = min(start + n_block, n_permutations)
+            packed[start:stop] = np.packbits(
+                rng.rand(stop - start, n_samples) > 0.5, axis=1)
+        perms = np.array_split(packed, n_jobs)
+
+    max_abs = np.concatenate(parallel(my_max_stat(X_perm, X2_perm, p,
+                                                  n_samples)
+                                      for p in perms))
     H0 = np.sort(max_abs)
 
     scaling = float(n_permutations + 1)
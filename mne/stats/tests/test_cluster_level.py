@@ -1,7 +1,7 @@
 import os
 import numpy as np
 from numpy.testing import (assert_equal, assert_array_equal,
-                           assert_array_almost_equal)
+                           assert_array_almost_equal, assert_allclose)
 from nose.tools import assert_true, assert_raises
 from scipy import sparse, linalg, stats
 from mne.fixes import partial
@@ -11,7 +11,9 @@ from mne.stats.cluster_level import (permutation_cluster_test,
                                      permutation_cluster_1samp_test,
                                      spatio_temporal_cluster_test,
                                      spatio_temporal_cluster_1samp_test,
-                                     ttest_1samp_no_p, summarize_clusters_stc)
+                                     ttest_1samp_no_p, summarize_clusters_stc,
+                                     _find_clusters, _get_clusters_st,
+                                     _setup_connectivity)
 from mne.utils import run_tests_if_main, slow_test, _TempDir, catch_logging
 
 warnings.simplefilter('always')  # enable b/c these tests throw warnings
@@ -454,6 +456,39 @@ def spatio_temporal_cluster_test_connectivity():
     assert_array_equal(p_values_no_conn, p_values2)
 
 
+def test_clusters_spatio_temporal():
+    """Test spatio-temporal cluster labeling against a full graph
+    """
+    from scipy.sparse.csgraph import connected_components
+    rng = np.random.RandomState(0)
+    n_src, n_times = 40, 15
+    conn = sparse.random(n_src, n_src, density=0.08, random_state=rng)
+    conn = (conn + conn.T).tocoo()
+    neighbors = _setup_connectivity(conn, n_src * n_times, n_times)
+    x = rng.randn(n_src * n_times)
+    for max_step in (1, 2, 3):
+        # brute force: label the full spatio-temporal graph
+        steps = list(range(-max_step, max_step + 1))
+        band = sparse.diags([np.ones(n_times - abs(k)) for k in steps], steps)
+        full = (sparse.kron(sparse.eye(n_times), conn) +
+                sparse.kron(band, sparse.eye(n_src))).tocsr()
+        x_in = x > 0.5
+        idx = np.where(x_in)[0]
+        _, labels = connected_components(full[idx][:, idx], directed=False)
+        clusters = _get_clusters_st(x_in, neighbors, max_step)
+        assert_equal(len(clusters), len(np.unique(labels)))
+        for c in clusters:
+            assert_true(np.all(np.diff(c) > 0))
+            assert_equal(len(np.unique(labels[np.searchsorted(idx, c)])), 1)
+        assert_array_equal(np.sort(np.concatenate(clusters)), idx)
+        # sums are computed per cluster
+        clusters, sums = _find_clusters(x, 0.5, 1, neighbors, max_step)
+        assert_allclose(sums, [x[c].sum() for c in clusters])
+        clusters, sums = _find_clusters(x, 0.5, 0, neighbors, max_step,
+                                        t_power=0)
+        assert_array_equal(np.abs(sums), [len(c) for c in clusters])
+
+
 def ttest_1samp(X):
     """Returns T-values
     """
@@ -1,8 +1,11 @@
 import numpy as np
-from numpy.testing import assert_array_equal, assert_almost_equal
+from numpy.testing import (assert_array_equal, assert_almost_equal,
+                           assert_allclose, assert_equal)
 from scipy import stats
 
-from mne.stats.permutations import permutation_t_test
+from mne.stats import ttest_1samp_no_p
+from mne.stats.permutations import (permutation_t_test, bin_perm_rep,
+                                    _t_sign_flips)
 
 
 def test_permutation_t_test():
@@ -31,3 +34,31 @@ def test_permutation_t_test():
     T_obs_scipy, p_values_scipy = stats.ttest_1samp(X[:, 0], 0)
     assert_almost_equal(T_obs[0], T_obs_scipy, 8)
     assert_almost_equal(p_values[0], p_values_scipy, 2)
+
+    # seeding, parallel jobs and single precision
+    X = np.random.randn(10, 20)
+    X[:, :5] += 1
+    T_obs, p_values, H0 = permutation_t_test(X, n_permutations=500, seed=0)
+    assert_equal(len(H0), 500)
+    for kwargs in (dict(seed=0, n_jobs=2), dict(seed=0, dtype=np.float32),
+                   dict(seed=np.random.RandomState(0))):
+        T_obs_2, p_values_2, H0_2 = permutation_t_test(X, 500, **kwargs)
+        assert_array_equal(T_obs_2, T_obs)
+        assert_allclose(H0_2, H0, rtol=1e-4)
+        assert_allclose(p_values_2, p_values, atol=5e-3)
+
+    # exact test, enumerated sign flips
+    X = X[:8]
+    signs = bin_perm_rep(len(X), a=1, b=-1)[1:]
+    X2 = np.mean(X ** 2, axis=0)
+    t_max = np.max(np.abs(_t_sign_flips(X, X2, signs.astype(float))), axis=1)
+    for n_jobs in (1, 3):
+        _, _, H0 = permutation_t_test(X, n_permutations='all', n_jobs=n_jobs)
+        assert_allclose(H0, np.sort(t_max))
+    # the statistic matches ttest_1samp_no_p on sign-flipped data
+    for sigma, method in ((0, 'relative'), (1e-1, 'relative'),
+                          (1e-2, 'absolute')):
+        t_flip = _t_sign_flips(X, X2, signs[:5].astype(float), sigma, method)
+        for sign, t in zip(signs[:5], t_flip):
+            assert_allclose(t, ttest_1samp_no_p(sign[:, np.newaxis] * X,
+                                                sigma, method))
@@ -7,11 +7,13 @@
 import os
 from os import path as op
 import sys
+import uuid
 from struct import pack
 from glob import glob
 
 import numpy as np
 from scipy.sparse import coo_matrix, csr_matrix, eye as speye
+from scipy.spatial import cKDTree
 
 from .bem import read_bem_surfaces
 from .io.constants import FIFF
@@ -22,6 +24,7 @@ from .io.write import (write_int, start_file, end_block,
                        start_block, end_file, write_string,
                        write_float_sparse_rcs)
 from .channels.channels import _get_meg_system
+from .parallel import parallel_func
 from .transforms import transform_surface_to
 from .utils import logger, verbose, get_subjects_dir
 from .externals.six import string_types
@@ -765,7 +768,7 @@ def decimate_surface(points, triangles, n_triangles):
 # Morph maps
 
 @verbose
-def read_morph_map(subject_from, subject_to, subjects_dir=None,
+def read_morph_map(subject_from, subject_to, subjects_dir=None, n_jobs=1,
                    verbose=None):
     """Read morph map
 
@@ -781,6 +784,11 @@ def read_morph_map(subject_from, subject_to, subjects_dir=None,
         Name of the subject on which to morph as named in the SUBJECTS_DIR.
     subjects_dir : string
         Path to SUBJECTS_DIR is not set in the environment.
+    n_jobs : int
+        Number of jobs to run in parallel when the morph map has to be
+        created.
+
+        .. versionadded:: 0.11
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -811,10 +819,12 @@ def read_morph_map(subject_from, subject_to, subjects_dir=None,
                            'a few minutes)' % fname)
             logger.info('Creating morph map %s -> %s'
                         % (subject_from, subject_to))
-            mmap_1 = _make_morph_map(subject_from, subject_to, subjects_dir)
+            mmap_1 = _make_morph_map(subject_from, subject_to, subjects_dir,
+                                     n_jobs)
             logger.info('Creating morph map %s -> %s'
                         % (subject_to, subject_from))
-            mmap_2 = _make_morph_map(subject_to, subject_from, subjects_dir)
+            mmap_2 = _make_morph_map(subject_to, subject_from, subjects_dir,
+                                     n_jobs)
             try:
                 _write_morph_map(fname, subject_from, subject_to,
                                  mmap_1, mmap_2)
@@ -856,7 +866,31 @@ def read_morph_map(subject_from, subject_to, subjects_dir=None,
 
 
 def _write_morph_map(fname, subject_from, subject_to, mmap_1, mmap_2):
-    """Write a morph map to disk"""
+    """Write a morph map to disk
+
+    The map is first written to a uniquely named temporary file (created
+    with the usual permissions, so other users can read the map) that is
+    then renamed, so that other processes never read a partially written
+    map.
+    """
+    temp_fname = '%s.%s.tmp' % (fname, uuid.uuid4().hex)
+    try:
+        _write_morph_map_fif(temp_fname, subject_from, subject_to,
+                             mmap_1, mmap_2)
+        try:
+            os.rename(temp_fname, fname)
+        except OSError:  # Windows does not replace existing files
+            if not op.isfile(fname):
+                raise
+            os.remove(temp_fname)
+    except Exception:
+        if op.isfile(temp_fname):
+            os.remove(temp_fname)
+        raise
+
+
+def _write_morph_map_fif(fname, subject_from, subject_to, mmap_1, mmap_2):
+    """Write the morph map FIF file"""
     fid = start_file(fname)
     assert len(mmap_1) == 2
     assert len(mmap_2) == 2
@@ -904,16 +938,13 @@ def _get_tri_supp_geom(tris, rr):
 
 
 @verbose
-def _make_morph_map(subject_from, subject_to, subjects_dir=None):
+def _make_morph_map(subject_from, subject_to, subjects_dir=None, n_jobs=1,
+                    verbose=None):
     """Construct morph map from one subject to another
 
     Note that this is close, but not exactly like the C version.
     For example, parts are more accurate due to double precision,
     so expect some small morph-map differences!
-
-    Note: This seems easily parallelizable, but the overhead
-    of pickling all the data structures makes it less efficient
-    than just running on a single core :(
     """
     subjects_dir = get_subjects_dir(subjects_dir)
     morph_maps = list()
@@ -928,6 +959,8 @@ def _make_morph_map(subject_from, subject_to, subjects_dir=None):
             morph_maps.append(speye(n_pts, n_pts, format='csr'))
         return morph_maps
 
+    parallel, my_find_nearest_tri_pts, n_jobs = \
+        parallel_func(_find_nearest_tri_pts, n_jobs)
     for hemi in ['lh', 'rh']:
         # load surfaces and normalize points to be on unit sphere
         fname = op.join(subjects_dir, subject_from, 'surf',
@@ -944,17 +977,17 @@ def _make_morph_map(subject_from, subject_to, subjects_dir=None):
         _normalize_vectors(to_pts)
 
         # from surface: get nearest neighbors, find triangles for each vertex
-        nn_pts_idx = _compute_nearest(from_pts, to_pts)
+        nn_pts_idx = cKDTree(from_pts).query(to_pts)[1]
         from_pt_tris = _triangle_neighbors(from_tris, len(from_pts))
         from_pt_tris = [from_pt_tris[pt_idx] for pt_idx in nn_pts_idx]
 
         # find triangle in which point lies and assoc. weights
-        nn_tri_inds = []
-        nn_tris_weights = []
-        for pt_tris, to_pt in zip(from_pt_tris, to_pts):
-            p, q, idx, dist = _find_nearest_tri_pt(pt_tris, to_pt, tri_geom)
-            nn_tri_inds.append(idx)
-            nn_tris_weights.extend([1. - (p + q), p, q])
+        chunks = np.array_split(np.arange(n_to_pts), n_jobs)
+        out = parallel(my_find_nearest_tri_pts(
+            to_pts[chunk], from_pt_tris[chunk[0]:chunk[-1] + 1], tri_geom)
+            for chunk in chunks if len(chunk) > 0)
+        pp, qq, nn_tri_inds = [np.concatenate(o) for o in list(zip(*out))[:3]]
+        nn_tris_weights = np.array([1. - (pp + qq), pp, qq]).T.ravel()
 
         nn_tris = from_tris[nn_tri_inds]
         row_ind = np.repeat(np.arange(n_to_pts), 3)
@@ -965,6 +998,89 @@ def _make_morph_map(subject_from, subject_to, subjects_dir=None):
     return morph_maps
 
 
+def _find_nearest_tri_pts(to_pts, pt_tris, tri_geom):
+    """Find the nearest points on sets of triangles for many points
+
+    This is a vectorized version of ``_find_nearest_tri_pt`` (with
+    ``run_all=False``) for a list of candidate triangles per point.
+    """
+    n_tris = np.array([len(t) for t in pt_tris])
+    owner = np.repeat(np.arange(len(to_pts)), n_tris)
+    pos = np.arange(len(owner)) - np.repeat(np.cumsum(n_tris) - n_tris,
+                                            n_tris)
+    pt_tris = np.concatenate(pt_tris)
+    rrs = to_pts[owner] - tri_geom['r1'][pt_tris]
+    vect = np.einsum('ijk,ik->ij', tri_geom['r1213'][pt_tris], rrs)
+    pqs = np.einsum('ijk,ik->ji', tri_geom['mat'][pt_tris], vect)
+    dists = np.sum(rrs * tri_geom['nn'][pt_tris], axis=1)
+    inside = (np.all(pqs >= 0., axis=0) & np.all(pqs <= 1., axis=0) &
+              (np.sum(pqs, axis=0) < 1.))
+    found = np.zeros(len(to_pts), bool)
+    found[owner[inside]] = True
+    p, q, dist = np.empty((3, len(to_pts)))
+    pt = np.empty(len(to_pts), int)
+
+    # closest triangle in which the point lies
+    best = _argmin_groups(owner[inside], np.abs(dists[inside]),
+                          pos[inside])
+    p[found], q[found] = pqs[:, inside][:, best]
+    pt[found] = pt_tris[inside][best]
+    dist[found] = dists[inside][best]
+
+    # otherwise, the closest location on the edges of the triangles
+    use = ~found[owner]
+    if use.any():
+        pp, qq, dd = _nearest_tri_edges(pt_tris[use], pqs[:, use],
+                                        dists[use], tri_geom)
+        n_use = use.sum()
+        side_pos = pos[use] + np.arange(3)[:, np.newaxis] * n_tris[owner[use]]
+        best = _argmin_groups(np.tile(owner[use], 3), np.abs(dd.ravel()),
+                              side_pos.ravel())
+        p[~found], q[~found] = pp.ravel()[best], qq.ravel()[best]
+        pt[~found] = pt_tris[use][best % n_use]
+        dist[~found] = dd.ravel()[best]
+    return p, q, pt, dist
+
+
+def _argmin_groups(groups, values, order):
+    """Get the index of the smallest value for each (sorted) group"""
+    idx = np.lexsort((order, values, groups))
+    first = np.ones(len(idx), bool)
+    first[1:] = groups[idx[1:]] != groups[idx[:-1]]
+    return idx[first]
+
+
+def _nearest_tri_edges(pt_tris, pqs, dist, tri_geom):
+    """Get the nearest locations on the edges of triangles
+
+    Returns the locations and distances for the three sides (1 -> 2,
+    2 -> 3, and 1 -> 3) of each triangle.
+    """
+    aa = tri_geom['a'][pt_tris]
+    bb = tri_geom['b'][pt_tris]
+    cc = tri_geom['c'][pt_tris]
+    pp = pqs[0]
+    qq = pqs[1]
+    #   Side 1 -> 2
+    p0 = np.minimum(np.maximum(pp + 0.5 * (qq * cc) / aa,
+                               0.0), 1.0)
+    q0 = np.zeros_like(p0)
+    #   Side 2 -> 3
+    t1 = (0.5 * ((2.0 * aa - cc) * (1.0 - pp) +
+                 (2.0 * bb - cc) * qq) / (aa + bb - cc))
+    t1 = np.minimum(np.maximum(t1, 0.0), 1.0)
+    p1 = 1.0 - t1
+    q1 = t1
+    #   Side 1 -> 3
+    q2 = np.minimum(np.maximum(qq + 0.5 * (pp * cc) / bb, 0.0), 1.0)
+    p2 = np.zeros_like(q2)
+
+    dists = np.array([_get_tri_dist(pp, qq, p0, q0, aa, bb, cc, dist),
+                      _get_tri_dist(pp, qq, p1, q1, aa, bb, cc, dist),
+                      _get_tri_dist(pp, qq, p2, q2, aa, bb, cc, dist)])
+    return np.array([p0, p1, p2]), np.array([q0, q1, q2]), dists
+
+
 def _find_nearest_tri_pt(pt_tris, to_pt, tri_geom, run_all=False):
     """Find nearest point mapping to a set of triangles
 
@@ -1023,37 +1139,11 @@ def _find_nearest_tri_pt(pt_tris, to_pt, tri_geom, run_all=False):
 
 def _nearest_tri_edge(pt_tris, to_pt, pqs, dist, tri_geom):
     """Get nearest location from a point to the edge of a set of triangles"""
-    # We might do something intelligent here. However, for now
-    # it is ok to do it in the hard way
-    aa = tri_geom['a'][pt_tris]
-    bb = tri_geom['b'][pt_tris]
-    cc = tri_geom['c'][pt_tris]
-    pp = pqs[0]
-    qq = pqs[1]
-    # Find the nearest point from a triangle:
-    #   Side 1 -> 2
-    p0 = np.minimum(np.maximum(pp + 0.5 * (qq * cc) / aa,
-                               0.0), 1.0)
-    q0 = np.zeros_like(p0)
-    #   Side 2 -> 3
-    t1 = (0.5 * ((2.0 * aa - cc) * (1.0 - pp) +
-                 (2.0 * bb - cc) * qq) / (aa + bb - cc))
-    t1 = np.minimum(np.maximum(t1, 0.0), 1.0)
-    p1 = 1.0 - t1
-    q1 = t1
-    #   Side 1 -> 3
-    q2 = np.minimum(np.maximum(qq + 0.5 * (pp * cc) / bb, 0.0), 1.0)
-    p2 = np.zeros_like(q2)
-
+    pp, qq, dists = _nearest_tri_edges(pt_tris, pqs, dist, tri_geom)
     # figure out which one had the lowest distance
-    dist0 = _get_tri_dist(pp, qq, p0, q0, aa, bb, cc, dist)
-    dist1 = _get_tri_dist(pp, qq, p1, q1, aa, bb, cc, dist)
-    dist2 = _get_tri_dist(pp, qq, p2, q2, aa, bb, cc, dist)
-    pp = np.r_[p0, p1, p2]
-    qq = np.r_[q0, q1, q2]
-    dists = np.r_[dist0, dist1, dist2]
-    ii = np.argmin(np.abs(dists))
-    p, q, pt, dist = pp[ii], qq[ii], pt_tris[ii % len(pt_tris)], dists[ii]
+    ii = np.argmin(np.abs(dists.ravel()))
+    p, q, pt, dist = (pp.ravel()[ii], qq.ravel()[ii],
+                      pt_tris[ii % len(pt_tris)], dists.ravel()[ii])
     return p, q, pt, dist
 
 
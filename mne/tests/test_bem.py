@@ -2,6 +2,7 @@
 #
 # License: BSD 3 clause
 
+import os
 import os.path as op
 from copy import deepcopy
 import warnings
@@ -22,6 +23,7 @@ from mne.bem import (_ico_downsample, _get_ico_map, _order_surfaces,
                      _assert_complete_surface, _assert_inside,
                      _check_surface_size, _bem_find_surface)
 from mne.io import read_info
+from mne.surface import _get_ico_surface
 
 fname_raw = op.join(op.dirname(__file__), '..', 'io', 'tests', 'data',
                     'test_raw.fif')
@@ -170,6 +172,46 @@ def test_bem_solution():
         _compare_bem_solutions(solution_read, solution_c)
 
 
+def test_bem_solution_cache():
+    """Test computing BEM solutions in parallel and caching them"""
+    surfs = list()
+    for rad, id_, sigma in ((0.08, FIFF.FIFFV_BEM_SURF_ID_BRAIN, 0.3),
+                            (0.09, FIFF.FIFFV_BEM_SURF_ID_SKULL, 0.006),
+                            (0.1, FIFF.FIFFV_BEM_SURF_ID_HEAD, 0.3)):
+        surf = _get_ico_surface(2)
+        surfs.append(dict(rr=surf['rr'] * rad, tris=surf['tris'],
+                          np=len(surf['rr']), ntri=len(surf['tris']), id=id_,
+                          sigma=sigma, coord_frame=FIFF.FIFFV_COORD_MRI))
+    solution = make_bem_solution(deepcopy(surfs))
+    solution_par = make_bem_solution(deepcopy(surfs), n_jobs=2)
+    assert_allclose(solution['solution'], solution_par['solution'],
+                    rtol=1e-10, atol=0)
+    cache_dir = _TempDir()
+    orig_dir = os.getenv('MNE_CACHE_DIR', None)
+    orig_use = os.getenv('MNE_USE_PERSISTENT_CACHE', None)
+    try:
+        os.environ['MNE_CACHE_DIR'] = cache_dir
+        os.environ['MNE_USE_PERSISTENT_CACHE'] = 'true'
+        make_bem_solution(deepcopy(surfs))
+        assert_equal(len(os.listdir(op.join(cache_dir, 'bem'))), 1)
+        solution_cached = make_bem_solution(deepcopy(surfs))
+        assert_allclose(solution['solution'], solution_cached['solution'],
+                        rtol=1e-10, atol=0)
+        assert_equal(solution_cached['nsol'], solution['nsol'])
+        # another conductivity needs another solution
+        surfs[1]['sigma'] = 0.01
+        make_bem_solution(deepcopy(surfs[:1]))
+        make_bem_solution(deepcopy(surfs))
+        assert_equal(len(os.listdir(op.join(cache_dir, 'bem'))), 3)
+    finally:
+        for key, val in (('MNE_CACHE_DIR', orig_dir),
+                         ('MNE_USE_PERSISTENT_CACHE', orig_use)):
+            if val is not None:
+                os.environ[key] = val
+            else:
+                del os.environ[key]
+
+
 def test_fit_sphere_to_headshape():
     """Test fitting a sphere to digitization points"""
     # Create points of various kinds
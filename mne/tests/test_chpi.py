@@ -4,14 +4,18 @@
 
 import os.path as op
 import numpy as np
-from numpy.testing import assert_allclose
+from numpy.testing import assert_allclose, assert_array_equal
 from nose.tools import assert_raises, assert_equal, assert_true
+from scipy import linalg
 import warnings
 
-from mne.io import read_info, Raw
+from mne import create_info
+from mne import chpi
+from mne.io import read_info, Raw, RawArray
 from mne.io.constants import FIFF
 from mne.chpi import (_rot_to_quat, _quat_to_rot, get_chpi_positions,
-                      _calculate_chpi_positions, _angle_between_quats)
+                      _calculate_chpi_positions, _angle_between_quats,
+                      _iter_chpi_amplitudes)
 from mne.utils import (run_tests_if_main, _TempDir, slow_test, catch_logging,
                        requires_version)
 from mne.datasets import testing
@@ -111,6 +115,65 @@ def test_hpi_info():
                      len(raw.info['hpi_subsystem']))
 
 
+def test_chpi_amplitudes():
+    """Test fitting the cHPI amplitudes in blocks of windows
+    """
+    rng = np.random.RandomState(0)
+    sfreq, n_window = 1000., 200
+    info = create_info(['MEG %03d' % ii for ii in range(3)] + ['STI 201'],
+                       sfreq, ['mag'] * 3 + ['stim'])
+    raw = RawArray(rng.randn(4, 5000), info)
+    raw._data[-1] = 1.
+    picks_chpi = np.arange(4)
+    slope = np.arange(n_window).astype(np.float64)[:, np.newaxis]
+    f_t = 2 * np.pi * np.array([[83., 143., 203.]]) * (slope / sfreq)
+    model = np.concatenate([np.sin(f_t), np.cos(f_t),
+                            slope, np.ones((n_window, 1))], axis=1)
+    inv_model = linalg.pinv(model)
+
+    class _ReadRecorder(object):
+        """Keep track of the number of samples read from raw"""
+
+        def __init__(self):
+            self.n_read = list()
+
+        def __getitem__(self, item):
+            self.n_read.append(item[1].stop - item[1].start)
+            return raw[item]
+
+    orig_size = chpi._CHPI_BUFFER_SIZE
+    try:
+        # overlapping windows and windows with gaps in between
+        for step in (150, 450):
+            fit_starts = np.arange(0, 5000 - n_window, step)
+            # all at once, and blocks smaller than the number of windows
+            for buffer_size in (orig_size, 4 * 1000):
+                chpi._CHPI_BUFFER_SIZE = buffer_size
+                recorder = _ReadRecorder()
+                amplitudes = list(_iter_chpi_amplitudes(
+                    recorder, picks_chpi, fit_starts, n_window, model,
+                    inv_model))
+                assert_equal(len(amplitudes), len(fit_starts))
+                assert_true(max(recorder.n_read) * 4 <= buffer_size)
+                if buffer_size != orig_size:
+                    assert_true(len(recorder.n_read) > 1)
+                for start, (chpi_data, X, g_sin, g_chan) in zip(fit_starts,
+                                                                amplitudes):
+                    # the fit of this window on its own
+                    data = raw[picks_chpi, start:start + n_window][0]
+                    assert_array_equal(chpi_data, data[-1])
+                    data = data[:-1]
+                    X_want = np.dot(inv_model, data.T)
+                    assert_allclose(X, X_want, rtol=1e-10, atol=1e-12)
+                    diff_ss = ((np.dot(model, X_want).T - data) ** 2).sum(1)
+                    data_ss = (data ** 2).sum(1)
+                    assert_allclose(g_chan, 1 - np.sqrt(diff_ss / data_ss))
+                    assert_allclose(g_sin, 1 - np.sqrt(diff_ss.sum() /
+                                                       data_ss.sum()))
+    finally:
+        chpi._CHPI_BUFFER_SIZE = orig_size
+
+
 def _compare_positions(a, b, max_dist=0.003, max_angle=5.):
     """Compare estimated cHPI positions"""
     from scipy.interpolate import interp1d
@@ -6,7 +6,8 @@
 import os.path as op
 
 from nose.tools import assert_true, assert_equal
-from numpy.testing import assert_array_almost_equal, assert_array_equal
+from numpy.testing import (assert_array_almost_equal, assert_array_equal,
+                           assert_allclose)
 from nose.tools import assert_raises
 import numpy as np
 from scipy import linalg
@@ -21,8 +22,9 @@ from mne import (read_cov, write_cov, Epochs, merge_events,
                  find_events, compute_raw_covariance,
                  compute_covariance, read_evokeds, compute_proj_raw,
                  pick_channels_cov, pick_channels, pick_types, pick_info,
-                 make_ad_hoc_cov)
-from mne.io import Raw
+                 make_ad_hoc_cov, create_info, EpochsArray,
+                 CovarianceAccumulator)
+from mne.io import Raw, RawArray
 from mne.utils import (_TempDir, slow_test, requires_sklearn_0_15,
                        run_tests_if_main)
 from mne.io.proc_history import _get_sss_rank
@@ -205,6 +207,73 @@ def test_cov_estimation_with_triggers():
     compute_covariance(epochs)
 
 
+def test_covariance_accumulator():
+    """Test accumulating covariances over chunks of data
+    """
+    rng = np.random.RandomState(0)
+    ch_names = ['EEG %03d' % ii for ii in range(4)]
+    data = rng.randn(4, 5000) + 1e3 * rng.randn(4, 1)  # large offsets
+    cov_np = np.cov(data)
+    acc = CovarianceAccumulator(ch_names, bads=ch_names[:1])
+    for chunk in np.array_split(data, 7, axis=1):
+        acc.partial_fit(chunk)
+    assert_equal(acc.n_samples, 5000)
+    assert_allclose(acc.mean, data.mean(axis=1))
+    cov = acc.get_covariance()
+    assert_allclose(cov.data, cov_np, rtol=1e-10)
+    assert_equal(cov.nfree, 5000)
+    assert_equal(cov['bads'], ch_names[:1])
+    assert_allclose(acc.get_covariance(assume_centered=True).data,
+                    np.dot(data, data.T) / 5000., rtol=1e-10)
+    # merge accumulators of different parts of the data
+    acc_1 = CovarianceAccumulator(ch_names).partial_fit(data[:, :1000])
+    acc_2 = CovarianceAccumulator(ch_names).partial_fit(data[:, 1000:])
+    acc_1.merge(acc_2).merge(CovarianceAccumulator(ch_names))
+    assert_allclose(acc_1.get_covariance().data, cov_np, rtol=1e-10)
+    assert_raises(ValueError, acc_1.merge, CovarianceAccumulator(ch_names[1:]))
+    assert_raises(TypeError, acc_1.merge, cov)
+    assert_raises(ValueError, acc_1.partial_fit, data[1:])
+    assert_raises(ValueError, CovarianceAccumulator(ch_names).get_covariance)
+
+    # with raw data of several runs
+    info = create_info(ch_names, 1000., 'eeg')
+    raws = [RawArray(data[:, :2000], info), RawArray(data[:, 2000:], info)]
+    for n_jobs in (1, 2):
+        cov = compute_raw_covariance(raws, tstep=0.3, n_jobs=n_jobs)
+        assert_allclose(cov.data, np.cov(np.concatenate(
+            [data[:, :1999], data[:, 2000:4999]], axis=1)), rtol=1e-10)
+    cov = compute_raw_covariance(raws[0], tstep=0.3, n_jobs=2)
+    assert_allclose(cov.data, np.cov(data[:, :1999]), rtol=1e-10)
+
+    # with epochs
+    epochs_data = data.reshape(4, 50, 100).transpose(1, 0, 2)
+    events = np.array([np.arange(50) * 100, np.zeros(50, int),
+                       np.arange(50) % 2 + 1]).T
+    epochs = EpochsArray(epochs_data, info, events,
+                         event_id=dict(a=1, b=2), baseline=None)
+    cov = compute_covariance(epochs)
+    assert_allclose(cov.data, np.dot(data, data.T) / 5000., rtol=1e-10)
+    assert_equal(cov['method'], 'empirical')
+    cov = compute_covariance(epochs, keep_sample_mean=False)
+    data_demeaned = epochs_data.copy()
+    for ii in (0, 1):
+        data_demeaned[ii::2] -= epochs_data[ii::2].mean(axis=0)
+    data_demeaned = np.concatenate(data_demeaned, axis=1)
+    assert_allclose(cov.data, np.dot(data_demeaned, data_demeaned.T) /
+                    (2 * 100 * 24), rtol=1e-6)
+    # like before, the empirical estimate divides by the number of samples
+    cov = compute_covariance(epochs, method_params=dict(
+        empirical=dict(assume_centered=False)))
+    assert_allclose(cov.data, np.cov(data, bias=1), rtol=1e-10)
+    # conditions without epochs do not contribute
+    epochs_a = epochs['a']
+    epochs_a.event_id = dict(a=1, b=2)
+    cov = compute_covariance(epochs_a, keep_sample_mean=False)
+    data_demeaned = data_demeaned.reshape(4, 50, 100)[:, ::2].reshape(4, -1)
+    assert_allclose(cov.data, np.dot(data_demeaned, data_demeaned.T) /
+                    (100 * 24), rtol=1e-6)
+
+
 def test_arithmetic_cov():
     """Test arithmetic with noise covariance matrices
     """
@@ -889,6 +889,44 @@ def test_preload_epochs():
                               epochs.average().data, 18)
 
 
+def test_epochs_batches():
+    """Test batched loading of epochs from disk
+    """
+    import mne.epochs
+    info = create_info(['EEG %03d' % ii for ii in range(8)], 500., 'eeg')
+    data = 1e-5 * np.random.RandomState(0).randn(8, 10000)
+    data[3, 2500:2505] *= 100  # an artifact
+    raw = RawArray(data, info)
+    # first and last events yield too short epochs, some overlap
+    events = np.array([[samp, 0, 1] for samp in
+                       (10, 400, 420, 2480, 2500, 6000, 8000, 9990)])
+    orig_size = mne.epochs._EPOCHS_BATCH_SIZE
+    try:
+        for size in (orig_size, 1, 40000):
+            mne.epochs._EPOCHS_BATCH_SIZE = size
+            for kwargs in (dict(), dict(detrend=1, decim=3),
+                           dict(proj='delayed', reject_tmin=0.03)):
+                epochs = Epochs(raw, events, event_id, tmin, tmax,
+                                reject=dict(eeg=4e-4), add_eeg_ref=False,
+                                **kwargs)
+                data_iter = np.array([epoch for epoch in epochs])
+                data_batch = epochs.get_data()
+                assert_allclose(data_iter, data_batch, rtol=1e-10)
+                drop_log = [['NO_DATA'], [], [], ['EEG 003'], ['EEG 003'],
+                            [], [], ['TOO_SHORT']]
+                if 'reject_tmin' in kwargs:
+                    drop_log[4] = []
+                assert_equal(epochs.drop_log, drop_log)
+                epochs_preload = Epochs(raw, events, event_id, tmin, tmax,
+                                        reject=dict(eeg=4e-4), preload=True,
+                                        add_eeg_ref=False, **kwargs)
+                assert_allclose(epochs_preload.get_data(), data_batch,
+                                rtol=1e-10)
+                assert_equal(epochs_preload.drop_log, drop_log)
+    finally:
+        mne.epochs._EPOCHS_BATCH_SIZE = orig_size
+
+
 def test_indexing_slicing():
     """Test of indexing and slicing operations
     """
@@ -8,7 +8,7 @@ from scipy.signal import resample as sp_resample
 from mne.filter import (band_pass_filter, high_pass_filter, low_pass_filter,
                         band_stop_filter, resample, _resample_stim_channels,
                         construct_iir_filter, notch_filter, detrend,
-                        _overlap_add_filter, _smart_pad)
+                        _overlap_add_filter, _smart_pad, _fir_cache)
 
 from mne.utils import sum_squared, run_tests_if_main, slow_test, catch_logging
 
@@ -150,6 +150,39 @@ def test_resample():
     assert_array_equal(resample([0, 0], 2, 1), [0., 0., 0., 0.])
 
 
+def test_resample_polyphase():
+    """Test polyphase resampling"""
+    from mne import create_info
+    from mne.io import RawArray
+    sfreq = 5000.
+    t = np.arange(20000) / sfreq
+    x = np.array([np.sin(2 * np.pi * 10 * t), np.cos(2 * np.pi * 7 * t)])
+    for up, down in ((1, 20), (2, 40), (3, 2)):
+        x_fft = resample(x, up, down)
+        t_new = np.arange(x_fft.shape[1]) * down / (up * sfreq)
+        x_new = np.array([np.sin(2 * np.pi * 10 * t_new),
+                          np.cos(2 * np.pi * 7 * t_new)])
+        for n_jobs in (1, 2):
+            x_poly = resample(x, up, down, method='polyphase', n_jobs=n_jobs)
+            assert_equal(x_poly.shape, x_fft.shape)
+            assert_allclose(x_poly, x_new, atol=2e-2)
+            n_edge = len(t_new) // 10
+            assert_allclose(x_poly[:, n_edge:-n_edge],
+                            x_new[:, n_edge:-n_edge], atol=2e-3)
+    x_3d = x.reshape(2, 1, -1).swapaxes(0, 2)
+    assert_array_equal(resample(x_3d, 1, 20, axis=0, method='polyphase'),
+                       resample(x, 1, 20, method='polyphase').T[:, np.newaxis])
+    assert_raises(ValueError, resample, x, 1.5, 20, method='polyphase')
+    assert_raises(ValueError, resample, x, 1, 20, method='foo')
+
+    raw = RawArray(x, create_info(2, sfreq, 'eeg'))
+    raw_fft = raw.resample(250., copy=True)
+    raw_poly = raw.resample(250., copy=True, method='polyphase')
+    assert_equal(raw_poly.info['sfreq'], 250.)
+    assert_equal(raw_poly.n_times, raw_fft.n_times)
+    assert_allclose(raw_poly._data, raw_fft._data, atol=5e-2)
+
+
 def test_resample_stim_channel():
     """Test resampling of stim channels"""
 
@@ -300,6 +333,87 @@ def test_filters():
     assert_allclose(x, x_filt, rtol=1e-3, atol=1e-3)
 
 
+def test_filter_cache():
+    """Test caching of FIR filters and their spectra"""
+    sfreq = 1000.
+    x = rng.randn(3, 20000)
+    orig_size = (_fir_cache.max_size, _fir_cache.max_bytes)
+    _fir_cache.clear()
+    try:
+        for filter_length in (2048, None):
+            x_1 = band_pass_filter(x, sfreq, 8., 12., filter_length)
+            n_entries = len(_fir_cache._keys)
+            assert_true(n_entries > 0)
+            x_2 = band_pass_filter(x, sfreq, 8., 12., filter_length)
+            assert_equal(len(_fir_cache._keys), n_entries)
+            assert_array_equal(x_1, x_2)
+            # a different filter gets new entries, results stay the same
+            band_pass_filter(x, sfreq, 8., 12., filter_length,
+                             l_trans_bandwidth=1.)
+            assert_true(len(_fir_cache._keys) > n_entries)
+            _fir_cache.clear()
+            assert_array_equal(band_pass_filter(x, sfreq, 8., 12.,
+                                                filter_length), x_1)
+        for key in _fir_cache._keys:
+            for value in _fir_cache._data[key]:
+                if isinstance(value, np.ndarray):
+                    assert_true(not value.flags.writeable)
+        # least recently used entries are dropped first
+        _fir_cache.max_size = 3
+        for l_freq in (1., 2., 3.):
+            high_pass_filter(x, sfreq, l_freq, filter_length=None)
+        assert_equal(len(_fir_cache._keys), 3)
+        high_pass_filter(x, sfreq, 1., filter_length=None)
+        high_pass_filter(x, sfreq, 4., filter_length=None)
+        assert_equal(len(_fir_cache._keys), 3)
+        assert_equal(sorted(key[1][1] for key in _fir_cache._keys),
+                     [0.5 / 500., 2.5 / 500., 3.5 / 500.])
+        # the spectra of long signals are bounded by their size
+        _fir_cache.clear()
+        _fir_cache.max_bytes = 5 * x.shape[1] * 8 // 2
+        for l_freq in (1., 2., 3.):
+            high_pass_filter(x, sfreq, l_freq, filter_length=None)
+        assert_equal(len(_fir_cache._keys), 2)
+    finally:
+        _fir_cache.max_size, _fir_cache.max_bytes = orig_size
+        _fir_cache.clear()
+
+
+def test_fft_backends():
+    """Test FFT backend selection"""
+    import os
+    from mne.cuda import _fft_config
+    from mne.time_frequency import cwt_morlet, stft, istft
+    from mne.time_frequency.multitaper import dpss_windows, _mt_spectra
+    sfreq = 500.
+    a = rng.randn(2, 5000)
+    dpss = dpss_windows(500, 2, 3)[0]
+    orig_backend = os.getenv('MNE_FFT_BACKEND', None)
+    try:
+        outs = list()
+        for backend in ('scipy', 'numpy'):
+            os.environ['MNE_FFT_BACKEND'] = backend
+            _fft_config.clear()
+            outs.append([band_pass_filter(a, sfreq, 4, 8, filter_length=1024),
+                         band_pass_filter(a, sfreq, 4, 8, n_jobs=2,
+                                          filter_length=None),
+                         resample(a, 2, 1, n_jobs=2),
+                         cwt_morlet(a, sfreq, [10., 20.]),
+                         _mt_spectra(a[:, :500], dpss, sfreq)[0],
+                         istft(stft(a, 128, 64), 64, a.shape[1])])
+        for out_scipy, out_numpy in zip(*outs):
+            assert_allclose(out_scipy, out_numpy, rtol=1e-7, atol=1e-12)
+        os.environ['MNE_FFT_BACKEND'] = 'foo'
+        _fft_config.clear()
+        assert_raises(ValueError, band_pass_filter, a, sfreq, 4, 8)
+    finally:
+        if orig_backend is None:
+            del os.environ['MNE_FFT_BACKEND']
+        else:
+            os.environ['MNE_FFT_BACKEND'] = orig_backend
+        _fft_config.clear()
+
+
 def test_cuda():
     """Test CUDA-based filtering
     """
@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+from numpy.testing import assert_array_equal
+from nose.tools import assert_equal, assert_true, assert_raises
+
+from mne import get_config
+from mne.parallel import parallel_func, pool, _get_joblib
+from mne.utils import run_tests_if_main, _TempDir
+
+
+def _get_pid(x):
+    """Helper to get the process ID of a worker"""
+    return os.getpid(), x.sum()
+
+
+def _double_inplace(x):
+    """Helper to modify the input of a worker in place"""
+    x *= 2
+    return x.sum()
+
+
+def test_pool():
+    """Test persistent pools of workers"""
+    tempdir = _TempDir()
+    x = np.arange(2e6).reshape(2, -1)  # large enough to be memory-mapped
+    parallel, p_fun, n_jobs = parallel_func(_get_pid, 1)
+    assert_true(parallel is list)
+    with pool(n_jobs=2, temp_folder=tempdir) as p:
+        assert_equal(p.n_jobs, 2)
+        if get_config('MNE_MEMMAP_MIN_SIZE', None) is None:
+            # large arrays go through the temporary folder by default
+            assert_equal(p.max_nbytes, 1024 ** 2)
+        assert_raises(RuntimeError, pool(2).__enter__)
+        # n_jobs=1 stays serial
+        parallel, p_fun, n_jobs = parallel_func(_get_pid, 1)
+        assert_true(parallel is list)
+        pids = set()
+        for ii in range(2):
+            parallel, p_fun, n_jobs = parallel_func(_get_pid, 2)
+            out = parallel(p_fun(x_) for x_ in x)
+            assert_array_equal([o[1] for o in out], x.sum(axis=1))
+            pids.update(o[0] for o in out)
+        if _get_joblib()[0] is not None:
+            assert_equal(n_jobs, 2)
+            assert_true(parallel is p._parallel)
+            assert_true(os.getpid() not in pids)
+            assert_true(len(pids) <= 2)  # the same workers were reused
+        pool_parallel = parallel
+        # other settings do not use the pool
+        for kwargs in (dict(n_jobs=3), dict(n_jobs=2, max_nbytes=None)):
+            parallel = parallel_func(_get_pid, **kwargs)[0]
+            assert_true(parallel is not pool_parallel)
+    parallel, p_fun, n_jobs = parallel_func(_get_pid, 2)
+    assert_true(parallel is not pool_parallel)
+
+    # workers can modify memory-mapped inputs without changing ours
+    with pool(n_jobs=2, max_nbytes='1M', temp_folder=tempdir):
+        parallel, p_fun, n_jobs = parallel_func(_double_inplace, 2)
+        out = parallel(p_fun(x_) for x_ in x)
+    assert_array_equal(out, 2 * x.sum(axis=1))
+    assert_array_equal(x, np.arange(2e6).reshape(2, -1))
+
+
+run_tests_if_main()
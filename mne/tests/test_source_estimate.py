@@ -1,4 +1,5 @@
 from __future__ import print_function
+import os
 import os.path as op
 from nose.tools import assert_true, assert_raises
 import warnings
@@ -8,21 +9,23 @@ import numpy as np
 from numpy.testing import (assert_array_almost_equal, assert_array_equal,
                            assert_allclose, assert_equal)
 
+from scipy import sparse
 from scipy.fftpack import fft
 
 from mne.datasets import testing
 from mne import (stats, SourceEstimate, VolSourceEstimate, Label,
                  read_source_spaces, MixedSourceEstimate, read_source_estimate,
-                 morph_data, extract_label_time_course,
+                 morph_data, extract_label_time_course, SourceMorph,
+                 read_source_morph,
                  spatio_temporal_tris_connectivity,
                  spatio_temporal_src_connectivity,
                  spatial_inter_hemi_connectivity)
 from mne.source_estimate import (compute_morph_matrix, grade_to_vertices,
-                                 grade_to_tris)
+                                 grade_to_tris, _get_morph_files_key)
 
 from mne.minimum_norm import read_inverse_operator
 from mne.label import read_labels_from_annot, label_sign_flip
-from mne.utils import (_TempDir, requires_pandas, requires_sklearn,
+from mne.utils import (_TempDir, requires_pandas,
                        requires_h5py, run_tests_if_main, slow_test)
 
 warnings.simplefilter('always')  # enable b/c these tests throw warnings
@@ -216,6 +219,51 @@ def test_io_stc_h5():
             assert_array_equal(v1, v2)
 
 
+@requires_h5py
+def test_io_source_morph():
+    """Test IO for SourceMorph
+    """
+    tempdir = _TempDir()
+    rng = np.random.RandomState(0)
+    vertices_from = [np.arange(10), np.arange(5)]
+    vertices_to = [np.arange(8), np.array([], int)]
+    morph_mat = rng.rand(8, 15)
+    morph_mat = sparse.csr_matrix(morph_mat * (morph_mat > 0.8))
+    morph = SourceMorph('foo', 'bar', vertices_from, vertices_to,
+                        smooth=5, morph_mat=morph_mat)
+    fname = op.join(tempdir, 'foo-morph.h5')
+    morph.save(fname)
+    assert_raises(IOError, morph.save, fname)
+    morph_read = read_source_morph(fname)
+    assert_equal(morph_read.subject_to, 'bar')
+    assert_equal(morph_read.smooth, 5)
+    assert_array_equal(morph_read.morph_mat.toarray(), morph_mat.toarray())
+    for v1, v2 in zip(morph_read.vertices_to, vertices_to):
+        assert_array_equal(v1, v2)
+    stc = SourceEstimate(rng.randn(15, 3), vertices_from, 0, 1.)
+    assert_allclose(morph_read.apply(stc).data, morph_mat * stc.data)
+    assert_raises(ValueError, SourceMorph, 'foo', 'bar', vertices_from,
+                  vertices_to, morph_mat=morph_mat[:, :-1])
+
+
+def test_morph_files_key():
+    """Test that cached morphs depend on the morph map and registrations
+    """
+    tempdir = _TempDir()
+    os.makedirs(op.join(tempdir, 'foo', 'surf'))
+    fname = op.join(tempdir, 'foo', 'surf', 'lh.sphere.reg')
+    key = _get_morph_files_key('foo', 'bar', tempdir)
+    assert_equal(key, [None] * 6)
+    with open(fname, 'wb') as fid:
+        fid.write(b'0')
+    key_2 = _get_morph_files_key('foo', 'bar', tempdir)
+    assert_true(key_2[2] is not None)
+    assert_equal(key_2[:2] + key_2[3:], [None] * 5)
+    with open(fname, 'wb') as fid:  # e.g., FreeSurfer was re-run
+        fid.write(b'01')
+    assert_true(_get_morph_files_key('foo', 'bar', tempdir) != key_2)
+
+
 def test_io_w():
     """Test IO for w files
     """
@@ -474,6 +522,30 @@ def test_morph_data():
     assert_raises(ValueError, stc_from.morph_precomputed, subject_to,
                   vertices_to, morph_mat, subject_from='foo')
 
+    # make sure SourceMorph works, also for lists of stcs and float32
+    morph = SourceMorph(subject_from, subject_to, stc_from.vertices,
+                        grade=vertices_to, smooth=12,
+                        subjects_dir=subjects_dir)
+    assert_true('fsaverage' in repr(morph))
+    assert_allclose(morph.morph_mat.toarray(), morph_mat.toarray())
+    stc_to4 = morph.apply(stc_from)
+    assert_array_almost_equal(stc_to1.data, stc_to4.data)
+    stcs_to = morph.apply([stc_from, stc_from.copy().crop(0.09, 0.095)])
+    assert_equal(len(stcs_to), 2)
+    assert_array_almost_equal(stc_to1.data, stcs_to[0].data)
+    assert_array_almost_equal(stc_to1.data[:, :stcs_to[1].shape[1]],
+                              stcs_to[1].data)
+    morph = SourceMorph(subject_from, subject_to, stc_from.vertices,
+                        grade=vertices_to, morph_mat=morph_mat,
+                        dtype=np.float32)
+    stc_to4 = morph.apply(stc_from)
+    assert_equal(stc_to4.data.dtype, np.float32)
+    assert_allclose(stc_to1.data, stc_to4.data, rtol=1e-4, atol=1e-4 *
+                    np.abs(stc_to1.data).max())
+    assert_raises(ValueError, morph.apply, stc_to1)
+    assert_raises(ValueError, SourceMorph, subject_from, subject_to,
+                  stc_from.vertices, grade=5, morph_mat=morph_mat)
+
     # steps warning
     with warnings.catch_warnings(record=True) as w:
         warnings.simplefilter('always')
@@ -612,7 +684,6 @@ def test_transform():
     assert_array_equal(stc.data, data_t)
 
 
-@requires_sklearn
 def test_spatio_temporal_tris_connectivity():
     """Test spatio-temporal connectivity from triangles"""
     tris = np.array([[0, 1, 2], [3, 4, 5]])
@@ -1,6 +1,7 @@
 from __future__ import print_function
 import os
 import os.path as op
+import sys
 import numpy as np
 import warnings
 from shutil import copyfile
@@ -12,7 +13,9 @@ from mne.datasets import testing
 from mne import read_surface, write_surface, decimate_surface
 from mne.surface import (read_morph_map, _compute_nearest,
                          fast_cross_3d, get_head_surf, read_curvature,
-                         get_meg_helmet_surf)
+                         get_meg_helmet_surf, _get_ico_surface,
+                         _get_tri_supp_geom, _triangle_neighbors,
+                         _find_nearest_tri_pt, _find_nearest_tri_pts)
 from mne.utils import _TempDir, requires_mayavi, run_tests_if_main, slow_test
 from mne.io import read_info
 from mne.transforms import _get_trans
@@ -86,6 +89,26 @@ def test_compute_nearest():
         assert_array_equal(nn1, nn2)
 
 
+def test_find_nearest_tri_pts():
+    """Test finding the nearest triangles of many points at once
+    """
+    surf = _get_ico_surface(2)
+    tri_geom = _get_tri_supp_geom(surf['tris'], surf['rr'])
+    neighbor_tri = _triangle_neighbors(surf['tris'], len(surf['rr']))
+    pts = rng.randn(200, 3)
+    pts /= np.sqrt(np.sum(pts * pts, axis=1))[:, np.newaxis]
+    pts[:5] = surf['rr'][:5]  # exactly on vertices, i.e., triangle edges
+    nearest = _compute_nearest(surf['rr'], pts)
+    pt_tris = [neighbor_tri[n] for n in nearest]
+    # some points will have no triangle in which they lie
+    pt_tris[-10:] = [neighbor_tri[n][:1] for n in nearest[-10:]]
+    out = _find_nearest_tri_pts(pts, pt_tris, tri_geom)
+    for ii, (this_tris, pt) in enumerate(zip(pt_tris, pts)):
+        p, q, idx, dist = _find_nearest_tri_pt(this_tris, pt, tri_geom)
+        assert_allclose([p, q, dist], [out[0][ii], out[1][ii], out[3][ii]])
+        assert_equal(idx, out[2][ii])
+
+
 @slow_test
 @testing.requires_testing_data
 def test_make_morph_maps():
@@ -102,7 +125,16 @@ def test_make_morph_maps():
                      op.join(tempdir, *args))
 
     # this should trigger the creation of morph-maps dir and create the map
-    mmap = read_morph_map('fsaverage_ds', 'sample_ds', tempdir)
+    mmap = read_morph_map('fsaverage_ds', 'sample_ds', tempdir, n_jobs=2)
+    assert_equal(os.listdir(op.join(tempdir, 'morph-maps')),
+                 ['fsaverage_ds-sample_ds-morph.fif'])
+    if not sys.platform.startswith('win'):
+        # the map must be readable by others sharing the subjects_dir
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = os.stat(op.join(tempdir, 'morph-maps',
+                               'fsaverage_ds-sample_ds-morph.fif')).st_mode
+        assert_equal(mode & 0o777, 0o666 & ~umask)
     mmap2 = read_morph_map('fsaverage_ds', 'sample_ds', subjects_dir)
     assert_equal(len(mmap), len(mmap2))
     for m1, m2 in zip(mmap, mmap2):
@@ -17,7 +17,8 @@ from mne.utils import (set_log_level, set_log_file, _TempDir,
                        _check_mayavi_version, requires_mayavi,
                        set_memmap_min_size, _get_stim_channel, _check_fname,
                        create_slices, _time_mask, random_permutation,
-                       _get_call_line, compute_corr, verbose)
+                       _get_call_line, compute_corr, verbose, _get_cached,
+                       _LRUCache)
 from mne.io import show_fiff
 from mne import Evoked
 from mne.externals.six.moves import StringIO
@@ -514,4 +515,65 @@ def test_random_permutation():
     assert_array_equal(python_randperm, matlab_randperm - 1)
 
 
+def test_lru_cache():
+    """Test the in-memory LRU cache"""
+    cache = _LRUCache(2, '1K')
+    x = cache.get('a', np.zeros, 64)  # 512 bytes
+    assert_true(not x.flags.writeable)
+    assert_true(cache.get('a', np.ones, 64) is x)
+    cache.get('b', np.zeros, 32)
+    cache.get('a', np.zeros, 64)
+    cache.get('c', np.zeros, 32)  # evicts 'b' (too many entries)
+    assert_equal(cache._keys, ['a', 'c'])
+    cache.get('d', np.zeros, 96)  # evicts 'a' (too many bytes)
+    assert_equal(cache._keys, ['c', 'd'])
+    assert_equal(len(cache.get('e', np.zeros, 256)), 256)  # too large
+    assert_equal(cache._keys, [])
+
+
+def test_persistent_cache():
+    """Test the persistent on-disk cache"""
+    tempdir = _TempDir()
+    cache_dir = op.join(tempdir, 'fiff_index')
+    calls = list()
+
+    def fun(n):
+        calls.append(n)
+        return dict(x=np.arange(n), y=np.ones((2, 2)))
+
+    keys = ('MNE_CACHE_DIR', 'MNE_USE_PERSISTENT_CACHE',
+            'MNE_FIFF_INDEX_CACHE_SIZE')
+    orig = dict((key, os.getenv(key, None)) for key in keys)
+    try:
+        os.environ['MNE_CACHE_DIR'] = tempdir
+        os.environ['MNE_USE_PERSISTENT_CACHE'] = 'false'
+        assert_equal(_get_cached('fiff_index', 3, fun, 3)[1], False)
+        assert_true(not op.isdir(cache_dir))  # opt-in
+        os.environ['MNE_USE_PERSISTENT_CACHE'] = 'true'
+        for want in (False, True):
+            data, cached = _get_cached('fiff_index', 3, fun, 3)
+            assert_equal(cached, want)
+            assert_array_equal(data['x'], np.arange(3))
+            assert_array_equal(data['y'], np.ones((2, 2)))
+        assert_equal(calls, [3, 3])
+        # entries that would need to be unpickled are not loaded
+        fname = op.join(cache_dir, os.listdir(cache_dir)[0])
+        np.savez(fname, x=np.array([None]))
+        assert_equal(_get_cached('fiff_index', 3, fun, 3)[1], False)
+        assert_equal(calls, [3, 3, 3])
+        # least recently used entries get evicted
+        os.environ['MNE_FIFF_INDEX_CACHE_SIZE'] = '1'
+        _get_cached('fiff_index', 4, fun, 4)
+        assert_equal(os.listdir(cache_dir), [])
+        os.environ['MNE_FIFF_INDEX_CACHE_SIZE'] = '0'
+        assert_equal(_get_cached('fiff_index', 4, fun, 4)[1], False)
+        assert_equal(os.listdir(cache_dir), [])
+    finally:
+        for key, val in orig.items():
+            if val is not None:
+                os.environ[key] = val
+            elif key in os.environ:
+                del os.environ[key]
+
+
 run_tests_if_main()
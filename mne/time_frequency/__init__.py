@@ -2,7 +2,8 @@
 """
 
 from .tfr import (single_trial_power, morlet, tfr_morlet, cwt_morlet,
-                  AverageTFR, tfr_multitaper, read_tfrs, write_tfrs)
+                  AverageTFR, tfr_multitaper, read_tfrs, write_tfrs,
+                  TFRAccumulator)
 from .psd import compute_raw_psd, compute_epochs_psd
 from .csd import CrossSpectralDensity, compute_epochs_csd
 from .ar import fit_iir_model_raw
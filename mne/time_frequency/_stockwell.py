@@ -12,6 +12,7 @@ from scipy import fftpack
 from ..io.pick import pick_types, pick_info
 from ..utils import logger, verbose
 from ..parallel import parallel_func, check_n_jobs
+from ..cuda import _get_fft
 from .tfr import AverageTFR, _get_data
 
 
@@ -47,6 +48,7 @@ def _precompute_st_windows(n_samp, start_f, stop_f, sfreq, width):
 
     k = width  # 1 for classical stowckwell transform
     f_range = np.arange(start_f, stop_f, 1)
+    fft = _get_fft()[0]
     windows = np.empty((len(f_range), len(tw)), dtype=np.complex)
     for i_f, f in enumerate(f_range):
         if f == 0.:
@@ -55,7 +57,7 @@ def _precompute_st_windows(n_samp, start_f, stop_f, sfreq, width):
             window = ((f / (np.sqrt(2. * np.pi) * k)) *
                       np.exp(-0.5 * (1. / k ** 2.) * (f ** 2.) * tw ** 2.))
         window /= window.sum()  # normalisation
-        windows[i_f] = fftpack.fft(window)
+        windows[i_f] = fft(window)
     return windows
 
 
@@ -63,12 +65,13 @@ def _st(x, start_f, windows):
     """Implementation based on Ali Moukadem Matlab code (only used in tests)"""
     n_samp = x.shape[-1]
     ST = np.empty(x.shape[:-1] + (len(windows), n_samp), dtype=np.complex)
+    fft, ifft = _get_fft()
     # do the work
-    Fx = fftpack.fft(x)
+    Fx = fft(x)
     XF = np.concatenate([Fx, Fx], axis=-1)
     for i_f, window in enumerate(windows):
         f = start_f + i_f
-        ST[..., i_f, :] = fftpack.ifft(XF[..., f:f + n_samp] * window)
+        ST[..., i_f, :] = ifft(XF[..., f:f + n_samp] * window)
     return ST
 
 
@@ -79,11 +82,12 @@ def _st_power_itc(x, start_f, compute_itc, zero_pad, decim, W):
     n_out = n_out // decim + bool(n_out % decim)
     psd = np.empty((len(W), n_out))
     itc = np.empty_like(psd) if compute_itc else None
-    X = fftpack.fft(x)
+    fft, ifft = _get_fft()
+    X = fft(x)
     XX = np.concatenate([X, X], axis=-1)
     for i_f, window in enumerate(W):
         f = start_f + i_f
-        ST = fftpack.ifft(XX[:, f:f + n_samp] * window)
+        ST = ifft(XX[:, f:f + n_samp] * window)
         TFR = ST[:, :-zero_pad:decim]
         TFR_abs = np.abs(TFR)
         if compute_itc:
@@ -8,6 +8,7 @@ import numpy as np
 from scipy import fftpack, linalg
 import warnings
 
+from ..cuda import _get_fft
 from ..parallel import parallel_func
 from ..utils import verbose, sum_squared
 
@@ -439,7 +440,8 @@ def _mt_spectra(x, dpss, sfreq, n_fft=None):
 
     # remove mean (do not use in-place subtraction as it may modify input x)
     x = x - np.mean(x, axis=-1)[:, np.newaxis]
-    x_mt = fftpack.fft(x[:, np.newaxis, :] * dpss, n=n_fft)
+    fft = _get_fft()[0]
+    x_mt = fft(x[:, np.newaxis, :] * dpss, n=n_fft)
 
     # only keep positive frequencies
     freqs = fftpack.fftfreq(n_fft, 1. / sfreq)
@@ -1,7 +1,8 @@
 from math import ceil
 import numpy as np
-from scipy.fftpack import fft, ifft, fftfreq
+from scipy.fftpack import fftfreq
 
+from ..cuda import _get_fft
 from ..utils import logger, verbose
 
 
@@ -91,6 +92,7 @@ def stft(x, wsize, tstep=None, verbose=None):
     xp[:, (wsize - tstep) // 2: (wsize - tstep) // 2 + T] = x
     x = xp
 
+    fft = _get_fft()[0]
     for t in range(n_step):
         # Framing
         wwin = win / swin[t * tstep: t * tstep + wsize]
@@ -170,6 +172,7 @@ def istft(X, tstep=None, Tx=None):
     swin = np.sqrt(swin / wsize)
 
     fframe = np.empty((n_signals, n_win + wsize // 2 - 1), dtype=X.dtype)
+    ifft = _get_fft()[1]
     for t in range(n_step):
         # IFFT
         fframe[:, :n_win] = X[:, :, t]
@@ -1,6 +1,7 @@
 import numpy as np
 import os.path as op
-from numpy.testing import assert_array_almost_equal, assert_array_equal
+from numpy.testing import (assert_array_almost_equal, assert_array_equal,
+                           assert_allclose)
 from nose.tools import assert_true, assert_false, assert_equal, assert_raises
 
 import mne
@@ -8,10 +9,12 @@ from mne import io, Epochs, read_events, pick_types, create_info, EpochsArray
 from mne.utils import (_TempDir, run_tests_if_main, slow_test, requires_h5py,
                        grand_average)
 from mne.time_frequency import single_trial_power
+from mne.time_frequency import tfr
 from mne.time_frequency.tfr import (cwt_morlet, morlet, tfr_morlet,
                                     _dpss_wavelet, tfr_multitaper,
                                     AverageTFR, read_tfrs, write_tfrs,
-                                    combine_tfr)
+                                    combine_tfr, cwt, _induced_power_cwt,
+                                    _induced_power_mtm, TFRAccumulator)
 
 import matplotlib
 matplotlib.use('Agg')  # for testing don't use X server
@@ -151,6 +154,99 @@ def test_time_frequency():
     assert_equal(power_pick.data.shape, power_drop.data.shape)
 
 
+def test_cwt():
+    """Test batched and decimated CWT against temporal convolution"""
+    rng = np.random.RandomState(0)
+    X = rng.randn(5, 200)
+    freqs = np.arange(10, 50, 10.)
+    for Ws in (morlet(200., freqs, 2.), _dpss_wavelet(200., freqs, 2.)[0]):
+        for mode in ('same', 'valid', 'full'):
+            for decim in (1, 3):
+                want = cwt(X, Ws, use_fft=False, mode=mode, decim=decim)
+                got = cwt(X, Ws, use_fft=True, mode=mode, decim=decim)
+                assert_allclose(got, want, atol=1e-10)
+    # decimation is done at output time
+    assert_allclose(cwt(X, Ws, decim=3), cwt(X, Ws)[..., ::3])
+    assert_raises(ValueError, cwt, X, Ws, mode='foo')
+    assert_raises(ValueError, cwt, X[:, :5], Ws)
+
+    # batching, single precision and power accumulation
+    data = rng.randn(6, 3, 200)
+    power, itc = _induced_power_cwt(data, 200., freqs, n_cycles=2., decim=2)
+    orig_size = tfr._CWT_BUFFER_SIZE
+    try:
+        tfr._CWT_BUFFER_SIZE = 1
+        power_2, itc_2 = _induced_power_cwt(data, 200., freqs, n_cycles=2.,
+                                            decim=2)
+    finally:
+        tfr._CWT_BUFFER_SIZE = orig_size
+    assert_allclose(power_2, power, rtol=1e-10)
+    assert_allclose(itc_2, itc, rtol=1e-10)
+    power_32, itc_32 = _induced_power_cwt(data, 200., freqs, n_cycles=2.,
+                                          decim=2, dtype=np.complex64)
+    assert_allclose(power_32, power, rtol=1e-4)
+    assert_allclose(itc_32, itc, rtol=1e-4, atol=1e-6)
+    coefs = cwt_morlet(data[:, 0], 200., freqs, n_cycles=2.)[:, :, ::2]
+    assert_allclose(power[0], np.mean(np.abs(coefs) ** 2, axis=0))
+
+
+def test_tfr_accumulator():
+    """Test streaming computation of power, ITC and standard error"""
+    rng = np.random.RandomState(0)
+    info = create_info(['EEG %03d' % ii for ii in range(3)] + ['STI 014'],
+                       200., ['eeg'] * 3 + ['stim'])
+    data = rng.randn(8, 4, 200)
+    events = np.array([[ii * 200, 0, 1] for ii in range(8)])
+    epochs = EpochsArray(data, info, events)
+    freqs = np.arange(10, 50, 10.)
+    picks = [0, 1, 2]
+    for method, fun in (('morlet', _induced_power_cwt),
+                        ('multitaper', _induced_power_mtm)):
+        power, itc = fun(data[:, picks], 200., freqs, n_cycles=2., decim=2,
+                         zero_mean=True)
+        acc = TFRAccumulator(info, epochs.times, freqs, 2., method=method,
+                             decim=2)
+        assert_true(method in repr(acc))
+        assert_raises(RuntimeError, acc.get_tfr)
+        for epoch in epochs:
+            acc.partial_fit(epoch)
+        assert_equal(acc.nave, 8)
+        power_acc, itc_acc, se_acc = acc.get_tfr(return_itc=True,
+                                                 return_se=True)
+        assert_true(isinstance(power_acc, AverageTFR))
+        assert_equal(power_acc.ch_names, info['ch_names'][:3])
+        assert_array_equal(power_acc.times, epochs.times[::2])
+        assert_allclose(power_acc.data, power, rtol=1e-10)
+        assert_allclose(itc_acc.data, itc, rtol=1e-10)
+
+        # merging accumulators, and adding Epochs or arrays at once
+        acc_1 = TFRAccumulator(info, epochs.times, freqs, 2., method=method,
+                               decim=2).partial_fit(epochs[:3])
+        acc_2 = TFRAccumulator(info, epochs.times, freqs, 2., method=method,
+                               decim=2).partial_fit(data[3:])
+        acc_1.merge(acc_2)
+        for tfr_acc, tfr_merged in zip((power_acc, itc_acc, se_acc),
+                                       acc_1.get_tfr(True, True)):
+            assert_allclose(tfr_merged.data, tfr_acc.data, rtol=1e-10)
+        assert_raises(ValueError, acc_1.partial_fit, data[:, :2])
+
+    # standard error of the power
+    powers = [TFRAccumulator(info, epochs.times, freqs, 2.,
+                             decim=2).partial_fit(d).get_tfr().data
+              for d in data]
+    se = np.std(powers, axis=0, ddof=1) / np.sqrt(len(powers))
+    acc = TFRAccumulator(info, epochs.times, freqs, 2., decim=2)
+    acc.partial_fit(data)
+    assert_allclose(acc.get_tfr(return_se=True)[1].data, se, rtol=1e-8)
+    assert_raises(TypeError, acc.merge, power_acc)
+    assert_raises(ValueError, acc.merge, TFRAccumulator(info, epochs.times,
+                                                        freqs[:2], 2.))
+    assert_raises(ValueError, TFRAccumulator, info, epochs.times, freqs, 2.,
+                  method='foo')
+    acc = TFRAccumulator(info, epochs.times, freqs, 2.).partial_fit(data[0])
+    assert_raises(RuntimeError, acc.get_tfr, return_se=True)
+
+
 def test_dpsswavelet():
     """Test DPSS wavelet"""
     freqs = np.arange(5, 25, 3)
@@ -221,6 +317,15 @@ def test_tfr_multitaper():
     assert_false(np.any(itc.data < 0.))
     assert_true(fmax > 40 and fmax < 60)
 
+    # single precision coefficients
+    for func, kwargs in ((tfr_multitaper, dict(time_bandwidth=4.0)),
+                         (tfr_morlet, dict(use_fft=True))):
+        power, itc = func(epochs, freqs=freqs, n_cycles=freqs / 2., **kwargs)
+        power_32, itc_32 = func(epochs, freqs=freqs, n_cycles=freqs / 2.,
+                                dtype=np.complex64, **kwargs)
+        assert_allclose(power_32.data, power.data, rtol=1e-4)
+        assert_allclose(itc_32.data, itc.data, rtol=1e-4, atol=1e-6)
+
 
 def test_crop():
     """Test TFR cropping"""
@@ -12,12 +12,12 @@ from math import sqrt
 from copy import deepcopy
 import numpy as np
 from scipy import linalg
-from scipy.fftpack import fftn, ifftn
 
+from ..cuda import _get_fft
 from ..fixes import partial
 from ..baseline import rescale
 from ..parallel import parallel_func
-from ..utils import logger, verbose, _time_mask
+from ..utils import logger, verbose, _time_mask, _update_moments
 from ..channels.channels import ContainsMixin, UpdateChannelsMixin
 from ..io.pick import pick_info, pick_types
 from ..io.meas_info import Info
@@ -181,71 +181,128 @@ def _centered(arr, newsize):
     return arr[tuple(myslice)]
 
 
-def _cwt_fft(X, Ws, mode="same"):
+# Maximum size (in bytes) of the intermediate spectra computed at once when
+# applying all wavelets to a batch of signals
+_CWT_BUFFER_SIZE = 2 ** 26
+
+
+def _get_cwt_n_fft(n_times, Ws):
+    """Aux Function to get the FFT length used for convolutions"""
+    for W in Ws:
+        if len(W) > n_times:
+            raise ValueError('Wavelet is too long for such a short signal. '
+                             'Reduce the number of cycles.')
+    size = n_times + max(W.size for W in Ws) - 1
+    # Always use 2**n-sized FFT
+    return 2 ** int(np.ceil(np.log2(size)))
+
+
+def _get_cwt_batches(n_items, n_signals, n_times, Ws, use_fft, dtype):
+    """Aux Function to split items of n_signals signals into batches
+
+    Batches are chosen so that the spectra of all wavelets applied to all
+    signals of a batch fit in _CWT_BUFFER_SIZE bytes.
+    """
+    n_fft = _get_cwt_n_fft(n_times, Ws) if use_fft else n_times
+    item_size = n_signals * len(Ws) * n_fft * np.dtype(dtype).itemsize
+    n_batch = int(max(_CWT_BUFFER_SIZE // max(item_size, 1), 1))
+    return [slice(start, min(start + n_batch, n_items))
+            for start in range(0, n_items, n_batch)]
+
+
+def _get_cwt_times(n_times, Ws, mode, decim):
+    """Aux Function to get the kept output samples for each wavelet
+
+    Returns, for each wavelet, the indices into the full convolution of the
+    output samples, and a mask of the samples that are valid.
+    """
+    sizes = np.array([W.size for W in Ws])
+    if mode == 'full':
+        n_out = n_times + sizes.max() - 1
+        starts = np.zeros_like(sizes)
+    elif mode in ('same', 'valid'):
+        n_out = n_times
+        starts = (sizes - 1) // 2
+        if mode == 'valid':
+            starts = sizes - 1 - starts
+    else:
+        raise ValueError('mode must be "same", "valid" or "full", got %s'
+                         % mode)
+    times = np.arange(0, n_out, decim)
+    inds = starts[:, np.newaxis] + times
+    if mode == 'valid':
+        sizes = sizes[:, np.newaxis]
+        offsets = (sizes - 1) // 2
+        mask = (times >= offsets) & (times < offsets + n_times - sizes + 1)
+    else:
+        mask = None
+    return inds, mask
+
+
+def _cwt_fft(X, Ws, mode="same", decim=1, dtype=np.complex128):
     """Compute cwt with fft based convolutions
-    Return a generator over signals.
+
+    All wavelets are applied to all signals with a single broadcasted
+    inverse FFT, and only the samples kept after decimation are returned
+    as an array of shape (n_signals, n_freqs, n_times_decim).
     """
     X = np.asarray(X)
-
-    # Precompute wavelets for given frequency range to save time
     n_signals, n_times = X.shape
     n_freqs = len(Ws)
+    fsize = _get_cwt_n_fft(n_times, Ws)
+    inds, mask = _get_cwt_times(n_times, Ws, mode, decim)
 
-    Ws_max_size = max(W.size for W in Ws)
-    size = n_times + Ws_max_size - 1
-    # Always use 2**n-sized FFT
-    fsize = 2 ** int(np.ceil(np.log2(size)))
-
+    fft, ifft = _get_fft()
     # precompute FFTs of Ws
-    fft_Ws = np.empty((n_freqs, fsize), dtype=np.complex128)
+    fft_Ws = np.empty((n_freqs, fsize), dtype=dtype)
     for i, W in enumerate(Ws):
-        if len(W) > n_times:
-            raise ValueError('Wavelet is too long for such a short signal. '
-                             'Reduce the number of cycles.')
-        fft_Ws[i] = fftn(W, [fsize])
-
-    for k, x in enumerate(X):
-        if mode == "full":
-            tfr = np.zeros((n_freqs, fsize), dtype=np.complex128)
-        elif mode == "same" or mode == "valid":
-            tfr = np.zeros((n_freqs, n_times), dtype=np.complex128)
-
-        fft_x = fftn(x, [fsize])
-        for i, W in enumerate(Ws):
-            ret = ifftn(fft_x * fft_Ws[i])[:n_times + W.size - 1]
-            if mode == "valid":
-                sz = abs(W.size - n_times) + 1
-                offset = (n_times - sz) / 2
-                tfr[i, offset:(offset + sz)] = _centered(ret, sz)
-            else:
-                tfr[i, :] = _centered(ret, n_times)
-        yield tfr
+        fft_Ws[i] = fft(W, fsize)
+    fft_x = fft(X, fsize).astype(dtype, copy=False)
+    ret = ifft(fft_x[:, np.newaxis, :] * fft_Ws, overwrite_x=True)
+    tfr = ret[:, np.arange(n_freqs)[:, np.newaxis], inds]
+    tfr = tfr.astype(dtype, copy=False)
+    if mask is not None:
+        tfr[:, ~mask] = 0.
+    return tfr
 
 
-def _cwt_convolve(X, Ws, mode='same'):
+def _cwt_convolve(X, Ws, mode='same', decim=1, dtype=np.complex128):
     """Compute time freq decomposition with temporal convolutions
-    Return a generator over signals.
+
+    Returns an array of shape (n_signals, n_freqs, n_times_decim).
     """
     X = np.asarray(X)
 
     n_signals, n_times = X.shape
     n_freqs = len(Ws)
+    n_full = n_times
+    if mode == 'full':
+        n_full += max(W.size for W in Ws) - 1
 
     # Compute convolutions
-    for x in X:
-        tfr = np.zeros((n_freqs, n_times), dtype=np.complex128)
+    tfr = np.zeros((n_signals, n_freqs, len(range(0, n_full, decim))),
+                   dtype=dtype)
+    for k, x in enumerate(X):
         for i, W in enumerate(Ws):
-            ret = np.convolve(x, W, mode=mode)
             if len(W) > len(x):
                 raise ValueError('Wavelet is too long for such a short '
                                  'signal. Reduce the number of cycles.')
-            if mode == "valid":
-                sz = abs(W.size - n_times) + 1
-                offset = (n_times - sz) / 2
-                tfr[i, offset:(offset + sz)] = ret
-            else:
-                tfr[i] = ret
-        yield tfr
+            ret = np.convolve(x, W, mode=mode)
+            if ret.size != n_full:
+                ret_full = np.zeros(n_full, dtype=ret.dtype)
+                offset = (n_full - ret.size) // 2 if mode == 'valid' else 0
+                ret_full[offset:(offset + ret.size)] = ret
+                ret = ret_full
+            tfr[k, i] = ret[::decim]
+    return tfr
+
+
+def _cwt(X, Ws, use_fft=True, mode='same', decim=1, dtype=np.complex128):
+    """Aux Function to compute the cwt of a batch of signals"""
+    if use_fft:
+        return _cwt_fft(X, Ws, mode, decim, dtype)
+    else:
+        return _cwt_convolve(X, Ws, mode, decim, dtype)
 
 
 def cwt_morlet(X, sfreq, freqs, use_fft=True, n_cycles=7.0, zero_mean=False):
@@ -280,22 +337,11 @@ def cwt_morlet(X, sfreq, freqs, use_fft=True, n_cycles=7.0, zero_mean=False):
     """
     mode = 'same'
     # mode = "valid"
-    n_signals, n_times = X.shape
-    n_frequencies = len(freqs)
 
     # Precompute wavelets for given frequency range to save time
     Ws = morlet(sfreq, freqs, n_cycles=n_cycles, zero_mean=zero_mean)
 
-    if use_fft:
-        coefs = _cwt_fft(X, Ws, mode)
-    else:
-        coefs = _cwt_convolve(X, Ws, mode)
-
-    tfrs = np.empty((n_signals, n_frequencies, n_times), dtype=np.complex)
-    for k, tfr in enumerate(coefs):
-        tfrs[k] = tfr
-
-    return tfrs
+    return cwt(X, Ws, use_fft=use_fft, mode=mode)
 
 
 def cwt(X, Ws, use_fft=True, mode='same', decim=1):
@@ -324,46 +370,55 @@ def cwt(X, Ws, use_fft=True, mode='same', decim=1):
     mne.time_frequency.cwt_morlet : Compute time-frequency decomposition
                                     with Morlet wavelets
     """
-    n_signals, n_times = X[:, ::decim].shape
-    n_frequencies = len(Ws)
-
-    if use_fft:
-        coefs = _cwt_fft(X, Ws, mode)
-    else:
-        coefs = _cwt_convolve(X, Ws, mode)
-
-    tfrs = np.empty((n_signals, n_frequencies, n_times), dtype=np.complex)
-    for k, tfr in enumerate(coefs):
-        tfrs[k] = tfr[..., ::decim]
-
-    return tfrs
+    n_signals, n_times = X.shape
+    batches = _get_cwt_batches(n_signals, 1, n_times, Ws, use_fft,
+                               np.complex128)
+    return np.concatenate([_cwt(X[sl], Ws, use_fft, mode, decim)
+                           for sl in batches])
 
 
-def _time_frequency(X, Ws, use_fft, decim):
+def _time_frequency(X, Ws, use_fft, decim, dtype=np.complex128):
     """Aux of time_frequency for parallel computing over channels
+
+    X has shape (n_epochs, n_channels, n_times). Epochs are transformed in
+    batches and power and phase locking are accumulated on the fly, so the
+    time-frequency decompositions of all epochs are never stored at once.
     """
-    n_epochs, n_times = X.shape
-    n_times = n_times // decim + bool(n_times % decim)
+    n_epochs, n_channels, n_times = X.shape
+    n_times = len(range(0, n_times, decim))
     n_frequencies = len(Ws)
-    psd = np.zeros((n_frequencies, n_times))  # PSD
-    plf = np.zeros((n_frequencies, n_times), np.complex)  # phase lock
+    psd = np.zeros((n_channels, n_frequencies, n_times))  # PSD
+    plf = np.zeros((n_channels, n_frequencies, n_times), np.complex)  # PL
 
     mode = 'same'
-    if use_fft:
-        tfrs = _cwt_fft(X, Ws, mode)
-    else:
-        tfrs = _cwt_convolve(X, Ws, mode)
-
-    for tfr in tfrs:
-        tfr = tfr[:, ::decim]
+    for sl in _get_cwt_batches(n_epochs, n_channels, X.shape[2], Ws, use_fft,
+                               dtype):
+        tfr = _cwt(X[sl].reshape(-1, X.shape[2]), Ws, use_fft, mode, decim,
+                   dtype)
+        tfr.shape = (-1, n_channels, n_frequencies, n_times)
         tfr_abs = np.abs(tfr)
-        psd += tfr_abs ** 2
-        plf += tfr / tfr_abs
+        psd += (tfr_abs * tfr_abs).sum(axis=0)
+        tfr /= tfr_abs
+        plf += tfr.sum(axis=0)
     psd /= n_epochs
     plf = np.abs(plf) / n_epochs
     return psd, plf
 
 
+def _get_channel_groups(n_channels, n_jobs, n_times, Ws, use_fft, dtype):
+    """Aux Function to split channels into contiguous groups
+
+    Use at least one group per job, and enough groups so that a single
+    epoch of each group fits in the CWT buffer.
+    """
+    n_fft = _get_cwt_n_fft(n_times, Ws) if use_fft else n_times
+    epoch_size = n_channels * len(Ws) * n_fft * np.dtype(dtype).itemsize
+    n_groups = max(n_jobs, -(-epoch_size // _CWT_BUFFER_SIZE))
+    n_groups = int(min(n_groups, n_channels))
+    return [slice(g[0], g[-1] + 1)
+            for g in np.array_split(np.arange(n_channels), n_groups)]
+
+
 @verbose
 def single_trial_power(data, sfreq, frequencies, use_fft=True, n_cycles=7,
                        baseline=None, baseline_mode='ratio', times=None,
@@ -448,7 +503,8 @@ def single_trial_power(data, sfreq, frequencies, use_fft=True, n_cycles=7,
 
 
 def _induced_power_cwt(data, sfreq, frequencies, use_fft=True, n_cycles=7,
-                       decim=1, n_jobs=1, zero_mean=False):
+                       decim=1, n_jobs=1, zero_mean=False,
+                       dtype=np.complex128):
     """Compute time induced power and inter-trial phase-locking factor
 
     The time frequency decomposition is done with Morlet wavelets
@@ -473,6 +529,9 @@ def _induced_power_cwt(data, sfreq, frequencies, use_fft=True, n_cycles=7,
         Requires joblib package.
     zero_mean : bool
         Make sure the wavelets are zero mean.
+    dtype : np.complex128 | np.complex64
+        The precision of the time-frequency coefficients. Power and phase
+        locking are accumulated in double precision in both cases.
 
     Returns
     -------
@@ -490,12 +549,14 @@ def _induced_power_cwt(data, sfreq, frequencies, use_fft=True, n_cycles=7,
 
     psd = np.empty((n_channels, n_frequencies, n_times))
     plf = np.empty((n_channels, n_frequencies, n_times))
-    # Separate to save memory for n_jobs=1
-    parallel, my_time_frequency, _ = parallel_func(_time_frequency, n_jobs)
-    psd_plf = parallel(my_time_frequency(data[:, c, :], Ws, use_fft, decim)
-                       for c in range(n_channels))
-    for c, (psd_c, plf_c) in enumerate(psd_plf):
-        psd[c, :, :], plf[c, :, :] = psd_c, plf_c
+    parallel, my_time_frequency, n_jobs = parallel_func(_time_frequency,
+                                                        n_jobs)
+    groups = _get_channel_groups(n_channels, n_jobs, data.shape[2], Ws,
+                                 use_fft, dtype)
+    psd_plf = parallel(my_time_frequency(data[:, g, :], Ws, use_fft, decim,
+                                         dtype) for g in groups)
+    for g, (psd_g, plf_g) in zip(groups, psd_plf):
+        psd[g], plf[g] = psd_g, plf_g
     return psd, plf
 
 
@@ -1149,7 +1210,8 @@ def read_tfrs(fname, condition=None):
 
 @verbose
 def tfr_morlet(inst, freqs, n_cycles, use_fft=False,
-               return_itc=True, decim=1, n_jobs=1, picks=None, verbose=None):
+               return_itc=True, decim=1, n_jobs=1, picks=None,
+               dtype=np.complex128, verbose=None):
     """Compute Time-Frequency Representation (TFR) using Morlet wavelets
 
     Parameters
@@ -1172,6 +1234,12 @@ def tfr_morlet(inst, freqs, n_cycles, use_fft=False,
     picks : array-like of int | None
         The indices of the channels to plot. If None all available
         channels are displayed.
+    dtype : np.complex128 | np.complex64
+        The precision of the time-frequency coefficients. np.complex64 needs
+        half the memory and is faster; power and ITC are still accumulated
+        in double precision.
+
+        .. versionadded:: 0.11
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -1185,7 +1253,7 @@ def tfr_morlet(inst, freqs, n_cycles, use_fft=False,
 
     See Also
     --------
-    tfr_multitaper, tfr_stockwell
+    tfr_multitaper, tfr_stockwell, TFRAccumulator
     """
     data = _get_data(inst, return_itc)
     info = inst.info
@@ -1197,7 +1265,7 @@ def tfr_morlet(inst, freqs, n_cycles, use_fft=False,
                                     frequencies=freqs,
                                     n_cycles=n_cycles, n_jobs=n_jobs,
                                     use_fft=use_fft, decim=decim,
-                                    zero_mean=True)
+                                    zero_mean=True, dtype=dtype)
     times = inst.times[::decim].copy()
     nave = len(data)
     out = AverageTFR(info, power, times, freqs, nave, method='morlet-power')
@@ -1222,7 +1290,7 @@ def _prepare_picks(info, data, picks):
 @verbose
 def _induced_power_mtm(data, sfreq, frequencies, time_bandwidth=4.0,
                        use_fft=True, n_cycles=7, decim=1, n_jobs=1,
-                       zero_mean=True, verbose=None):
+                       zero_mean=True, dtype=np.complex128, verbose=None):
     """Compute time induced power and inter-trial phase-locking factor
 
     The time frequency decomposition is done with DPSS wavelets
@@ -1251,6 +1319,9 @@ def _induced_power_mtm(data, sfreq, frequencies, time_bandwidth=4.0,
         Requires joblib package. Defaults to 1.
     zero_mean : bool
         Make sure the wavelets are zero mean. Defaults to True.
+    dtype : np.complex128 | np.complex64
+        The precision of the time-frequency coefficients. Power and phase
+        locking are accumulated in double precision in both cases.
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -1278,15 +1349,16 @@ def _induced_power_mtm(data, sfreq, frequencies, time_bandwidth=4.0,
                       "Consider reducing n_cycles.")
     psd = np.zeros((n_channels, n_frequencies, n_times))
     itc = np.zeros((n_channels, n_frequencies, n_times))
-    parallel, my_time_frequency, _ = parallel_func(_time_frequency,
-                                                   n_jobs)
+    parallel, my_time_frequency, n_jobs = parallel_func(_time_frequency,
+                                                        n_jobs)
+    groups = _get_channel_groups(n_channels, n_jobs, data.shape[2], Ws[0],
+                                 use_fft, dtype)
     for m in range(n_taps):
-        psd_itc = parallel(my_time_frequency(data[:, c, :],
-                                             Ws[m], use_fft, decim)
-                           for c in range(n_channels))
-        for c, (psd_c, itc_c) in enumerate(psd_itc):
-            psd[c, :, :] += psd_c
-            itc[c, :, :] += itc_c
+        psd_itc = parallel(my_time_frequency(data[:, g, :], Ws[m], use_fft,
+                                             decim, dtype) for g in groups)
+        for g, (psd_g, itc_g) in zip(groups, psd_itc):
+            psd[g] += psd_g
+            itc[g] += itc_g
     psd /= n_taps
     itc /= n_taps
     return psd, itc
@@ -1295,7 +1367,7 @@ def _induced_power_mtm(data, sfreq, frequencies, time_bandwidth=4.0,
 @verbose
 def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0,
                    use_fft=True, return_itc=True, decim=1, n_jobs=1,
-                   picks=None, verbose=None):
+                   picks=None, dtype=np.complex128, verbose=None):
     """Compute Time-Frequency Representation (TFR) using DPSS wavelets
 
     Parameters
@@ -1330,6 +1402,12 @@ def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0,
     picks : array-like of int | None
         The indices of the channels to plot. If None all available
         channels are displayed.
+    dtype : np.complex128 | np.complex64
+        The precision of the time-frequency coefficients. np.complex64 needs
+        half the memory and is faster; power and ITC are still accumulated
+        in double precision.
+
+        .. versionadded:: 0.11
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -1343,7 +1421,7 @@ def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0,
 
     See Also
     --------
-    tfr_multitaper, tfr_stockwell
+    tfr_multitaper, tfr_stockwell, TFRAccumulator
 
     Notes
     -----
@@ -1361,7 +1439,7 @@ def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0,
                                     time_bandwidth=time_bandwidth,
                                     use_fft=use_fft, decim=decim,
                                     n_jobs=n_jobs, zero_mean=True,
-                                    verbose='INFO')
+                                    dtype=dtype, verbose='INFO')
     times = inst.times[::decim].copy()
     nave = len(data)
     out = AverageTFR(info, power, times, freqs, nave,
@@ -1372,6 +1450,220 @@ def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0,
     return out
 
 
+class TFRAccumulator(object):
+    """Accumulate time-frequency power and ITC one epoch at a time.
+
+    Epochs can be added one at a time (e.g., from an :class:`mne.Epochs`
+    iterator or from :class:`mne.realtime.RtEpochs`), so the peak memory
+    usage does not depend on the number of epochs. The running mean and
+    sum of squared deviations of the power are updated like in
+    :class:`mne.CovarianceAccumulator`, which also gives the standard error
+    of the power across epochs. Accumulators computed on different epochs
+    can be combined using :meth:`merge`.
+
+    Parameters
+    ----------
+    info : Info
+        The measurement info of the epochs.
+    times : ndarray, shape (n_times,)
+        The time values of the epochs in seconds.
+    freqs : ndarray, shape (n_freqs,)
+        The frequencies in Hz.
+    n_cycles : float | ndarray, shape (n_freqs,)
+        The number of cycles globally or for each frequency.
+    method : 'morlet' | 'multitaper'
+        Use Morlet wavelets (as in :func:`tfr_morlet`) or DPSS tapers (as in
+        :func:`tfr_multitaper`).
+    time_bandwidth : float
+        Time x (Full) Bandwidth product of the DPSS tapers. Only used if
+        method is 'multitaper'.
+    use_fft : bool
+        The fft based convolution or not.
+    decim : int
+        The decimation factor on the time axis.
+    picks : array-like of int | None
+        The indices of the channels to use. If None all good MEG and EEG
+        channels are used.
+    dtype : np.complex128 | np.complex64
+        The precision of the time-frequency coefficients.
+
+    Attributes
+    ----------
+    info : Info
+        The measurement info of the selected channels.
+    nave : int
+        The number of epochs accumulated.
+
+    See Also
+    --------
+    tfr_morlet, tfr_multitaper
+
+    Notes
+    -----
+    .. versionadded:: 0.11
+    """
+
+    def __init__(self, info, times, freqs, n_cycles, method='morlet',
+                 time_bandwidth=4.0, use_fft=True, decim=1, picks=None,
+                 dtype=np.complex128):
+        freqs = np.asarray(freqs, float)
+        if method == 'morlet':
+            Ws = [morlet(info['sfreq'], freqs, n_cycles=n_cycles,
+                         zero_mean=True)]
+        elif method == 'multitaper':
+            Ws = _dpss_wavelet(info['sfreq'], freqs, n_cycles=n_cycles,
+                               time_bandwidth=time_bandwidth, zero_mean=True)
+        else:
+            raise ValueError('method must be "morlet" or "multitaper", got '
+                             '%s' % method)
+        if picks is None:
+            picks = pick_types(info, meg=True, eeg=True, ref_meg=False,
+                               exclude='bads')
+        self._Ws = Ws
+        self._picks = np.asarray(picks, int)
+        self._n_channels_in = len(info['ch_names'])
+        self._n_times = len(times)
+        self._use_fft = use_fft
+        self._decim = decim
+        self._dtype = dtype
+        self.info = pick_info(info, self._picks)
+        self.times = np.array(times[::decim], float)
+        self.freqs = freqs
+        self.method = method
+        self.nave = 0
+        shape = (len(self._picks), len(freqs), len(self.times))
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self._phase = np.zeros((len(Ws),) + shape, np.complex128)
+
+    def __repr__(self):
+        return ('<TFRAccumulator  |  method : %s, n_channels : %d, '
+                'n_freqs : %d, nave : %d>'
+                % (self.method, len(self._picks), len(self.freqs),
+                   self.nave))
+
+    def _update(self, nave, mean, m2, phase):
+        """Helper to combine the statistics with those of other epochs"""
+        self._phase += phase
+        self.nave = _update_moments(self.nave, self._mean, self._m2, nave,
+                                    mean, m2)
+
+    def partial_fit(self, data):
+        """Add epochs to the time-frequency representation.
+
+        Parameters
+        ----------
+        data : instance of Epochs | array, shape ([n_epochs, ]n_channels, n_times)
+            The epochs. Epochs instances are iterated over, so they do not
+            need to be preloaded.
+
+        Returns
+        -------
+        self : instance of TFRAccumulator
+            The accumulator.
+        """  # noqa
+        from ..epochs import _BaseEpochs
+        if isinstance(data, _BaseEpochs):
+            for epoch in data:
+                self.partial_fit(epoch)
+            return self
+        data = np.asarray(data)
+        if data.ndim == 2:
+            data = data[np.newaxis]
+        if data.ndim != 3 or data.shape[1:] != (self._n_channels_in,
+                                                self._n_times):
+            raise ValueError('data must have shape ([n_epochs, ]%d, %d), got '
+                             '%s' % (self._n_channels_in, self._n_times,
+                                     data.shape))
+        data = data[:, self._picks]
+        n_epochs, n_channels, n_times = data.shape
+        shape = self._mean.shape
+        for sl in _get_cwt_batches(n_epochs, n_channels, n_times,
+                                   self._Ws[0], self._use_fft, self._dtype):
+            power = np.zeros((sl.stop - sl.start,) + shape)
+            phase = np.empty((len(self._Ws),) + shape, np.complex128)
+            for m, Ws in enumerate(self._Ws):
+                tfr = _cwt(data[sl].reshape(-1, n_times), Ws, self._use_fft,
+                           'same', self._decim, self._dtype)
+                tfr.shape = (-1,) + shape
+                tfr_abs = np.abs(tfr)
+                power += tfr_abs * tfr_abs
+                tfr /= tfr_abs
+                phase[m] = tfr.sum(axis=0)
+            power /= len(self._Ws)
+            mean = power.mean(axis=0)
+            power -= mean
+            self._update(len(power), mean, (power * power).sum(axis=0),
+                         phase)
+        return self
+
+    def merge(self, other):
+        """Add the epochs accumulated by another accumulator.
+
+        Parameters
+        ----------
+        other : instance of TFRAccumulator
+            The accumulator to merge. It must use the same method,
+            channels, frequencies and times.
+
+        Returns
+        -------
+        self : instance of TFRAccumulator
+            The accumulator.
+        """
+        if not isinstance(other, TFRAccumulator):
+            raise TypeError('other must be an instance of TFRAccumulator, '
+                            'got %s' % type(other))
+        if (other.method != self.method or
+                other.info['ch_names'] != self.info['ch_names'] or
+                not np.array_equal(other.freqs, self.freqs) or
+                not np.array_equal(other.times, self.times) or
+                len(other._Ws) != len(self._Ws)):
+            raise ValueError('Both accumulators must use the same method, '
+                             'channels, frequencies and times.')
+        self._update(other.nave, other._mean, other._m2, other._phase)
+        return self
+
+    def get_tfr(self, return_itc=False, return_se=False):
+        """Get the average time-frequency representation.
+
+        Parameters
+        ----------
+        return_itc : bool
+            Return intertrial coherence (ITC) as well as averaged power.
+        return_se : bool
+            Return the standard error of the power across epochs. Requires
+            at least two epochs.
+
+        Returns
+        -------
+        power : instance of AverageTFR
+            The averaged power.
+        itc : instance of AverageTFR
+            The intertrial coherence (ITC). Only returned if return_itc
+            is True.
+        se : instance of AverageTFR
+            The standard error of the power. Only returned if return_se
+            is True.
+        """
+        if self.nave == 0:
+            raise RuntimeError('No epochs have been accumulated')
+        if return_se and self.nave < 2:
+            raise RuntimeError('At least two epochs are needed to compute the '
+                               'standard error, got %d' % self.nave)
+        data = [('power', self._mean.copy())]
+        if return_itc:
+            data.append(('itc', np.abs(self._phase).mean(axis=0) / self.nave))
+        if return_se:
+            data.append(('power-se', np.sqrt(self._m2 / (self.nave - 1) /
+                                             self.nave)))
+        out = tuple(AverageTFR(deepcopy(self.info), d, self.times.copy(),
+                               self.freqs.copy(), self.nave,
+                               method='%s-%s' % (self.method, kind))
+                    for kind, d in data)
+        return out[0] if len(out) == 1 else out
+
+
 def combine_tfr(all_tfr, weights='nave'):
     """Merge AverageTFR data by weighted addition
 
@@ -353,6 +353,27 @@ def _compute_row_norms(data):
     return norms
 
 
+def _update_moments(n, mean, m2, n_other, mean_other, m2_other,
+                    outer=False):
+    """Helper to add the moments of other samples to running moments
+
+    ``mean`` and ``m2`` (the sum of squared deviations from the mean) are
+    updated in place with those of ``n_other`` other samples using the
+    pairwise update of Chan et al. (see :class:`mne.CovarianceAccumulator`).
+    If ``outer`` is True, ``m2`` holds sums of outer products of
+    vector-valued samples. Returns the new number of samples.
+    """
+    if n_other == 0:
+        return n
+    n_tot = n + n_other
+    delta = mean_other - mean
+    weight = n * n_other / float(n_tot)
+    m2 += m2_other
+    m2 += weight * (np.outer(delta, delta) if outer else delta * delta)
+    mean += delta * (n_other / float(n_tot))
+    return n_tot
+
+
 def _reject_data_segments(data, reject, flat, decim, info, tstep):
     """Reject data segments using peak-to-peak amplitude
     """
@@ -1017,6 +1038,31 @@ def set_cache_dir(cache_dir):
     which reduces memory requirements and speeds up parallel
     computation.
 
+    If the config variable ``MNE_USE_PERSISTENT_CACHE`` is ``'true'``, it is
+    also used to store results that are expensive to compute, so that later
+    sessions can load them instead. Each kind of result is stored in its own
+    subdirectory:
+
+        * ``fiff_index``: the tag directory and tree of FIF files
+          (``MNE_FIFF_INDEX_CACHE_SIZE``, default ``'50M'``).
+        * ``morph``: the morphing matrices of :class:`mne.SourceMorph`
+          (``MNE_MORPH_CACHE_SIZE``, default ``'500M'``).
+        * ``bem``: the linear collocation solutions of
+          :func:`mne.make_bem_solution` (``MNE_BEM_CACHE_SIZE``, default
+          ``'1G'``).
+        * ``maxwell``: the SSS bases and pseudo-inverses of
+          :func:`mne.preprocessing.maxwell_filter`
+          (``MNE_MAXWELL_CACHE_SIZE``, default ``'1G'``).
+        * ``fftw``: the wisdom of the pyFFTW backend (see
+          ``MNE_FFT_BACKEND``), to plan FFTs faster
+          (``MNE_FFTW_CACHE_SIZE``, default ``'10M'``).
+
+    Entries are ``.npz`` files, loaded without unpickling, named by a hash
+    of the MNE version and of everything the result depends on. The least
+    recently used entries are removed once a subdirectory exceeds its size,
+    and a size of ``'0'`` disables that cache. Only enable the persistent
+    caches for a directory that other users cannot write to.
+
     Parameters
     ----------
     cache_dir: str or None
@@ -1061,11 +1107,20 @@ known_config_types = [
     'MNE_DATASETS_EEGBCI_PATH',
     'MNE_DATASETS_BRAINSTORM_PATH',
     'MNE_DATASETS_TESTING_PATH',
+    'MNE_FFT_BACKEND',
+    'MNE_FFT_N_THREADS',
     'MNE_LOGGING_LEVEL',
     'MNE_USE_CUDA',
     'SUBJECTS_DIR',
     'MNE_CACHE_DIR',
     'MNE_MEMMAP_MIN_SIZE',
+    'MNE_FIFF_INDEX_CACHE_SIZE',
+    'MNE_MORPH_CACHE_SIZE',
+    'MNE_BEM_CACHE_SIZE',
+    'MNE_FORWARD_BUFFER_SIZE',
+    'MNE_MAXWELL_CACHE_SIZE',
+    'MNE_FFTW_CACHE_SIZE',
+    'MNE_USE_PERSISTENT_CACHE',
     'MNE_SKIP_TESTING_DATASET_TESTS',
     'MNE_DATASETS_SPM_FACE_DATASETS_TESTS'
 ]
@@ -1189,6 +1244,223 @@ def set_config(key, value, home_dir=None):
         json.dump(config, fid, sort_keys=True, indent=0)
 
 
+###############################################################################
+# IN-MEMORY CACHE
+
+def _nbytes(value):
+    """Helper to count the bytes of the arrays in a (nested) value"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    elif sparse.issparse(value):
+        return sum(_nbytes(getattr(value, attr, None))
+                   for attr in ('data', 'indices', 'indptr', 'row', 'col'))
+    elif isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    elif isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+class _LRUCache(object):
+    """Least-recently-used cache of computed values
+
+    Used to keep around results that take long to compute and are often
+    needed again with the same inputs (e.g., FIR filters).
+
+    Parameters
+    ----------
+    max_size : int
+        Maximum number of entries to keep.
+    max_bytes : int | str | None
+        Maximum total size of the arrays in the entries (e.g., '100M').
+        A value larger than this on its own is returned but not kept.
+        None means no limit.
+    """
+
+    def __init__(self, max_size, max_bytes=None):
+        self.max_size = max_size
+        self.max_bytes = None if max_bytes is None else _parse_size(max_bytes)
+        self.clear()
+
+    def clear(self):
+        """Remove all entries from the cache"""
+        self._data = dict()
+        self._nbytes = dict()
+        self._keys = list()
+
+    def get(self, key, fun, *args):
+        """Get the entry for key, computing it as fun(*args) if needed"""
+        if key in self._data:
+            self._keys.remove(key)
+            value = self._data[key]
+        else:
+            value = fun(*args)
+            # entries are shared between calls, so protect them from changes
+            for v in (value if isinstance(value, tuple) else (value,)):
+                if isinstance(v, np.ndarray):
+                    v.flags.writeable = False
+            self._data[key] = value
+            self._nbytes[key] = _nbytes(value)
+        self._keys.append(key)
+        while len(self._keys) > self.max_size or (
+                self.max_bytes is not None and
+                sum(self._nbytes[k] for k in self._keys) > self.max_bytes):
+            old_key = self._keys.pop(0)
+            del self._data[old_key], self._nbytes[old_key]
+        return value
+
+
+###############################################################################
+# ON-DISK CACHE
+
+def _parse_size(size):
+    """Helper to convert a size such as '100M' to a number of bytes"""
+    if isinstance(size, string_types):
+        size = size.strip()
+        units = dict(K=1024, M=1024 ** 2, G=1024 ** 3)
+        if size[-1:].upper() in units:
+            return int(float(size[:-1]) * units[size[-1:].upper()])
+    return int(size)
+
+
+# Default sizes of the persistent caches, see set_cache_dir
+_cache_sizes = dict(fiff_index='50M', morph='500M', bem='1G', maxwell='1G',
+                    fftw='10M')
+
+
+def _get_cache_dir(kind):
+    """Helper to get (and create) a subdirectory of MNE_CACHE_DIR
+
+    Returns None if persistent caching is not enabled, or if no cache
+    directory is configured or it cannot be used.
+    """
+    if get_config('MNE_USE_PERSISTENT_CACHE', 'false').lower() != 'true':
+        return None
+    cache_dir = get_config('MNE_CACHE_DIR', None)
+    if cache_dir is None:
+        return None
+    cache_dir = op.join(cache_dir, kind)
+    if not op.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir)
+        except OSError:  # another process was faster, or no permissions
+            if not op.isdir(cache_dir):
+                return None
+    return cache_dir
+
+
+def _get_cache(kind):
+    """Helper to get the directory and size of a persistent cache
+
+    Returns
+    -------
+    cache : tuple | None
+        The directory and the maximum size in bytes of the ``kind`` cache.
+        None if persistent caching is not enabled, or if the cache is
+        disabled or cannot be used.
+    """
+    max_size = _parse_size(get_config('MNE_%s_CACHE_SIZE' % kind.upper(),
+                                      _cache_sizes[kind]))
+    cache_dir = _get_cache_dir(kind) if max_size > 0 else None
+    if cache_dir is None:
+        return None
+    return cache_dir, max_size
+
+
+def _get_cached(kind, key, fun, *args):
+    """Helper to get a result from the persistent cache or compute it
+
+    Parameters
+    ----------
+    kind : str
+        The kind of result, see :func:`set_cache_dir`.
+    key : object
+        Everything the result depends on, as accepted by ``object_hash``.
+    fun : callable
+        Function returning the result as a dict of arrays.
+    *args
+        The arguments to pass to ``fun``.
+
+    Returns
+    -------
+    data : dict of ndarray
+        The result of ``fun(*args)``.
+    cached : bool
+        Whether the result was read from the cache.
+    """
+    cache = _get_cache(kind)
+    if cache is None:
+        return fun(*args), False
+    from . import __version__
+    key = '%032x' % object_hash((__version__, key))
+    data = _read_cache(cache[0], key)
+    if data is not None:
+        return data, True
+    data = fun(*args)
+    _write_cache(cache[0], key, data, cache[1])
+    return data, False
+
+
+def _read_cache(cache_dir, key):
+    """Helper to read a cached dict of arrays, None if it is not available"""
+    fname = op.join(cache_dir, key + '.npz')
+    try:
+        # never unpickle, the cache directory might be shared
+        npz = np.load(fname, allow_pickle=False)
+        try:
+            data = dict((name, npz[name]) for name in npz.files)
+        finally:
+            npz.close()
+        os.utime(fname, None)  # mark as recently used
+    except Exception:  # not cached (yet) or unreadable
+        return None
+    return data
+
+
+def _write_cache(cache_dir, key, data, max_size):
+    """Helper to atomically write a dict of arrays to the cache
+
+    Least recently used entries are then evicted until the cache directory
+    is no larger than ``max_size`` bytes.
+    """
+    fname = op.join(cache_dir, key + '.npz')
+    try:
+        fd, temp_fname = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+        with os.fdopen(fd, 'wb') as fid:
+            np.savez(fid, **data)
+        try:
+            os.rename(temp_fname, fname)
+        except OSError:  # Windows does not replace existing files
+            os.remove(temp_fname)
+    except (IOError, OSError) as exp:
+        logger.debug('Could not write cache file %s: %s' % (fname, exp))
+        return
+    _evict_cache(cache_dir, max_size)
+
+
+def _evict_cache(cache_dir, max_size):
+    """Helper to remove least recently used cache entries"""
+    entries = list()
+    for fname in os.listdir(cache_dir):
+        if not fname.endswith('.npz'):
+            continue
+        fname = op.join(cache_dir, fname)
+        try:
+            stat = os.stat(fname)
+        except OSError:  # removed by another process
+            continue
+        entries.append((stat.st_mtime, stat.st_size, fname))
+    total_size = sum(entry[1] for entry in entries)
+    for _, size, fname in sorted(entries):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(fname)
+        except OSError:
+            pass
+        total_size -= size
+
+
 class ProgressBar(object):
     """Class for generating a command-line progressbar
 